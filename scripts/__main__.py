@@ -0,0 +1,72 @@
+import importlib
+import os
+import sys
+
+# ============================================================
+# Ponto de entrada único dos scripts:
+#
+#   python -m scripts repos            # = python scripts/fetch_repos.py
+#   python -m scripts prs --workers 8  # = python scripts/fetch_prs.py --workers 8
+#   python -m scripts graphs --help
+#
+# (ou ``python scripts <comando>``). Este arquivo só usa a biblioteca
+# padrão: o módulo do subcomando é importado depois de escolhido, então
+# pandas, scipy, matplotlib e seaborn só são carregados pelos comandos
+# que precisam deles e a coleta não paga essas importações. O ``--help``
+# dos comandos de análise é montado a partir de cli_options.py, sem
+# importar o módulo do comando. Cada script continua executável sozinho e expõe
+# ``main(argv)``; o tempo de inicialização de cada comando é verificado
+# em ``python scripts/benchmark.py --startup``.
+# ============================================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# subcomando -> (módulo em scripts/, descrição)
+COMMANDS = {
+    "repos": ("fetch_repos", "Coleta os repositórios mais populares (data/processed/top_repos.csv)"),
+    "prs": ("fetch_prs", "Coleta os PRs dos repositórios (data/raw/prs_sample.csv)"),
+    "process": ("process_data", "Processa os PRs coletados e gera o dataset final"),
+    "correlate": ("correlacao", "Correlações de Spearman das RQs (resultados/correlacoes.csv)"),
+    "graphs": ("generate_graphs", "Gera os gráficos das RQs (results/graphs/)"),
+    "dashboard": ("export_dashboard", "Gera o resumo do dashboard (data/processed/dashboard.json)"),
+    "pipeline": ("pipeline", "Executa o pipeline refazendo só as etapas desatualizadas"),
+}
+
+
+def usage(prog):
+    lines = [f"uso: {prog} <comando> [opções]", "", "comandos:"]
+    lines += [f"  {name:<11}{description}" for name, (_, description) in COMMANDS.items()]
+    lines += ["", f"Opções de cada comando: {prog} <comando> --help"]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    prog = "python -m scripts"
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage(prog))
+        return 0
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(usage(prog), file=sys.stderr)
+        print(f"\nerro: comando desconhecido: {name}", file=sys.stderr)
+        return 2
+
+    # Os scripts importam uns aos outros pelo nome (import dataset, ...)
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    module_name = COMMANDS[name][0]
+    if "-h" in rest or "--help" in rest:
+        # Scripts com dependências pesadas: o parser vem de cli_options.py, sem importar o módulo
+        import cli_options
+        if module_name in cli_options.PARSERS:
+            cli_options.build_parser(module_name, prog=f"{prog} {name}").parse_args(rest)
+    module = importlib.import_module(module_name)
+    # O argparse de cada script usa sys.argv[0] como nome do programa no --help
+    sys.argv = [f"{prog} {name}", *rest]
+    module.main(rest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,413 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sem medição de memória de pico
+    resource = None
+
+# ============================================================
+# Benchmark das etapas de análise com dados sintéticos.
+#
+# O gerador produz PRs no formato de data/raw/prs_sample.csv (e, com
+# --shape final, do final_dataset.csv) com distribuições de cauda
+# longa parecidas com as do GitHub: PRs por repositório seguem uma lei
+# de potência, tamanho, tempo de revisão e descrição são log-normais e
+# comentários/revisões são binomiais negativas (muitos zeros, poucos
+# PRs enormes). Com a mesma semente os dados são sempre os mesmos.
+#
+# Cada etapa (process_data.process_prs, correlacao.run e
+# generate_graphs.run) roda em um subprocesso próprio dentro de
+# data/benchmark/<tamanho>/, para medir tempo de parede e memória de
+# pico (RSS máximo do processo e dos filhos) sem interferência de uma
+# etapa na outra. Os resultados são comparados com a baseline salva
+# (data/benchmark/baseline.json); etapas que ficaram mais lentas ou
+# mais pesadas que a tolerância são apontadas como regressão.
+#
+#   python scripts/benchmark.py                       # 10k PRs, compara com a baseline
+#   python scripts/benchmark.py --sizes 10k 1m 10m    # tamanhos maiores
+#   python scripts/benchmark.py --save-baseline       # grava a baseline
+#   python scripts/benchmark.py --startup             # inicialização da CLI
+#   python scripts/benchmark.py --backend polars      # process/correlate com polars
+#
+# Com --startup é medida a inicialização de ``python -m scripts <comando>
+# --help`` (melhor de STARTUP_RUNS execuções) e, com -X importtime, quais
+# dependências pesadas cada comando carrega antes de fazer qualquer
+# trabalho. Nenhum comando pode carregar uma delas só para o --help (os
+# parsers dos scripts de análise ficam em cli_options.py): isso é
+# regressão mesmo sem baseline.
+#
+# Com --backend polars, process e correlate usam polars_backend.py; os
+# resultados ficam em "process:polars" e "correlate:polars", ao lado dos
+# do pandas na mesma baseline.
+# ============================================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+BENCH_DIR = os.path.join("data", "benchmark")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+STAGES = ["process", "correlate", "graphs"]
+# Etapas com backend alternativo (process_data.BACKENDS / correlacao.BACKENDS)
+BACKEND_STAGES = ["process", "correlate"]
+BACKENDS = ["pandas", "polars"]
+SEED = 42
+
+# Linhas geradas por vez (o CSV de 10M é escrito em pedaços)
+GENERATE_CHUNK = 500_000
+
+# Regressão: mais lento/pesado que a baseline por mais que TOLERANCE
+# (fração) e por mais que o piso absoluto (ruído de medição)
+TOLERANCE = 0.25
+MIN_SECONDS = 0.5
+MIN_MEMORY_MB = 20
+
+# Inicialização da CLI: execuções por comando, piso de regressão e
+# dependências pesadas que nenhum ``<comando> --help`` pode importar
+STARTUP_RUNS = 5
+STARTUP_MIN_SECONDS = 0.05
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "scipy", "matplotlib", "seaborn"]
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+START_DATE = pd.Timestamp("2019-01-01", tz="UTC")
+PERIOD_SECONDS = 5 * 365 * 24 * 3600
+
+
+def generate_prs(rows, seed=SEED, start=0, valid_only=False):
+    """
+    DataFrame com ``rows`` PRs sintéticos no formato de prs_sample.csv.
+
+    ``start`` é o índice do primeiro PR (para gerar em pedaços com a mesma
+    semente); com ``valid_only`` todos os PRs passam pelo filtro de
+    process_data.py (encerrados, com revisão e pelo menos 1 h de análise).
+    """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, start + rows)
+
+    # PRs por repositório em lei de potência: poucos repositórios com muitos PRs
+    repos = max(10, (start + rows) // 200)
+    weights = 1.0 / np.arange(1, repos + 1) ** 1.1
+    repo = rng.choice(repos, size=rows, p=weights / weights.sum())
+
+    created = START_DATE + pd.to_timedelta(rng.integers(0, PERIOD_SECONDS, rows), unit="s")
+    review_hours = rng.lognormal(np.log(20), 1.8, rows)
+    if valid_only:
+        review_hours = np.maximum(review_hours, 1.0)
+    closed = created + pd.to_timedelta(np.round(review_hours * 3600), unit="s")
+
+    changed_files = np.minimum(np.floor(rng.pareto(1.2, rows) * 2) + 1, 3000).astype(np.int64)
+    additions = np.floor(rng.lognormal(3.5, 1.8, rows)).astype(np.int64)
+    deletions = np.floor(rng.lognormal(2.5, 1.8, rows)).astype(np.int64)
+    body_length = np.where(rng.random(rows) < 0.15, 0, np.floor(rng.lognormal(5.5, 1.2, rows))).astype(np.int64)
+    comments = rng.negative_binomial(0.8, 0.2, rows)
+    review_comments = rng.negative_binomial(0.5, 0.15, rows)
+    reviews_count = rng.negative_binomial(1.0, 0.4, rows)
+    if valid_only:
+        reviews_count = np.maximum(reviews_count, 1)
+    participants = 1 + np.minimum(rng.poisson(0.3 * (comments + reviews_count)) + (reviews_count > 0), 50)
+
+    # PRs maiores e com mais tempo de revisão são aceitos com menos frequência
+    logit = 0.9 - 0.15 * np.log1p(additions + deletions) - 0.1 * np.log1p(review_hours) + 0.05 * reviews_count
+    merged = rng.random(rows) < 1 / (1 + np.exp(-logit))
+    is_open = np.zeros(rows, dtype=bool) if valid_only else (~merged & (rng.random(rows) < 0.08))
+
+    closed_at = pd.Series(closed).where(~is_open)
+    return pd.DataFrame({
+        "repo_full_name": pd.Series(repo).map(lambda r: f"org{r % 97}/repo{r}"),
+        "id": 10_000_000 + index,
+        "number": 1 + index,
+        "title": [f"PR {i}" for i in index],
+        "user": pd.Series(rng.integers(0, 5000, rows)).map("user{}".format),
+        "created_at": created,
+        "closed_at": closed_at,
+        "merged_at": closed_at.where(merged),
+        "comments": comments,
+        "review_comments": review_comments,
+        "changed_files": changed_files,
+        "additions": additions,
+        "deletions": deletions,
+        "state": np.where(is_open, "open", "closed"),
+        "merged": merged,
+        "body_length": body_length,
+        "reviews_count": reviews_count,
+        "issue_comments_count": comments,
+        "inline_review_comments_count": review_comments,
+        "participants_count": participants,
+    })
+
+
+def write_dataset(path, rows, seed=SEED, shape="raw"):
+    """
+    Grava ``rows`` PRs sintéticos em ``path``, em pedaços de GENERATE_CHUNK linhas.
+
+    ``shape``: "raw" (formato de prs_sample.csv) ou "final" (formato do
+    final_dataset.csv, com as métricas derivadas e exatamente ``rows`` linhas).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if shape == "final":
+        from process_data import _process_frame
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        for start in range(0, rows, GENERATE_CHUNK):
+            df = generate_prs(min(GENERATE_CHUNK, rows - start), seed, start, valid_only=shape == "final")
+            if shape == "final":
+                df = _process_frame(df)
+            df.to_csv(f, index=False, header=start == 0, date_format=DATE_FORMAT)
+    os.replace(tmp_path, path)
+
+
+def _peak_memory_mb():
+    """RSS máximo deste processo e dos filhos já encerrados (None sem o módulo resource)"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_stage(stage, jobs, backend="pandas"):
+    """Executa uma etapa no diretório atual (chamado no subprocesso de measure_stage)"""
+    sys.path.insert(0, SCRIPT_DIR)
+    if stage == "process":
+        import process_data
+        process_data.process_prs("data/raw/prs_sample.csv", backend=backend)
+    elif stage == "correlate":
+        import correlacao
+        correlacao.run(backend=backend)
+    elif stage == "graphs":
+        from pathlib import Path
+        import generate_graphs
+        # Os caminhos do generate_graphs são fixos no projeto; aponta para o diretório do benchmark
+        generate_graphs.DATA_DIR = Path("data/processed").absolute()
+        generate_graphs.RESULTS_DIR = Path("results/graphs").absolute()
+        generate_graphs.CACHE_FILE = generate_graphs.RESULTS_DIR / ".render_cache.json"
+        if multiprocessing.get_start_method() != "fork":
+            # Workers criados com spawn reimportam o módulo e perderiam os caminhos acima
+            jobs = 1
+        generate_graphs.run(jobs=jobs, force=True)
+    else:
+        raise ValueError(f"Etapa desconhecida: {stage}")
+
+
+def stage_key(stage, backend="pandas"):
+    """Chave dos resultados: a etapa, com o backend quando não é o pandas (ex.: "process:polars")"""
+    return stage if backend == "pandas" or stage not in BACKEND_STAGES else f"{stage}:{backend}"
+
+
+def measure_stage(stage, workdir, jobs=None, backend="pandas"):
+    """Roda ``stage`` em um subprocesso dentro de ``workdir``; devolve {"seconds", "peak_mb"}"""
+    key = stage_key(stage, backend).replace(":", "-")
+    result_path = os.path.join(workdir, f".{key}.result.json")
+    log_path = os.path.join(workdir, f"{key}.log")
+    command = [sys.executable, os.path.abspath(__file__), "--run-stage", stage, "--result", result_path,
+               "--backend", backend]
+    if jobs:
+        command += ["--jobs", str(jobs)]
+    with open(log_path, "w", encoding="utf-8") as log:
+        code = subprocess.call(command, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+    if code != 0:
+        raise RuntimeError(f"Etapa {stage} falhou (código {code}); veja {log_path}")
+    with open(result_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def cli_commands():
+    """Subcomandos de ``python -m scripts`` (lidos de scripts/__main__.py sem executá-lo)"""
+    return list(runpy.run_path(os.path.join(SCRIPT_DIR, "__main__.py"), run_name="benchmark")["COMMANDS"])
+
+
+def measure_startup(command, runs=STARTUP_RUNS):
+    """Tempo de ``python -m scripts <comando> --help`` (melhor de ``runs``) e dependências pesadas importadas"""
+    args = ["-m", "scripts", command, "--help"]
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=PROJECT_DIR, capture_output=True, check=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # -X importtime lista no stderr cada módulo importado ("import time: ... | <módulo>")
+    trace = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=PROJECT_DIR,
+                           capture_output=True, text=True, check=True).stderr
+    imported = {line.rsplit("|", 1)[1].strip() for line in trace.splitlines() if line.startswith("import time:")}
+    return {"seconds": round(best, 3), "heavy": [name for name in HEAVY_MODULES if name in imported]}
+
+
+def prepare(size, rows, seed=SEED):
+    """Diretório de trabalho do tamanho ``size`` com o CSV bruto sintético (gerado uma vez por semente)"""
+    workdir = os.path.abspath(os.path.join(BENCH_DIR, size))
+    raw_path = os.path.join(workdir, "data", "raw", "prs_sample.csv")
+    marker = os.path.join(workdir, ".seed")
+    current = f"{seed}:{rows}"
+    if not (os.path.exists(raw_path) and os.path.exists(marker) and open(marker).read() == current):
+        print(f"[INFO] Gerando {rows} PRs sintéticos em {raw_path}...")
+        started = time.perf_counter()
+        write_dataset(raw_path, rows, seed)
+        with open(marker, "w") as f:
+            f.write(current)
+        print(f"[INFO] Dados gerados em {time.perf_counter() - started:.1f}s")
+    return workdir
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lista de regressões (tamanho, etapa, métrica, baseline, atual) em relação à baseline"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get("results", {}).get(size, {}).get(stage)
+            if previous is None:
+                continue
+            min_seconds = STARTUP_MIN_SECONDS if size == "startup" else MIN_SECONDS
+            for metric, floor in (("seconds", min_seconds), ("peak_mb", MIN_MEMORY_MB)):
+                old, new = previous.get(metric), current.get(metric)
+                if old is None or new is None:
+                    continue
+                if new > old * (1 + tolerance) and new - old > floor:
+                    regressions.append((size, stage, metric, old, new))
+    return regressions
+
+
+def run(sizes=("10k",), stages=STAGES, seed=SEED, jobs=None, save_baseline=False,
+        baseline_path=BASELINE_PATH, tolerance=TOLERANCE, backend="pandas"):
+    baseline = load_baseline(baseline_path)
+    results = {}
+    for size in sizes:
+        workdir = prepare(size, SIZES[size], seed)
+        results[size] = {}
+        for stage in stages:
+            measured = measure_stage(stage, workdir, jobs, backend)
+            results[size][stage_key(stage, backend)] = measured
+            print(f"[INFO] {size:>4} {stage_key(stage, backend):<17} {measured['seconds']:>9.2f}s "
+                  f"{measured['peak_mb'] or float('nan'):>9.1f} MB")
+
+    print(f"\n{'tamanho':<8}{'etapa':<18}{'tempo (s)':>10}{'baseline':>10}{'pico (MB)':>11}{'baseline':>10}")
+    for size, stages_result in results.items():
+        for stage, measured in stages_result.items():
+            previous = (baseline or {}).get("results", {}).get(size, {}).get(stage, {})
+            print(f"{size:<8}{stage:<18}{measured['seconds']:>10.2f}{_fmt(previous.get('seconds')):>10}"
+                  f"{_fmt(measured['peak_mb']):>11}{_fmt(previous.get('peak_mb')):>10}")
+
+    return _finish(results, baseline, seed, save_baseline, baseline_path, tolerance)
+
+
+def run_startup(seed=SEED, save_baseline=False, baseline_path=BASELINE_PATH, tolerance=TOLERANCE):
+    """Mede a inicialização de cada subcomando da CLI e compara com a baseline"""
+    baseline = load_baseline(baseline_path)
+    previous = (baseline or {}).get("results", {}).get("startup", {})
+    results = {"startup": {}}
+    unexpected = []
+    print(f"{'comando':<11}{'tempo (s)':>10}{'baseline':>10}  dependências pesadas")
+    for command in cli_commands():
+        measured = measure_startup(command)
+        results["startup"][command] = measured
+        print(f"{command:<11}{measured['seconds']:>10.3f}{_fmt(previous.get(command, {}).get('seconds')):>10}"
+              f"  {', '.join(measured['heavy']) or '-'}")
+        unexpected += [(command, name) for name in measured["heavy"]]
+
+    for command, name in unexpected:
+        print(f"[REGRESSÃO] startup {command}: importa {name} ao iniciar")
+    if unexpected and save_baseline:
+        print("\n[ERRO] Baseline não gravada: corrija as importações acima")
+        return False
+    return _finish(results, baseline, seed, save_baseline, baseline_path, tolerance) and not unexpected
+
+
+def _finish(results, baseline, seed, save_baseline, baseline_path, tolerance):
+    """Grava os resultados na baseline ou aponta as regressões em relação a ela"""
+    if save_baseline:
+        merged = baseline or {"results": {}}
+        for size, stages_result in results.items():
+            merged["results"].setdefault(size, {}).update(stages_result)
+        merged["seed"] = seed
+        merged["environment"] = environment()
+        os.makedirs(os.path.dirname(baseline_path) or ".", exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n[OK] Baseline salva em {baseline_path}")
+        return True
+
+    if baseline is None:
+        print(f"\n[AVISO] Sem baseline em {baseline_path}; use --save-baseline para criar")
+        return True
+    if baseline.get("environment") != environment():
+        print("\n[AVISO] A baseline foi medida em outro ambiente; compare com cautela:")
+        print(f"        baseline: {baseline.get('environment')}")
+    regressions = compare(results, baseline, tolerance)
+    for size, stage, metric, old, new in regressions:
+        print(f"[REGRESSÃO] {size} {stage}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"\n[OK] Nenhuma regressão acima de {tolerance:.0%} em relação à baseline")
+    return not regressions
+
+
+def _fmt(value):
+    return "-" if value is None else f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das etapas de análise com PRs sintéticos")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["10k"])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--jobs", type=int, default=None, help="Processos do generate_graphs")
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas",
+                        help="Backend das etapas process e correlate (polars requer `pip install polars`)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Aumento relativo de tempo/memória considerado regressão")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como baseline")
+    parser.add_argument("--startup", action="store_true",
+                        help="Mede só a inicialização de cada comando de python -m scripts")
+    parser.add_argument("--generate", metavar="CSV", help="Só gera um CSV sintético com --rows PRs e sai")
+    parser.add_argument("--rows", type=int, default=SIZES["10k"])
+    parser.add_argument("--shape", choices=["raw", "final"], default="raw",
+                        help="Formato do CSV gerado: prs_sample.csv (raw) ou final_dataset.csv (final)")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        started = time.perf_counter()
+        _run_stage(args.run_stage, args.jobs, args.backend)
+        measured = {"seconds": round(time.perf_counter() - started, 3), "peak_mb": _peak_memory_mb()}
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(measured, f)
+    elif args.startup:
+        sys.exit(0 if run_startup(args.seed, args.save_baseline, args.baseline, args.tolerance) else 1)
+    elif args.generate:
+        write_dataset(args.generate, args.rows, args.seed, args.shape)
+        print(f"[OK] {args.rows} PRs sintéticos ({args.shape}) salvos em {args.generate}")
+    else:
+        ok = run(args.sizes, args.stages, args.seed, args.jobs, args.save_baseline, args.baseline, args.tolerance,
+                 args.backend)
+        sys.exit(0 if ok else 1)
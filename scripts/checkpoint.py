@@ -0,0 +1,155 @@
+import heapq
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import partitions
+
+# ============================================================
+# Checkpoints da coleta de PRs.
+#
+# Cada repositório concluído é salvo em sua própria partição do
+# dataset (ver partitions.py), e o arquivo state.json registra quais
+# repositórios já terminaram e o maior updated_at visto em cada um
+# (watermark). Uma coleta interrompida retoma a partir do primeiro
+# repositório pendente; no modo incremental só os PRs atualizados
+# depois do watermark são buscados e mesclados aos já salvos.
+#
+# O watermark é o maior updated_at entre os PRs efetivamente
+# coletados, nunca à frente de um PR listado cuja coleta falhou
+# (ver watermark_before).
+# ============================================================
+
+DEFAULT_DIR = "data/raw/prs"
+STATE_FILE = "state.json"
+# Lock de state.json entre processos (coleta distribuída, ver work_queue.py)
+LOCK_FILE = "state.json.lock"
+STALE_LOCK_SECONDS = 60
+# Formato dos timestamps da API do GitHub (REST e GraphQL)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_lock = threading.Lock()
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@contextmanager
+def _state_lock(directory):
+    """Lock exclusivo entre threads e processos (inclusive em outras máquinas) para state.json"""
+    path = os.path.join(directory, LOCK_FILE)
+    with _lock:
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    # Lock de um processo que morreu no meio da escrita
+                    if time.time() - os.path.getmtime(path) > STALE_LOCK_SECONDS:
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+
+def load_state(directory=DEFAULT_DIR):
+    """Estado dos checkpoints: {repo: {"done", "watermark", "rows", "updated"}}"""
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def clear(directory=DEFAULT_DIR):
+    """Remove os checkpoints existentes para recomeçar a coleta do zero"""
+    if not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        if entry.name == STATE_FILE:
+            os.remove(entry.path)
+        elif entry.is_dir() and entry.name.startswith("repo="):
+            shutil.rmtree(entry.path)
+
+
+def save_repo(directory, repo_full_name, rows, watermark, state, fmt="auto", on_batch=None):
+    """
+    Grava a partição de um repositório e marca-o como concluído no estado.
+
+    ``rows`` pode ser gerado durante a coleta; nesse caso ``watermark`` pode
+    ser uma função, chamada depois de gravadas todas as linhas. ``on_batch``
+    segue para partitions.write_partition.
+    """
+    os.makedirs(directory, exist_ok=True)
+    count = partitions.write_partition(directory, repo_full_name, rows, fmt, on_batch=on_batch)
+    if callable(watermark):
+        watermark = watermark()
+    with _state_lock(directory):
+        # Relê o arquivo: outros processos podem ter concluído repositórios nesse meio tempo
+        state.update(load_state(directory))
+        state[repo_full_name] = {
+            "done": True,
+            "watermark": watermark,
+            "rows": count,
+            "updated": datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT),
+        }
+        data = json.dumps(state, indent=2, ensure_ascii=False)
+        _write_atomic(os.path.join(directory, STATE_FILE), lambda path: _write_text(path, data))
+    return count
+
+
+def load_repo(directory, repo_full_name):
+    """Linhas salvas de um repositório (lista de dicionários)"""
+    return partitions.read_partition(directory, repo_full_name)
+
+
+def merge_partition(directory, repo_full_name, new_rows):
+    """
+    Mescla PRs novos/atualizados aos já salvos (o mais recente vence), do mais novo ao mais antigo.
+
+    Só ``new_rows`` (os PRs modificados desde o watermark) fica em memória; a
+    partição salva, já em ordem decrescente de número, é lida um arquivo por vez.
+    """
+    new_rows = sorted(new_rows, key=lambda row: row["number"], reverse=True)
+    updated = {row["number"] for row in new_rows}
+    old_rows = (row for row in partitions.iter_rows(directory, repo_full_name) if row["number"] not in updated)
+    return heapq.merge(new_rows, old_rows, key=lambda row: -row["number"])
+
+
+def max_watermark(*values):
+    """Maior timestamp ISO 8601 entre os informados (ignora vazios)"""
+    values = [v for v in values if v]
+    return max(values) if values else None
+
+
+def watermark_before(watermark, pending):
+    """
+    ``watermark`` limitado a um segundo antes de ``pending``.
+
+    ``pending`` é o menor ``updated_at`` entre os PRs listados que não foram
+    coletados (falha na coleta); o watermark não pode passar deles, senão a
+    próxima execução incremental os trataria como inalterados.
+    """
+    if not watermark or not pending:
+        return watermark
+    before = datetime.strptime(pending, TIMESTAMP_FORMAT) - timedelta(seconds=1)
+    return min(watermark, before.strftime(TIMESTAMP_FORMAT))
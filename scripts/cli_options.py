@@ -0,0 +1,82 @@
+import argparse
+
+import pr_store
+
+# ============================================================
+# Opções de linha de comando dos scripts de análise.
+#
+# process_data.py, correlacao.py, generate_graphs.py e
+# export_dashboard.py importam pandas, SciPy e matplotlib logo no
+# topo. As opções deles ficam aqui, só com a biblioteca padrão (e
+# pr_store.py, que também não importa pandas ao carregar), para que
+# ``python -m scripts <comando> --help`` monte o parser sem importar
+# o módulo do comando. Cada script usa o mesmo parser no seu main().
+# ============================================================
+
+# Backends do processamento e da correlação ("polars": polars_backend.py)
+BACKENDS = ["pandas", "polars"]
+
+# Modos de desenho dos gráficos (plotting.py) e a partir de quantos PRs o "auto" agrega
+PLOT_MODES = ("auto", "raw", "aggregated")
+AGGREGATE_THRESHOLD = 50_000
+
+CORRELATIONS_PATH = "resultados/correlacoes.csv"
+DASHBOARD_PATH = "data/processed/dashboard.json"
+
+
+def process_data(parser):
+    parser.add_argument("input", nargs="?", default="data/raw/prs_sample.csv",
+                        help="CSV bruto, diretório do dataset particionado (ex.: data/raw/prs) "
+                             "ou banco SQLite dos PRs (ex.: data/raw/prs.sqlite)")
+    pr_store.add_query_arguments(parser)
+    parser.add_argument("--backend", choices=BACKENDS, default="pandas",
+                        help="polars: um único plano lazy, em todos os núcleos (requer `pip install polars`)")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="processa com pandas e polars e confere se os arquivos gerados são idênticos")
+
+
+def correlacao(parser):
+    parser.add_argument("--output", default=CORRELATIONS_PATH)
+    parser.add_argument("--input", default=None,
+                        help="Dataset final (.parquet ou .csv) ou banco SQLite dos PRs (data/raw/prs.sqlite)")
+    pr_store.add_query_arguments(parser)
+    parser.add_argument("--backend", choices=BACKENDS, default='pandas',
+                        help="polars: leitura e postos em um único plano lazy (requer `pip install polars`)")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="calcula as correlações com pandas e polars e confere se as tabelas são idênticas")
+
+
+def generate_graphs(parser):
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Processos para renderizar os gráficos (padrão: número de CPUs; 1 = sem pool)")
+    parser.add_argument("--force", action="store_true",
+                        help="Regera todos os gráficos, ignorando o cache")
+    parser.add_argument("--plot-mode", choices=PLOT_MODES, default="auto",
+                        help="auto: agrega (hexbin/sketch) só acima de "
+                             f"{AGGREGATE_THRESHOLD} PRs; raw: sempre todos os pontos; "
+                             "aggregated: sempre agregado")
+
+
+def export_dashboard(parser):
+    parser.add_argument("--output", default=DASHBOARD_PATH)
+    parser.add_argument("--input", default=None,
+                        help="Dataset final (.parquet ou .csv) ou banco SQLite dos PRs (data/raw/prs.sqlite); "
+                             "padrão: o Parquet se existir, senão o CSV")
+    pr_store.add_query_arguments(parser)
+
+
+# módulo do script -> (descrição, função que acrescenta as opções)
+PARSERS = {
+    "process_data": ("Processa os PRs coletados e gera o dataset final", process_data),
+    "correlacao": ("Correlações de Spearman das questões de pesquisa (RQ01-RQ08)", correlacao),
+    "generate_graphs": ("Gera os gráficos das questões de pesquisa", generate_graphs),
+    "export_dashboard": ("Gera o JSON pré-agregado usado por data/processed/index.html", export_dashboard),
+}
+
+
+def build_parser(module, prog=None):
+    """Parser de linha de comando do script ``module`` (ex.: "process_data")"""
+    description, add_arguments = PARSERS[module]
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    add_arguments(parser)
+    return parser
@@ -0,0 +1,343 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+# ============================================================
+# Métricas da coleta: vazão, latência por endpoint, retries, orçamento
+# de rate limit e bytes recebidos.
+#
+# O github_client registra aqui cada requisição enviada (endpoint,
+# status, latência, bytes e retries de transporte do urllib3) e o
+# agendador de rate_limit.py registra o orçamento restante de cada
+# recurso e as requisições refeitas por limite. As latências vão para
+# histogramas de buckets fixos, como os do Prometheus.
+#
+# ``start`` inicia uma thread que, a cada ``interval`` segundos, grava
+# as métricas em um arquivo (.json, ou texto do Prometheus para .prom/
+# .txt) e, no modo silencioso, reescreve uma única linha de progresso
+# no terminal no lugar dos logs por PR/página (``log``).
+# ============================================================
+
+# Limites superiores (segundos) dos buckets de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+EXPORT_INTERVAL = 10
+PROGRESS_INTERVAL = 1
+
+# Endpoint (rótulo) de cada URL da API, testados em ordem
+ENDPOINTS = [
+    ("reviews", re.compile(r"/repos/[^/]+/[^/]+/pulls/\d+/reviews")),
+    ("review_comments", re.compile(r"/repos/[^/]+/[^/]+/pulls/\d+/comments")),
+    ("issue_comments", re.compile(r"/repos/[^/]+/[^/]+/issues/\d+/comments")),
+    ("pull", re.compile(r"/repos/[^/]+/[^/]+/pulls/\d+(?:[/?]|$)")),
+    ("pulls", re.compile(r"/repos/[^/]+/[^/]+/pulls(?:\?|$)")),
+    ("search", re.compile(r"/search/")),
+    ("graphql", re.compile(r"/graphql(?:\?|$)")),
+]
+
+
+def endpoint_for(url):
+    """Rótulo do endpoint de uma URL da API (``other`` se não for um dos conhecidos)"""
+    for name, pattern in ENDPOINTS:
+        if pattern.search(url):
+            return name
+    return "other"
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas + soma)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # o último é o +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimativa do quantil por interpolação linear dentro do bucket (como histogram_quantile)"""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= target and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class CollectorMetrics:
+    """Contadores da coleta de um processo (thread-safe)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = Counter()        # (endpoint, status) -> requisições
+        self.latency = {}                # endpoint -> Histogram
+        self.errors = Counter()          # endpoint -> exceções de transporte
+        self.retries = Counter()         # "transport" | "rate_limit" -> retries
+        self.bytes_received = 0
+        self.budget = {}                 # (token, recurso) -> (restante, limite, reset)
+        self.prs = 0
+        self.repos_done = 0
+        self.repos_total = None
+        self._lock = threading.Lock()
+
+    def observe_request(self, url, status, seconds, size=0, retries=0):
+        endpoint = endpoint_for(url)
+        with self._lock:
+            self.requests[(endpoint, status)] += 1
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+            self.bytes_received += size
+            self.retries["transport"] += retries
+
+    def observe_error(self, url):
+        endpoint = endpoint_for(url)
+        with self._lock:
+            self.latency.setdefault(endpoint, Histogram())
+            self.errors[endpoint] += 1
+
+    def rate_limited(self):
+        with self._lock:
+            self.retries["rate_limit"] += 1
+
+    def update_budget(self, token, resource, remaining, limit, reset):
+        with self._lock:
+            self.budget[(token, resource)] = (remaining, limit, reset)
+
+    def pr_collected(self, count=1):
+        with self._lock:
+            self.prs += count
+
+    def repo_done(self):
+        with self._lock:
+            self.repos_done += 1
+
+    def set_repos(self, total):
+        with self._lock:
+            self.repos_total = total
+
+    def _budget_by_resource(self):
+        """{recurso: (restante, limite, próximo reset)} somado entre os tokens"""
+        totals = {}
+        for (_, resource), (remaining, limit, reset) in self.budget.items():
+            previous = totals.get(resource, (0, 0, reset))
+            totals[resource] = (previous[0] + remaining, previous[1] + limit, min(previous[2], reset))
+        return totals
+
+    def snapshot(self):
+        """Estado atual das métricas como dicionário (formato do export JSON)"""
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            total = sum(self.requests.values())
+            endpoints = {}
+            for endpoint, histogram in sorted(self.latency.items()):
+                endpoints[endpoint] = {
+                    "requests": histogram.count,
+                    "errors": self.errors[endpoint],
+                    "status": {str(status): count for (name, status), count in sorted(self.requests.items())
+                               if name == endpoint},
+                    "latency_s": {
+                        "mean": histogram.sum / histogram.count if histogram.count else None,
+                        "p50": histogram.quantile(0.5),
+                        "p90": histogram.quantile(0.9),
+                        "p99": histogram.quantile(0.99),
+                        "buckets": dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts)),
+                    },
+                }
+            return {
+                "timestamp": time.time(),
+                "elapsed_s": elapsed,
+                "requests": total,
+                "requests_per_s": total / elapsed,
+                "bytes_received": self.bytes_received,
+                "retries": {"transport": self.retries["transport"], "rate_limit": self.retries["rate_limit"]},
+                "rate_limit": {
+                    resource: {"remaining": remaining, "limit": limit, "reset": reset}
+                    for resource, (remaining, limit, reset) in sorted(self._budget_by_resource().items())
+                },
+                "prs": self.prs,
+                "repos_done": self.repos_done,
+                "repos_total": self.repos_total,
+                "endpoints": endpoints,
+            }
+
+    def to_prometheus(self):
+        """Métricas no formato de texto do Prometheus"""
+        snap = self.snapshot()
+        lines = [
+            "# TYPE github_requests_total counter",
+        ]
+        for endpoint, data in snap["endpoints"].items():
+            for status, count in data["status"].items():
+                lines.append(f'github_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines.append("# TYPE github_request_errors_total counter")
+        for endpoint, data in snap["endpoints"].items():
+            lines.append(f'github_request_errors_total{{endpoint="{endpoint}"}} {data["errors"]}')
+        lines.append("# TYPE github_request_duration_seconds histogram")
+        with self._lock:
+            histograms = {name: (list(h.counts), h.sum, h.count) for name, h in sorted(self.latency.items())}
+        for endpoint, (counts, total, count) in histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f'github_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} '
+                             f"{cumulative}")
+            lines.append(f'github_request_duration_seconds_sum{{endpoint="{endpoint}"}} {total}')
+            lines.append(f'github_request_duration_seconds_count{{endpoint="{endpoint}"}} {count}')
+        lines.append("# TYPE github_retries_total counter")
+        for kind, count in snap["retries"].items():
+            lines.append(f'github_retries_total{{kind="{kind}"}} {count}')
+        lines.append("# TYPE github_response_bytes_total counter")
+        lines.append(f"github_response_bytes_total {snap['bytes_received']}")
+        for name, field in (("remaining", "remaining"), ("limit", "limit"), ("reset_timestamp", "reset")):
+            lines.append(f"# TYPE github_rate_limit_{name} gauge")
+            for resource, data in snap["rate_limit"].items():
+                lines.append(f'github_rate_limit_{name}{{resource="{resource}"}} {data[field]}')
+        lines += [
+            "# TYPE collector_requests_per_second gauge",
+            f"collector_requests_per_second {snap['requests_per_s']:.3f}",
+            "# TYPE collector_prs_total counter",
+            f"collector_prs_total {snap['prs']}",
+            "# TYPE collector_repos_done gauge",
+            f"collector_repos_done {snap['repos_done']}",
+        ]
+        if snap["repos_total"] is not None:
+            lines += ["# TYPE collector_repos_total gauge", f"collector_repos_total {snap['repos_total']}"]
+        return "\n".join(lines) + "\n"
+
+    def progress_line(self):
+        """Linha única de progresso: repositórios, PRs, vazão, orçamento, retries e bytes"""
+        snap = self.snapshot()
+        repos = f"{snap['repos_done']}/{snap['repos_total']}" if snap["repos_total"] else str(snap["repos_done"])
+        budget = " ".join(f"{resource} {data['remaining']}/{data['limit']}"
+                          for resource, data in snap["rate_limit"].items()) or "-"
+        elapsed = int(snap["elapsed_s"])
+        return (f"[PROGRESSO] repos {repos} | PRs {snap['prs']} | {snap['requests']} req "
+                f"({snap['requests_per_s']:.1f}/s) | orçamento {budget} | "
+                f"retries {snap['retries']['transport']}+{snap['retries']['rate_limit']} | "
+                f"{snap['bytes_received'] / 1024 / 1024:.1f} MB | "
+                f"{elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}")
+
+    def export(self, path):
+        """Grava as métricas em ``path`` (texto do Prometheus para .prom/.txt, JSON caso contrário)"""
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2) + "\n"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+_metrics = CollectorMetrics()
+_reporter = None
+quiet = False
+
+
+def get_metrics():
+    return _metrics
+
+
+def log(message):
+    """print() dos logs de progresso por PR/página; suprimido no modo silencioso"""
+    if not quiet:
+        print(message)
+
+
+class _Reporter(threading.Thread):
+    """Thread que exporta as métricas periodicamente e atualiza a linha de progresso"""
+
+    def __init__(self, metrics, path, interval, progress):
+        super().__init__(daemon=True)
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.progress = progress
+        self.stop_event = threading.Event()
+
+    def run(self):
+        last_export = time.monotonic()
+        tick = min(PROGRESS_INTERVAL, self.interval) if self.progress else self.interval
+        while not self.stop_event.wait(tick):
+            if self.progress:
+                self.draw()
+            if self.path and time.monotonic() - last_export >= self.interval:
+                self.metrics.export(self.path)
+                last_export = time.monotonic()
+
+    def draw(self, end=""):
+        sys.stdout.write("\r" + self.metrics.progress_line() + end)
+        sys.stdout.flush()
+
+
+def start(path=None, interval=EXPORT_INTERVAL, quiet_mode=False, progress=None):
+    """
+    Inicia a exportação periódica das métricas para ``path`` (opcional) e,
+    com ``quiet_mode``, a linha de progresso no lugar dos logs por PR/página.
+    ``progress=False`` suprime os logs sem desenhar a linha (processos worker).
+    """
+    global _reporter, quiet
+    quiet = quiet_mode
+    progress = quiet_mode if progress is None else progress
+    if path or progress:
+        _reporter = _Reporter(_metrics, path, interval, progress)
+        _reporter.start()
+
+
+def process_path(path, index):
+    """Arquivo de métricas do processo worker ``index`` (ex.: metrics.json -> metrics.2.json)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index}{ext}"
+
+
+def stop():
+    """Encerra a thread de exportação, gravando e exibindo o estado final"""
+    global _reporter
+    if _reporter is None:
+        return
+    _reporter.stop_event.set()
+    _reporter.join()
+    if _reporter.path:
+        _metrics.export(_reporter.path)
+    if _reporter.progress:
+        _reporter.draw(end="\n")
+    _reporter = None
+
+
+def report():
+    """Resumo final da coleta: vazão, latência por endpoint, retries e bytes"""
+    snap = _metrics.snapshot()
+    if not snap["requests"]:
+        return
+    print(f"[MÉTRICAS] {snap['requests']} requisições em {snap['elapsed_s']:.1f}s "
+          f"({snap['requests_per_s']:.1f}/s) | {snap['bytes_received'] / 1024 / 1024:.1f} MB | "
+          f"retries: {snap['retries']['transport']} transporte, {snap['retries']['rate_limit']} rate limit")
+    for endpoint, data in snap["endpoints"].items():
+        latency = data["latency_s"]
+        if not data["requests"]:
+            print(f"[MÉTRICAS]   {endpoint:<16} {data['errors']:>7} erros de conexão")
+            continue
+        print(f"[MÉTRICAS]   {endpoint:<16} {data['requests']:>7} req | média {latency['mean'] * 1000:7.1f} ms | "
+              f"p50 {latency['p50'] * 1000:7.1f} ms | p90 {latency['p90'] * 1000:7.1f} ms | "
+              f"p99 {latency['p99'] * 1000:7.1f} ms")
+    for resource, data in snap["rate_limit"].items():
+        print(f"[MÉTRICAS]   orçamento {resource}: {data['remaining']}/{data['limit']}")
@@ -1,56 +1,179 @@
+import os
+import sys
+
 import pandas as pd
-from scipy.stats import spearmanr
 import numpy as np
+from scipy.stats import rankdata, t as t_dist
+
+import cli_options
+import pr_store
+from features import load_features
+
+OUTPUT_PATH = cli_options.CORRELATIONS_PATH
+
+# "polars": leitura, remoção de ausentes e postos em um plano lazy (polars_backend.py)
+BACKENDS = cli_options.BACKENDS
+
+LOAD_COLUMNS = ['status', 'review_time_h', 'tamanho', 'body_length', 'interacoes', 'review_comments']
+DROPNA_COLUMNS = ['review_time_h', 'tamanho', 'body_length', 'interacoes', 'review_comments']
+
+# (id, descrição, variável X, variável Y) de cada questão de pesquisa
+RQS = [
+    # --- Relações com o Status do PR (merged ou closed)
+    ('RQ01', 'Tamanho vs Status', 'tamanho', 'status'),
+    ('RQ02', 'Tempo vs Status', 'review_time_h', 'status'),
+    ('RQ03', 'Descrição vs Status', 'body_length', 'status'),
+    ('RQ04', 'Interações vs Status', 'interacoes', 'status'),
+    # --- Relações com o número de revisões (review_comments)
+    ('RQ05', 'Tamanho vs Revisões', 'tamanho', 'review_comments'),
+    ('RQ06', 'Tempo vs Revisões', 'review_time_h', 'review_comments'),
+    ('RQ07', 'Descrição vs Revisões', 'body_length', 'review_comments'),
+    ('RQ08', 'Interações vs Revisões', 'interacoes', 'review_comments'),
+]
+
+
+def load_data(path=None, filters=None):
+    """Carrega o dataset final com as métricas já calculadas (features.py)"""
+    # status: merged (merged_at preenchido) = 1, closed (merged_at vazio) = 0
+    df = load_features(columns=LOAD_COLUMNS, filters=filters, path=path)
+
+    # Remover linhas com valores ausentes
+    return df.dropna(subset=DROPNA_COLUMNS)
+
+
+def rq_columns(rqs=RQS):
+    """Variáveis das RQs, sem repetição, na ordem em que aparecem"""
+    return list(dict.fromkeys(col for _, _, x, y in rqs for col in (x, y)))
+
+
+def spearman_matrix(df, columns, ranks=None):
+    """
+    Matriz de correlação de Spearman entre ``columns`` e os p-valores bicaudais.
+
+    Cada coluna é ranqueada uma única vez (postos médios nos empates); ρ é a
+    correlação de Pearson entre os postos, calculada para todos os pares em uma
+    multiplicação de matrizes. O p-valor usa a mesma aproximação t com n - 2
+    graus de liberdade de ``scipy.stats.spearmanr``. Colunas constantes têm ρ = NaN.
+    ``ranks`` (PRs x ``columns``) dispensa o ranqueamento, quando os postos já
+    vieram calculados (ex.: do backend polars).
+
+    Retorno
+    -------
+    (rho, p_values) : tuple de pandas.DataFrame indexados por ``columns``
+    """
+    if ranks is None:
+        ranks = rankdata(df[columns].to_numpy(dtype=float), axis=0)
+    n = ranks.shape[0]
+
+    centered = ranks - ranks.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = centered / norms
+        rho = np.clip(z.T @ z, -1.0, 1.0)
+        dof = n - 2
+        t_stat = rho * np.sqrt(dof / ((1.0 + rho) * (1.0 - rho)))
+    p_values = 2 * t_dist.sf(np.abs(t_stat), dof)
+    np.fill_diagonal(p_values, 0.0)
+
+    return (
+        pd.DataFrame(rho, index=columns, columns=columns),
+        pd.DataFrame(p_values, index=columns, columns=columns),
+    )
+
+
+def correlation_table(df, rqs=RQS, ranks=None):
+    """Tabela com uma linha por RQ: rq, descricao, x, y, rho, p_value, n (``ranks``: postos de ``rq_columns(rqs)``)"""
+    columns = rq_columns(rqs)
+    rho, p_values = spearman_matrix(df, columns, ranks)
+    return pd.DataFrame(
+        [
+            {
+                'rq': rq,
+                'descricao': label,
+                'x': x,
+                'y': y,
+                'rho': rho.at[x, y],
+                'p_value': p_values.at[x, y],
+                'n': len(df),
+            }
+            for rq, label, x, y in rqs
+        ]
+    )
+
+
+def load_ranked(path=None, filters=None, backend='pandas'):
+    """
+    Dataset de ``load_data``, os postos das variáveis das RQs (None no backend pandas,
+    em que ``spearman_matrix`` ranqueia) e o backend que de fato leu o dataset.
+    O backend polars só lê datasets finais que já trazem as métricas; o banco
+    SQLite e datasets antigos ficam com o pandas.
+    """
+    if backend == 'polars':
+        import dataset
+        import polars_backend
+        polars_backend.require()
+        path = path or dataset.default_path()
+        if polars_backend.supports_final(path):
+            df, ranks = polars_backend.load_ranked(path, LOAD_COLUMNS, rq_columns(), DROPNA_COLUMNS, filters)
+            return df, ranks, 'polars'
+        print(f"[AVISO] O backend polars não lê {path}; usando pandas")
+    return load_data(path, filters), None, 'pandas'
+
+
+def run(output_path=OUTPUT_PATH, path=None, filters=None, backend='pandas'):
+    df, ranks, _ = load_ranked(path, filters, backend)
+
+    print("=" * 80)
+    print("ANÁLISE DE CORRELAÇÃO DE SPEARMAN - LAB03")
+    print("=" * 80)
+
+    # Diagnóstico
+    print(f"\nDistribuição de status:")
+    print(f"Merged: {df['status'].sum()}")
+    print(f"Closed (não merged): {(df['status'] == 0).sum()}")
+    print(f"Total de PRs analisados: {len(df)}")
+
+    table = correlation_table(df, ranks=ranks)
+    for row in table.itertuples():
+        if row.rq == 'RQ01':
+            print("\n--- Relações com o STATUS (Merged/Closed) ---")
+        elif row.rq == 'RQ05':
+            print("\n--- Relações com o NÚMERO DE REVISÕES ---")
+        print(f"{row.rq} - {row.descricao}: ρ = {row.rho:.4f}, p = {row.p_value:.4f}")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    table.to_csv(output_path, index=False)
+    print(f"\n[OK] Correlações salvas em {output_path}")
+    print("\n[OK] Análise de correlação concluída com sucesso!")
+    return table
+
+
+def check_parity(path=None, filters=None):
+    """
+    Tabela de correlações dos dois backends; True se idênticas (rho e p-valor bit a bit).
+    False, sem comparar, se algum backend não leu o dataset (ex.: banco SQLite).
+    """
+    tables = {}
+    for backend in BACKENDS:
+        df, ranks, used = load_ranked(path, filters, backend)
+        if used != backend:
+            print(f"[ERRO] O backend {backend} não lê o dataset (usou {used}); paridade não comparada")
+            return False
+        tables[backend] = correlation_table(df, ranks=ranks)
+    same = tables['pandas'].equals(tables['polars'])
+    print(f"[{'OK' if same else 'ERRO'}] correlações {'idênticas' if same else 'diferentes'} "
+          f"({len(tables['pandas'])} RQs, n = {tables['pandas']['n'].iloc[0]})")
+    return same
+
+
+def main(argv=None):
+    parser = cli_options.build_parser("correlacao")
+    args = parser.parse_args(argv)
+    filters = pr_store.query_filters(args.repo, args.since, args.until)
+    if args.check_parity:
+        sys.exit(0 if check_parity(args.input, filters) else 1)
+    run(args.output, args.input, filters, args.backend)
+
 
-# Carregar CSV final
-df = pd.read_csv('data/processed/final_dataset.csv')
-
-# Converter datas para datetime
-df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
-df['closed_at'] = pd.to_datetime(df['closed_at'], errors='coerce')
-df['merged_at'] = pd.to_datetime(df['merged_at'], errors='coerce')
-
-# Calcular tempo de análise (em horas)
-df['review_time_h'] = (df['closed_at'] - df['created_at']).dt.total_seconds() / 3600
-
-# Converter status para variável numérica
-# merged (merged_at preenchido) = 1, closed (merged_at vazio) = 0
-df['status_numeric'] = df['merged_at'].notna().astype(int)
-
-# Calcular métricas derivadas
-df['tamanho'] = df['additions'] + df['deletions'] + df['changed_files']
-df['interacoes'] = df['comments'] + df['review_comments']
-
-# Remover linhas com valores ausentes
-df = df.dropna(subset=['review_time_h', 'tamanho', 'body_length', 'interacoes', 'review_comments'])
-
-print("=" * 80)
-print("ANÁLISE DE CORRELAÇÃO DE SPEARMAN - LAB03")
-print("=" * 80)
-
-# Diagnóstico
-print(f"\nDistribuição de status:")
-print(f"Merged: {df['status_numeric'].sum()}")
-print(f"Closed (não merged): {(df['status_numeric'] == 0).sum()}")
-print(f"Total de PRs analisados: {len(df)}")
-
-# Função auxiliar
-def calc_corr(x, y, label):
-    corr, p = spearmanr(x, y)
-    print(f"{label}: ρ = {corr:.4f}, p = {p:.4f}")
-
-# --- Relações com o Status do PR (merged ou closed)
-print("\n--- Relações com o STATUS (Merged/Closed) ---")
-calc_corr(df['tamanho'], df['status_numeric'], "RQ01 - Tamanho vs Status")
-calc_corr(df['review_time_h'], df['status_numeric'], "RQ02 - Tempo vs Status")
-calc_corr(df['body_length'], df['status_numeric'], "RQ03 - Descrição vs Status")
-calc_corr(df['interacoes'], df['status_numeric'], "RQ04 - Interações vs Status")
-
-# --- Relações com o número de revisões (review_comments)
-print("\n--- Relações com o NÚMERO DE REVISÕES ---")
-calc_corr(df['tamanho'], df['review_comments'], "RQ05 - Tamanho vs Revisões")
-calc_corr(df['review_time_h'], df['review_comments'], "RQ06 - Tempo vs Revisões")
-calc_corr(df['body_length'], df['review_comments'], "RQ07 - Descrição vs Revisões")
-calc_corr(df['interacoes'], df['review_comments'], "RQ08 - Interações vs Revisões")
-
-print("\n[OK] Análise de correlação concluída com sucesso!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import os
+
+import pandas as pd
+
+import pr_store
+
+# ============================================================
+# Formato tipado do dataset final (data/processed/final_dataset).
+#
+# process_data.py grava final_dataset.parquet com um schema fixo:
+# repositório e estado categóricos, contagens em int32 e datas como
+# timestamps UTC nativos. Os scripts de análise leem por aqui,
+# carregando só as colunas que usam e empurrando filtros para o
+# leitor Parquet (grupos de linhas que não passam no filtro nem são
+# lidos). Sem pyarrow, ou sem o .parquet, cai para o CSV com os
+# mesmos tipos aplicados depois da leitura. Com o banco SQLite dos PRs
+# (pr_store.py, ex.: data/raw/prs.sqlite) como caminho, o dataset final
+# é calculado a partir das linhas que passam nos filtros, consultadas
+# pelos índices do banco.
+# ============================================================
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional
+    pa = None
+
+DATA_DIR = "data/processed"
+PARQUET_PATH = os.path.join(DATA_DIR, "final_dataset.parquet")
+CSV_PATH = os.path.join(DATA_DIR, "final_dataset.csv")
+
+# Linhas por row group: granularidade do pushdown de filtros
+ROW_GROUP_SIZE = 128 * 1024
+
+DATE_COLUMNS = ["created_at", "closed_at", "merged_at"]
+CATEGORY_COLUMNS = ["repo_full_name", "state"]
+
+SCHEMA = {
+    "repo_full_name": "category",
+    "id": "int64",
+    "number": "int32",
+    "state": "category",
+    "merged": "bool",
+    "created_at": "datetime64[ns, UTC]",
+    "closed_at": "datetime64[ns, UTC]",
+    "merged_at": "datetime64[ns, UTC]",
+    "review_time_h": "float64",
+    "changed_files": "int32",
+    "additions": "int32",
+    "deletions": "int32",
+    "body_length": "int32",
+    "comments": "int32",
+    "review_comments": "int32",
+    "participants_count": "int32",
+    "reviews_count": "int32",
+    "issue_comments_count": "int32",
+    "inline_review_comments_count": "int32",
+    # Métricas derivadas (features.py)
+    "tamanho": "int32",
+    "interacoes": "int32",
+    "total_lines": "int32",
+    "total_interactions": "int32",
+    "status": "int8",
+}
+
+# Nomes usados em versões antigas do dataset final
+LEGACY_NAMES = {"repo_name": "repo_full_name", "pr_number": "number"}
+
+OPS = {
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    "in": lambda s, v: s.isin(v),
+}
+
+
+def apply_schema(df):
+    """Converte as colunas presentes em ``df`` para os tipos do schema fixo"""
+    df = df.rename(columns=LEGACY_NAMES)
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if col in DATE_COLUMNS:
+            if not isinstance(df[col].dtype, pd.DatetimeTZDtype):
+                df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+            df[col] = df[col].astype(dtype)
+        elif dtype.startswith("int"):
+            # Contagens ausentes viram 0, como nos coletores (pr_detail.get(..., 0))
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(dtype)
+        elif dtype == "bool":
+            if df[col].dtype == object:
+                # CSV com valores ausentes: "True"/"False" lidos como texto
+                df[col] = df[col].astype(str).str.lower().isin(["true", "1"])
+            else:
+                df[col] = df[col].fillna(False).astype(bool)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def arrow_schema(columns):
+    """Schema Arrow das colunas informadas (texto categórico vira string com dicionário no Parquet)"""
+    types = {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "int8": pa.int8(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "category": pa.string(),
+        "datetime64[ns, UTC]": pa.timestamp("ns", tz="UTC"),
+    }
+    return pa.schema([(col, types[SCHEMA[col]]) for col in columns])
+
+
+def to_arrow(df):
+    df = apply_schema(df)
+    columns = [col for col in df.columns if col in SCHEMA]
+    plain = df[columns].copy()
+    for col in CATEGORY_COLUMNS:
+        if col in plain.columns:
+            plain[col] = plain[col].astype(object)
+    return pa.Table.from_pandas(plain, schema=arrow_schema(columns), preserve_index=False)
+
+
+class ParquetDatasetWriter:
+    """
+    Grava o dataset final em partes (ex.: uma por partição de PRs) em um único .parquet.
+
+    O arquivo é montado em ``<path>.tmp`` e só substitui o anterior no ``close()``.
+    Sem pyarrow nada é gravado (``enabled`` fica False).
+    """
+
+    def __init__(self, columns, path=PARQUET_PATH):
+        self.columns = list(columns)
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.enabled = pa is not None
+        self._writer = None
+        if not self.enabled:
+            print("[AVISO] pyarrow não instalado; final_dataset.parquet não gerado (apenas CSV)")
+
+    def write(self, df):
+        if not self.enabled or df.empty:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.tmp_path, arrow_schema(self.columns))
+        self._writer.write_table(to_arrow(df[self.columns]), row_group_size=ROW_GROUP_SIZE)
+
+    def close(self):
+        if not self.enabled:
+            return
+        if self._writer is None:
+            # Nenhuma linha: grava um arquivo vazio para não sobrar um dataset antigo
+            pq.write_table(arrow_schema(self.columns).empty_table(), self.tmp_path)
+        else:
+            self._writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def write_parquet(df, path=PARQUET_PATH):
+    """Grava o DataFrame como Parquet tipado; devolve False se o pyarrow não estiver instalado"""
+    writer = ParquetDatasetWriter([col for col in df.columns if col in SCHEMA], path)
+    writer.write(df)
+    writer.close()
+    return writer.enabled
+
+
+def default_path():
+    """Parquet tipado se existir (e o pyarrow estiver instalado), senão o CSV"""
+    return PARQUET_PATH if (pa is not None and os.path.exists(PARQUET_PATH)) else CSV_PATH
+
+
+def columns_in(path):
+    """Colunas gravadas no arquivo, já com os nomes atuais, sem ler os dados"""
+    if pr_store.is_store(path):
+        from process_data import COLUNAS_FINAL
+        return list(COLUNAS_FINAL)
+    if path.endswith(".parquet"):
+        names = pq.read_schema(path).names
+    else:
+        names = pd.read_csv(path, nrows=0).columns
+    return [LEGACY_NAMES.get(name, name) for name in names]
+
+
+def load_final(columns=None, filters=None, path=None):
+    """
+    Carrega o dataset final com o schema fixo.
+
+    Parâmetros
+    ----------
+    columns : list, opcional
+        Colunas a carregar (padrão: todas).
+    filters : list, opcional
+        Filtros no formato do pyarrow, ex.: ``[("reviews_count", ">", 0), ("review_time_h", ">=", 1)]``.
+        No Parquet são aplicados durante a leitura; no CSV, logo depois dela.
+    path : str, opcional
+        Arquivo .parquet ou .csv, ou o banco SQLite dos PRs (pr_store.py); por padrão
+        usa o Parquet se existir, senão o CSV.
+
+    Retorno
+    -------
+    pandas.DataFrame
+    """
+    if path is None:
+        path = default_path()
+
+    if pr_store.is_store(path):
+        return pr_store.load_final(columns, filters, path)
+
+    if path.endswith(".parquet"):
+        table = pq.read_table(
+            path,
+            columns=columns,
+            filters=filters or None,
+            read_dictionary=[col for col in CATEGORY_COLUMNS if columns is None or col in columns],
+        )
+        return apply_schema(table.to_pandas())
+
+    # CSV: lê só as colunas pedidas (e as usadas nos filtros), aceitando nomes antigos
+    usecols = None
+    if columns is not None:
+        wanted = set(columns) | {col for col, _, _ in (filters or [])}
+        wanted |= {old for old, new in LEGACY_NAMES.items() if new in wanted}
+        usecols = lambda name: name in wanted
+    df = apply_schema(pd.read_csv(path, usecols=usecols))
+    for col, op, value in filters or []:
+        df = df[OPS[op](df[col], value)]
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df.reset_index(drop=True)
@@ -0,0 +1,173 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import cli_options
+import dataset
+import pr_store
+from correlacao import correlation_table
+from features import load_features
+
+# ============================================================
+# Resumo pré-agregado para o dashboard (data/processed/index.html).
+#
+# Em vez de o navegador baixar e agregar o final_dataset.csv inteiro,
+# este script calcula aqui tudo o que os gráficos usam e grava um JSON
+# pequeno, de tamanho constante, independente do número de PRs:
+#   - totais e taxa de aceitação;
+#   - resumo de cinco números (mín., Q1, mediana, Q3, máx.) e média de
+#     cada métrica, por status (merged/closed) e por faixa de revisões;
+#   - histogramas (bins em escala log) por status;
+#   - agregados dos repositórios com mais PRs;
+#   - correlações de Spearman das RQs (correlacao.py).
+# ============================================================
+
+OUTPUT_PATH = cli_options.DASHBOARD_PATH
+
+# Nome da métrica no dashboard -> coluna do dataset final
+METRICS = {
+    "files_changed": "changed_files",
+    "total_lines": "total_lines",
+    "review_time_h": "review_time_h",
+    "body_length": "body_length",
+    "num_participants": "participants_count",
+    "num_comments": "comments",
+}
+
+# Faixas de número de revisões (review_comments) usadas nos gráficos RQ05-RQ08
+REVIEW_GROUPS = [("0-5", 0, 5), ("6-10", 6, 10), ("11-20", 11, 20), ("20+", 21, np.inf)]
+
+HISTOGRAM_BINS = 20
+TOP_REPOS = 50
+
+
+def five_numbers(values):
+    """Resumo de cinco números, média e n de uma série (None nos campos se ela estiver vazia)"""
+    values = values.dropna()
+    if values.empty:
+        return {"n": 0, "min": None, "q1": None, "median": None, "q3": None, "max": None, "mean": None}
+    q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+    return {
+        "n": int(len(values)),
+        "min": _round(values.min()),
+        "q1": _round(q1),
+        "median": _round(median),
+        "q3": _round(q3),
+        "max": _round(values.max()),
+        "mean": _round(values.mean()),
+    }
+
+
+def _round(value):
+    return round(float(value), 3)
+
+
+def histogram(merged, closed, bins=HISTOGRAM_BINS):
+    """Contagens por bin para merged e closed, com bins em escala log1p (as métricas têm cauda longa)"""
+    upper = max(merged.max() if len(merged) else 0, closed.max() if len(closed) else 0, 0)
+    edges = np.expm1(np.linspace(0, np.log1p(upper), bins + 1)) if upper > 0 else np.array([0.0, 1.0])
+    return {
+        "edges": [_round(edge) for edge in edges],
+        "merged": np.histogram(merged.clip(lower=0), bins=edges)[0].tolist(),
+        "closed": np.histogram(closed.clip(lower=0), bins=edges)[0].tolist(),
+    }
+
+
+def repo_aggregates(df, top=TOP_REPOS):
+    """Totais e medianas por repositório, para os ``top`` repositórios com mais PRs"""
+    if "repo_full_name" not in df.columns:
+        return []
+    grouped = df.groupby("repo_full_name", observed=True)
+    table = pd.DataFrame({
+        "prs": grouped.size(),
+        "merged": grouped["merged"].sum(),
+        "median_review_time_h": grouped["review_time_h"].median(),
+        "median_total_lines": grouped["total_lines"].median(),
+        "median_files_changed": grouped["changed_files"].median(),
+    }).sort_values("prs", ascending=False).head(top)
+    return [
+        {
+            "repo": repo,
+            "prs": int(row.prs),
+            "merged": int(row.merged),
+            "acceptance_rate": _round(row.merged / row.prs),
+            "median_review_time_h": _round(row.median_review_time_h),
+            "median_total_lines": _round(row.median_total_lines),
+            "median_files_changed": _round(row.median_files_changed),
+        }
+        for repo, row in table.iterrows()
+    ]
+
+
+def build_summary(df):
+    """Dicionário com tudo o que o dashboard exibe"""
+    df = df.copy()
+    df["merged"] = df["status"] == 1
+    merged = df[df["merged"]]
+    closed = df[~df["merged"]]
+
+    total = len(df)
+    summary = {
+        "stats": {
+            "total": total,
+            "merged": int(len(merged)),
+            "closed": int(len(closed)),
+            "acceptance_rate": _round(len(merged) / total * 100) if total else 0.0,
+        },
+        "by_status": {
+            "merged": {name: five_numbers(merged[col]) for name, col in METRICS.items()},
+            "closed": {name: five_numbers(closed[col]) for name, col in METRICS.items()},
+        },
+        "review_groups": {},
+        "histograms": {name: histogram(merged[col], closed[col]) for name, col in METRICS.items()},
+        "repos": repo_aggregates(df),
+        "correlations": [],
+    }
+
+    for label, low, high in REVIEW_GROUPS:
+        group = df[df["review_comments"].between(low, high)]
+        summary["review_groups"][label] = {name: five_numbers(group[col]) for name, col in METRICS.items()}
+
+    if total > 2:
+        table = correlation_table(df.dropna(subset=["review_time_h"]))
+        summary["correlations"] = [
+            {
+                "rq": row.rq,
+                "descricao": row.descricao,
+                "x": row.x,
+                "y": row.y,
+                "rho": None if np.isnan(row.rho) else _round(row.rho),
+                "p_value": None if np.isnan(row.p_value) else float(row.p_value),
+                "n": int(row.n),
+            }
+            for row in table.itertuples()
+        ]
+    return summary
+
+
+def export(output_path=OUTPUT_PATH, path=None, filters=None):
+    columns = ["status", "review_comments", "tamanho", "interacoes", *sorted(set(METRICS.values()))]
+    path = path or dataset.default_path()
+    if "repo_full_name" in dataset.columns_in(path):
+        columns.insert(0, "repo_full_name")
+    df = load_features(columns=columns, filters=filters, path=path)
+
+    summary = build_summary(df)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+    print(f"[OK] Resumo do dashboard ({len(df)} PRs, {os.path.getsize(output_path)} bytes) salvo em {output_path}")
+
+
+def main(argv=None):
+    parser = cli_options.build_parser("export_dashboard")
+    args = parser.parse_args(argv)
+    export(args.output, args.input, pr_store.query_filters(args.repo, args.since, args.until))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import hashlib
+import os
+
+import pandas as pd
+
+import dataset
+
+# ============================================================
+# Métricas derivadas dos PRs, calculadas em um único lugar.
+#
+# process_data.py grava estas colunas junto com o dataset final, então
+# correlacao.py e generate_graphs.py apenas as carregam. Para datasets
+# antigos, que não têm as colunas, load_features() as calcula e guarda
+# o resultado em .features/, ao lado do arquivo, indexado pelo hash do
+# arquivo de entrada: enquanto o arquivo não mudar, o cálculo não se
+# repete.
+# ============================================================
+
+CACHE_DIR = ".features"
+
+# Versão das fórmulas abaixo; mudar invalida o cache
+FEATURES_VERSION = 1
+
+FEATURE_COLUMNS = ["review_time_h", "tamanho", "interacoes", "total_lines", "total_interactions", "status"]
+
+# Colunas do dataset necessárias para calcular as métricas
+SOURCE_COLUMNS = [
+    "created_at", "closed_at", "merged_at", "additions", "deletions",
+    "changed_files", "comments", "review_comments", "participants_count",
+]
+
+
+def add_features(df):
+    """
+    Acrescenta as métricas derivadas a ``df`` (que precisa das SOURCE_COLUMNS).
+
+    - review_time_h: horas entre a criação e o merge (ou o fechamento, se não houve merge);
+    - tamanho: additions + deletions + changed_files;
+    - interacoes: comments + review_comments;
+    - total_lines: additions + deletions;
+    - total_interactions: comments + participants_count;
+    - status: 1 se o PR foi aceito (merged_at preenchido), 0 caso contrário.
+    """
+    end_date = df["merged_at"].fillna(df["closed_at"])
+    df["review_time_h"] = (end_date - df["created_at"]).dt.total_seconds() / 3600
+    df["tamanho"] = df["additions"] + df["deletions"] + df["changed_files"]
+    df["interacoes"] = df["comments"] + df["review_comments"]
+    df["total_lines"] = df["additions"] + df["deletions"]
+    df["total_interactions"] = df["comments"] + df["participants_count"]
+    df["status"] = df["merged_at"].notna().astype("int8")
+    return df
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    ext = ".parquet" if dataset.pa is not None else ".pkl"
+    return os.path.join(cache_dir, f"{key}{ext}")
+
+
+def _compute_cached(path):
+    """Dataset completo com as métricas, calculadas uma vez por conteúdo de ``path``"""
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    key = f"{file_hash(path)[:32]}-v{FEATURES_VERSION}"
+    cache_path = _cache_path(cache_dir, key)
+    if os.path.exists(cache_path):
+        if cache_path.endswith(".parquet"):
+            return dataset.load_final(path=cache_path)
+        return pd.read_pickle(cache_path)
+
+    df = add_features(dataset.load_final(path=path))
+    os.makedirs(cache_dir, exist_ok=True)
+    # Só a versão mais recente do dataset fica no cache
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    tmp_path = f"{cache_path}.tmp"
+    if cache_path.endswith(".parquet"):
+        dataset.write_parquet(df, tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return df
+
+
+def load_features(columns=None, filters=None, path=None):
+    """
+    Carrega o dataset final com as métricas derivadas (mesmos parâmetros de ``dataset.load_final``).
+
+    Se o arquivo já traz as métricas (gerado pelo process_data.py atual), a
+    leitura é direta, com projeção de colunas e filtros no leitor. Caso
+    contrário as métricas vêm do cache por hash do arquivo.
+    """
+    path = path or dataset.default_path()
+    if set(FEATURE_COLUMNS) <= set(dataset.columns_in(path)):
+        return dataset.load_final(columns=columns, filters=filters, path=path)
+
+    df = _compute_cached(path)
+    for col, op, value in filters or []:
+        df = df[dataset.OPS[op](df[col], value)]
+    if columns is not None:
+        df = df[columns]
+    return df.reset_index(drop=True)
@@ -1,141 +1,496 @@
-import requests
-import os
-import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
-import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import threading
+import collector_metrics
+import github_client
+import http_cache
+import rate_limit
+import checkpoint
+import partitions
+import pr_store
+from pagination import count_items, iter_logins, read_fields, read_items
+from pr_record import PullRequestRecord, RepoRows, as_dicts
+from work_queue import WorkQueue, default_worker_id
+from checkpoint import max_watermark, watermark_before
+from fetch_prs_graphql import collect_repo_graphql, iter_repo_graphql
+
+from github_client import API_URL
 
 load_dotenv()
-TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"Bearer {TOKEN}"}
 
 
-def fetch_pr_details(repo_full_name, pr_number):
-    """Busca detalhes completos de um PR específico"""
-    url = f"https://api.github.com/repos/{repo_full_name}/pulls/{pr_number}"
-    r = requests.get(url, headers=HEADERS)
+# Campos do detalhe do PR usados no dataset (o resto da resposta é descartado na leitura)
+DETAIL_FIELDS = [
+    "id", "number", "title", "user.login", "created_at", "updated_at", "closed_at", "merged_at", "comments",
+    "review_comments", "changed_files", "additions", "deletions", "state", "merged", "body",
+]
+
+
+def fetch_pr_fields(repo_full_name, pr_number):
+    """Só os campos de DETAIL_FIELDS do detalhe de um PR, lidos em streaming"""
+    url = f"{API_URL}/repos/{repo_full_name}/pulls/{pr_number}"
+    r = github_client.get(url, stream=True)
     if r.status_code != 200:
         print(f"[ERRO] Falha ao buscar PR {pr_number} em {repo_full_name}: {r.json()}")
         return None
-    return r.json()
+    return read_fields(r, DETAIL_FIELDS)
 
 
-def fetch_reviews(repo_full_name, pr_number):
-    """Busca todas as revisões (reviews) do PR"""
-    url = f"https://api.github.com/repos/{repo_full_name}/pulls/{pr_number}/reviews"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code != 200:
-        return []
-    return r.json()
+def collect_pr(repo_full_name, pr_number):
+    """Coleta detalhes, revisões e comentários de um PR e monta a linha do dataset"""
+    detail = fetch_pr_fields(repo_full_name, pr_number)
+    if not detail:
+        return None
 
+    # Das listas só interessa o login de cada autor: quantidade de itens e participantes únicos
+    base = f"{API_URL}/repos/{repo_full_name}"
+    participants = set()
+    if detail.get("user.login"):
+        participants.add(detail["user.login"])
 
-def fetch_issue_comments(repo_full_name, pr_number):
-    """Busca comentários gerais do PR (não inline)"""
-    url = f"https://api.github.com/repos/{repo_full_name}/issues/{pr_number}/comments"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code != 200:
-        return []
-    return r.json()
+    counts = []
+    for url in (f"{base}/pulls/{pr_number}/reviews",       # revisões
+                f"{base}/issues/{pr_number}/comments"):    # comentários gerais (não inline)
+        count = 0
+        for login in iter_logins(url):
+            count += 1
+            if login:
+                participants.add(login)
+        counts.append(count)
+    reviews_count, issue_comments_count = counts
 
+    # Comentários de revisão (inline): todo comentário inline pertence a uma revisão, então
+    # seus autores já estão entre os das revisões e basta a contagem (no máximo 2 requisições)
+    inline_review_comments_count = count_items(f"{base}/pulls/{pr_number}/comments")
 
-def fetch_review_comments(repo_full_name, pr_number):
-    """Busca comentários de revisão (inline)"""
-    url = f"https://api.github.com/repos/{repo_full_name}/pulls/{pr_number}/comments"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code != 200:
-        return []
-    return r.json()
-
-
-def fetch_prs(repo_full_name, state="all", max_pages=2):
-    """Busca PRs de um repositório e coleta métricas adicionais"""
-    prs = []
-    print(f"\n[INFO] Coletando PRs de {repo_full_name}...")
-    for page in range(1, max_pages + 1):
-        url = f"https://api.github.com/repos/{repo_full_name}/pulls?state={state}&per_page=100&page={page}"
-        print(f"[INFO] Requisitando página {page} de PRs em {repo_full_name}")
-        r = requests.get(url, headers=HEADERS)
-
-        if r.status_code != 200:
-            print(f"[ERRO] {repo_full_name} - {r.json()}")
-            break
-
-        data = r.json()
-        if not data:
-            print(f"[INFO] Nenhum PR encontrado na página {page} de {repo_full_name}")
-            break
-
-        for i, pr in enumerate(data, start=1):
-            print(f"    [DEBUG] Processando PR #{pr['number']} ({i}/{len(data)}) da página {page}")
-            pr_detail = fetch_pr_details(repo_full_name, pr["number"])
-            if not pr_detail:
-                continue
-
-            # Buscar informações extras
-            reviews = fetch_reviews(repo_full_name, pr["number"])
-            issue_comments = fetch_issue_comments(repo_full_name, pr["number"])
-            review_comments = fetch_review_comments(repo_full_name, pr["number"])
-
-            # Contar participantes únicos
-            participants = set()
-            if pr_detail.get("user") and pr_detail["user"].get("login"):
-                participants.add(pr_detail["user"]["login"])
-
-            for review in reviews:
-                if review.get("user") and review["user"].get("login"):
-                    participants.add(review["user"]["login"])
-
-            for comment in issue_comments:
-                if comment.get("user") and comment["user"].get("login"):
-                    participants.add(comment["user"]["login"])
-
-            for comment in review_comments:
-                if comment.get("user") and comment["user"].get("login"):
-                    participants.add(comment["user"]["login"])
-
-            prs.append({
-                "repo_full_name": repo_full_name,
-                "id": pr_detail["id"],
-                "number": pr_detail["number"],
-                "title": pr_detail["title"],
-                "user": pr_detail["user"]["login"] if pr_detail["user"] else None,
-                "created_at": pr_detail["created_at"],
-                "closed_at": pr_detail["closed_at"],
-                "merged_at": pr_detail["merged_at"],
-                "comments": pr_detail.get("comments", 0),
-                "review_comments": pr_detail.get("review_comments", 0),
-                "changed_files": pr_detail.get("changed_files", 0),
-                "additions": pr_detail.get("additions", 0),
-                "deletions": pr_detail.get("deletions", 0),
-                "state": pr_detail["state"],
-                "merged": pr_detail.get("merged", False),
-                "body_length": len(pr_detail["body"]) if pr_detail.get("body") else 0,
-
-                # Novas métricas
-                "reviews_count": len(reviews),
-                "issue_comments_count": len(issue_comments),
-                "inline_review_comments_count": len(review_comments),
-                "participants_count": len(participants)
-            })
-
-            # Pausa leve para evitar rate limit
-            time.sleep(0.25)
-
-        print(f"[INFO] Página {page} de {repo_full_name} concluída. PRs coletados até agora: {len(prs)}")
-
-    print(f"[OK] Total de PRs coletados em {repo_full_name}: {len(prs)}")
-    return prs
+    body = detail.get("body")
+    record = PullRequestRecord(
+        repo_full_name=repo_full_name,
+        id=detail.get("id"),
+        number=detail.get("number"),
+        title=detail.get("title"),
+        user=detail.get("user.login"),
+        created_at=detail.get("created_at"),
+        updated_at=detail.get("updated_at"),
+        closed_at=detail.get("closed_at"),
+        merged_at=detail.get("merged_at"),
+        comments=detail.get("comments", 0),
+        review_comments=detail.get("review_comments", 0),
+        changed_files=detail.get("changed_files", 0),
+        additions=detail.get("additions", 0),
+        deletions=detail.get("deletions", 0),
+        state=detail.get("state"),
+        merged=detail.get("merged", False),
+        body_length=len(body) if body else 0,
 
+        # Novas métricas
+        reviews_count=reviews_count,
+        issue_comments_count=issue_comments_count,
+        inline_review_comments_count=inline_review_comments_count,
+        participants_count=len(participants),
+    )
 
-if __name__ == "__main__":
-    repos = pd.read_csv("data/processed/top_repos.csv")
+    collector_metrics.get_metrics().pr_collected()
+    return record
+
+
+def fetch_prs(repo_full_name, state="all", max_pages=2, workers=1):
+    """
+    Busca PRs de um repositório e coleta métricas adicionais.
+
+    Com ``workers > 1`` os PRs de cada página são processados em paralelo por
+    um pool de threads; a ordem das linhas é a mesma do modo serial.
+    """
+    prs, _ = collect_repo(repo_full_name, state, max_pages, workers)
+    return list(as_dicts(prs))
+
+
+def collect_repo(repo_full_name, state="all", max_pages=2, workers=1, since=None):
+    """
+    Igual a ``fetch_prs``, mas devolve também o maior ``updated_at`` coletado (watermark).
+
+    Com ``since`` os PRs são listados por data de atualização e a coleta para no
+    primeiro PR que não mudou desde esse instante (modo incremental); nesse modo
+    ``max_pages`` não se aplica, para que nenhum PR modificado fique para trás.
+    """
+    rows = RepoRows(iter_repo(repo_full_name, state, max_pages, workers, since))
+    prs = list(rows)
+    return prs, rows.watermark
+
+
+def iter_repo(repo_full_name, state="all", max_pages=2, workers=1, since=None):
+    """
+    Gera os PRs do repositório à medida que cada página é coletada e devolve o watermark.
+
+    Mesmos parâmetros de ``collect_repo``; só a página em andamento fica em memória.
+    PRs cuja coleta falhou não entram no watermark e o limitam (ver
+    ``checkpoint.watermark_before``), então a próxima execução incremental os busca de novo.
+    """
+    collected = 0
+    watermark = None
+    pending = None
+    collector_metrics.log(f"\n[INFO] Coletando PRs de {repo_full_name}...")
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    page = 0
+    try:
+        while since or page < max_pages:
+            page += 1
+            url = f"{API_URL}/repos/{repo_full_name}/pulls?state={state}&per_page=100&page={page}"
+            if since:
+                url += "&sort=updated&direction=desc"
+            collector_metrics.log(f"[INFO] Requisitando página {page} de PRs em {repo_full_name}")
+            r = github_client.get(url, stream=True)
+
+            if r.status_code != 200:
+                print(f"[ERRO] {repo_full_name} - {r.json()}")
+                break
+
+            # Da listagem só são usados o número e o updated_at de cada PR
+            data = list(read_items(r, ["number", "updated_at"]))
+            if not data:
+                collector_metrics.log(f"[INFO] Nenhum PR encontrado na página {page} de {repo_full_name}")
+                break
+
+            changed = [pr for pr in data if not since or (pr.get("updated_at") or "") > since]
+            numbers = [pr["number"] for pr in changed]
+            if pool:
+                # map preserva a ordem de entrada, então o resultado é idêntico ao serial
+                rows = pool.map(lambda number: collect_pr(repo_full_name, number), numbers)
+            else:
+                rows = []
+                for i, number in enumerate(numbers, start=1):
+                    collector_metrics.log(f"    [DEBUG] Processando PR #{number} ({i}/{len(numbers)}) da página {page}")
+                    rows.append(collect_pr(repo_full_name, number))
+
+            for pr, row in zip(changed, rows):
+                if not row:
+                    pending = min(filter(None, (pending, pr.get("updated_at"))), default=None)
+                    continue
+                collected += 1
+                watermark = max_watermark(watermark, row.updated_at)
+                yield row
+
+            collector_metrics.log(f"[INFO] Página {page} de {repo_full_name} concluída. PRs coletados até agora: {collected}")
+            if len(changed) < len(data):
+                # Lista ordenada por atualização: o restante já está no checkpoint
+                break
+    finally:
+        if pool:
+            pool.shutdown()
+
+    collector_metrics.log(f"[OK] Total de PRs coletados em {repo_full_name}: {collected}")
+    return watermark_before(watermark, pending)
+
+
+def fetch_all_prs(repo_names, workers=1, repo_workers=1, max_pages=2, backend="rest"):
+    """
+    Coleta os PRs de vários repositórios e devolve todas as linhas em memória.
+
+    ``repo_workers`` controla quantos repositórios são coletados ao mesmo tempo e
+    ``workers`` quantos PRs de cada repositório; o total de requisições
+    simultâneas é no máximo ``workers * repo_workers``. Com ``backend="graphql"``
+    cada página de PRs vem em uma única consulta e ``workers`` não se aplica.
+    Para coletas grandes use ``collect_to_dataset``, que grava em disco.
+    """
     all_prs = []
-    for repo in tqdm(repos["full_name"].tolist(), desc="Repositórios"):
-        print(f"\n========== Iniciando coleta do repo: {repo} ==========")
-        prs_repo = fetch_prs(repo)
-        all_prs.extend(prs_repo)
-        print(f"[INFO] Coleta finalizada para {repo}, total acumulado: {len(all_prs)}\n")
-
-    df = pd.DataFrame(all_prs)
-    df.to_csv("data/raw/prs_sample.csv", index=False)
-    print("[OK] Arquivo salvo em data/raw/prs_sample.csv")
+
+    def run(repo):
+        return _collect(repo, backend, max_pages, workers)[0]
+
+    for repo, prs_repo in _map_repos(run, repo_names, repo_workers):
+        all_prs.extend(as_dicts(prs_repo))
+        collector_metrics.log(f"[INFO] Coleta finalizada para {repo}, total acumulado: {len(all_prs)}\n")
+
+    return all_prs
+
+
+def collect_to_dataset(repo_names, dataset_dir=checkpoint.DEFAULT_DIR, workers=1, repo_workers=1,
+                       max_pages=2, backend="rest", incremental=False, fmt="auto", store_path=None):
+    """
+    Coleta os PRs gravando cada repositório como uma partição do dataset em disco.
+
+    Os PRs vão para a partição em lotes de partitions.BATCH_SIZE durante a
+    coleta, então a memória não depende do tamanho do repositório. A partição e o
+    watermark (``state.json``) funcionam como checkpoint: repositórios concluídos
+    em uma execução anterior não são coletados de novo e, com
+    ``incremental=True``, recebem apenas os PRs modificados desde o watermark.
+    Com ``store_path`` os PRs coletados também são gravados (upsert) no banco
+    SQLite de pr_store.py. Devolve o total de PRs no dataset.
+    """
+    state = checkpoint.load_state(dataset_dir)
+    total = 0
+
+    def run(repo):
+        return collect_repo_to_dataset(repo, dataset_dir, state, workers, max_pages, backend, incremental, fmt,
+                                       store_path)
+
+    for repo, count in _map_repos(run, repo_names, repo_workers):
+        total += count
+        collector_metrics.log(f"[INFO] Coleta finalizada para {repo}, total acumulado: {total}\n")
+
+    return total
+
+
+def collect_repo_to_dataset(repo, dataset_dir, state, workers=1, max_pages=2, backend="rest",
+                            incremental=False, fmt="auto", store_path=None):
+    """Coleta um repositório e grava sua partição (e o upsert no banco); devolve quantos PRs ela tem"""
+    entry = state.get(repo) or {}
+    if entry.get("done") and not incremental:
+        collector_metrics.log(f"[INFO] {repo} já coletado ({entry.get('rows', 0)} PRs), mantendo checkpoint")
+        return entry.get("rows", 0)
+
+    since = entry.get("watermark") if entry.get("done") else None
+    rows = RepoRows(_iter_collect(repo, backend, max_pages, workers, since))
+    # Só os PRs coletados agora vão para o banco: no modo incremental, os modificados desde o watermark
+    store = pr_store.PRStore(store_path) if store_path else None
+    try:
+        if since:
+            # Os PRs modificados ficam em memória para a mescla; a partição salva é lida arquivo a arquivo
+            changed = list(as_dicts(rows))
+            if store:
+                store.upsert(changed)
+            collector_metrics.log(f"[INFO] {len(changed)} PRs atualizados em {repo} desde {since}")
+            new_rows, on_batch = checkpoint.merge_partition(dataset_dir, repo, changed), None
+        else:
+            new_rows, on_batch = as_dicts(rows), (store.upsert if store else None)
+        return checkpoint.save_repo(dataset_dir, repo, new_rows,
+                                    lambda: max_watermark(entry.get("watermark"), rows.watermark),
+                                    state, fmt, on_batch)
+    finally:
+        if store:
+            store.close()
+
+
+def run_worker(queue_path, dataset_dir=checkpoint.DEFAULT_DIR, worker_id=None, workers=1,
+               max_pages=2, backend="rest", incremental=False, fmt="auto", store_path=None):
+    """
+    Worker da coleta distribuída: pega repositórios da fila até ela esvaziar.
+
+    Vários workers (processos ou máquinas com o mesmo sistema de arquivos)
+    podem rodar ao mesmo tempo sobre a mesma fila e o mesmo ``dataset_dir``.
+    O lease do repositório em andamento é renovado periodicamente; se o worker
+    morrer, o lease vence e o repositório volta para a fila.
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(queue_path)
+    done = 0
+    try:
+        while True:
+            repo = queue.lease(worker_id)
+            if repo is None:
+                break
+            collector_metrics.log(f"[INFO] [{worker_id}] Lease de {repo}")
+
+            stop = threading.Event()
+
+            def heartbeat():
+                heartbeat_queue = WorkQueue(queue_path)
+                while not stop.wait(queue.lease_seconds / 3):
+                    if not heartbeat_queue.renew(repo, worker_id):
+                        print(f"[AVISO] [{worker_id}] Lease de {repo} perdido")
+                        break
+                heartbeat_queue.close()
+
+            beat = threading.Thread(target=heartbeat, daemon=True)
+            beat.start()
+            try:
+                # Relê o estado a cada repositório: outros workers o atualizam
+                state = checkpoint.load_state(dataset_dir)
+                count = collect_repo_to_dataset(repo, dataset_dir, state, workers, max_pages,
+                                                backend, incremental, fmt, store_path)
+            except Exception as e:
+                print(f"[ERRO] [{worker_id}] Falha em {repo}: {e}")
+                queue.fail(repo, worker_id, e)
+            else:
+                queue.complete(repo, worker_id, count)
+                collector_metrics.get_metrics().repo_done()
+                done += 1
+            finally:
+                stop.set()
+                beat.join()
+    finally:
+        queue.close()
+    print(f"[OK] [{worker_id}] Worker finalizado, {done} repositórios concluídos")
+    return done
+
+
+def _worker_process(index, processes, kwargs, metrics_options=None):
+    """Ponto de entrada de cada processo local: recebe sua fatia do pool de tokens"""
+    tokens = rate_limit.load_tokens()
+    if len(tokens) >= processes:
+        tokens = tokens[index::processes]
+    github_client.configure(kwargs.get("workers", 1), tokens=tokens or None)
+    metrics_options = metrics_options or {}
+    path = metrics_options.get("path")
+    # Cada processo exporta o próprio arquivo; a linha de progresso fica desligada
+    collector_metrics.start(collector_metrics.process_path(path, index) if path else None,
+                            metrics_options.get("interval", collector_metrics.EXPORT_INTERVAL),
+                            quiet_mode=metrics_options.get("quiet", False), progress=False)
+    try:
+        run_worker(worker_id=f"{default_worker_id()}-{index}", **kwargs)
+    finally:
+        collector_metrics.stop()
+
+
+def run_workers(processes, metrics_options=None, **kwargs):
+    """Executa ``processes`` workers locais em processos separados e espera todos terminarem"""
+    procs = [
+        multiprocessing.Process(target=_worker_process, args=(i, processes, kwargs, metrics_options))
+        for i in range(processes)
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+
+def _collect(repo, backend, max_pages, workers, since=None):
+    if backend == "graphql":
+        return collect_repo_graphql(repo, max_pages=max_pages, since=since)
+    return collect_repo(repo, max_pages=max_pages, workers=workers, since=since)
+
+
+def _iter_collect(repo, backend, max_pages, workers, since=None):
+    """Gerador de ``_collect``: PRs à medida que são coletados; devolve o watermark"""
+    if backend == "graphql":
+        return iter_repo_graphql(repo, max_pages=max_pages, since=since)
+    return iter_repo(repo, max_pages=max_pages, workers=workers, since=since)
+
+
+def _map_repos(run, repo_names, repo_workers):
+    """Aplica ``run`` a cada repositório (em paralelo se ``repo_workers > 1``), na ordem de entrada"""
+    metrics = collector_metrics.get_metrics()
+    metrics.set_repos(len(repo_names))
+    # No modo silencioso a linha de progresso de collector_metrics substitui a barra
+    progress = dict(total=len(repo_names), desc="Repositórios", disable=collector_metrics.quiet)
+    if repo_workers > 1:
+        with ThreadPoolExecutor(max_workers=repo_workers) as pool:
+            results = pool.map(run, repo_names)
+            for repo, result in tqdm(zip(repo_names, results), **progress):
+                metrics.repo_done()
+                yield repo, result
+    else:
+        for repo in tqdm(repo_names, **progress):
+            collector_metrics.log(f"\n========== Iniciando coleta do repo: {repo} ==========")
+            result = run(repo)
+            metrics.repo_done()
+            yield repo, result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Coleta PRs dos repositórios populares do GitHub")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="PRs processados em paralelo dentro de cada repositório (padrão: 1, serial)")
+    parser.add_argument("--repo-workers", type=int, default=1,
+                        help="repositórios coletados em paralelo (padrão: 1, serial)")
+    parser.add_argument("--backend", choices=["rest", "graphql"], default="rest",
+                        help="API usada na coleta: REST (1 + 4 chamadas por PR) ou GraphQL (1 consulta por página)")
+    parser.add_argument("--max-pages", type=int, default=2,
+                        help="páginas de 100 PRs por repositório (padrão: 2)")
+    parser.add_argument("--repos", default="data/processed/top_repos.csv",
+                        help="CSV com a coluna full_name dos repositórios")
+    parser.add_argument("--dataset-dir", default=checkpoint.DEFAULT_DIR,
+                        help="dataset particionado por repositório (também guarda os checkpoints)")
+    parser.add_argument("--format", choices=["auto", "parquet", "arrow", "csv"], default="auto",
+                        help="formato das partições (auto: Parquet se o pyarrow estiver instalado)")
+    parser.add_argument("--output", default="data/raw/prs_sample.csv",
+                        help="CSV consolidado gerado a partir das partições")
+    parser.add_argument("--no-csv", action="store_true",
+                        help="não gera o CSV consolidado, apenas o dataset particionado")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignora os checkpoints existentes e coleta tudo de novo")
+    parser.add_argument("--incremental", action="store_true",
+                        help="atualiza repositórios já coletados apenas com PRs modificados desde o último watermark "
+                             "(todos eles, sem o limite de --max-pages)")
+    parser.add_argument("--queue",
+                        help="fila SQLite da coleta distribuída (ex.: data/raw/queue.sqlite); "
+                             "vários processos/máquinas podem usar a mesma fila")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="com --queue, quantos processos worker iniciar nesta máquina")
+    parser.add_argument("--worker-id", help="identificador deste worker na fila (padrão: host-pid)")
+    parser.add_argument("--store", default=pr_store.DEFAULT_PATH,
+                        help="banco SQLite onde os PRs coletados são gravados com upsert (padrão: %(default)s)")
+    parser.add_argument("--no-store", action="store_true", help="não grava os PRs no banco SQLite")
+    parser.add_argument("--quiet", action="store_true",
+                        help="uma única linha de progresso (repositórios, PRs, req/s, orçamento) "
+                             "no lugar dos logs por PR e por página")
+    parser.add_argument("--metrics-file",
+                        help="exporta as métricas da coleta periodicamente (.json, ou .prom/.txt "
+                             "no formato de texto do Prometheus)")
+    parser.add_argument("--metrics-interval", type=float, default=collector_metrics.EXPORT_INTERVAL,
+                        help="segundos entre exportações de --metrics-file (padrão: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def collect_with_queue(args, repo_names):
+    """Modo distribuído: popula a fila e roda os workers desta máquina"""
+    queue = WorkQueue(args.queue)
+    if args.restart:
+        queue.reset()
+    queue.populate(repo_names)
+
+    worker_kwargs = dict(queue_path=args.queue, dataset_dir=args.dataset_dir, workers=args.workers,
+                         max_pages=args.max_pages, backend=args.backend,
+                         incremental=args.incremental, fmt=args.format, store_path=args.store)
+    if args.processes > 1:
+        metrics_options = dict(path=args.metrics_file, interval=args.metrics_interval, quiet=args.quiet)
+        run_workers(args.processes, metrics_options=metrics_options, **worker_kwargs)
+    else:
+        github_client.configure(args.workers)
+        run_worker(worker_id=args.worker_id, **worker_kwargs)
+
+    stats = queue.stats()
+    finished = queue.finished()
+    queue.close()
+    print(f"[INFO] Fila: {stats}")
+    if not finished:
+        print("[INFO] Ainda há repositórios em andamento em outros workers; CSV consolidado não gerado")
+    return finished
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.no_store:
+        args.store = None
+    import pandas as pd
+    repo_names = pd.read_csv(args.repos)["full_name"].tolist()
+    if args.restart:
+        checkpoint.clear(args.dataset_dir)
+
+    if not (args.queue and args.processes > 1):
+        collector_metrics.start(args.metrics_file, args.metrics_interval, quiet_mode=args.quiet)
+
+    if args.queue:
+        export = collect_with_queue(args, repo_names)
+    else:
+        # Uma conexão keep-alive por requisição simultânea
+        github_client.configure(args.workers * args.repo_workers)
+        total = collect_to_dataset(
+            repo_names,
+            dataset_dir=args.dataset_dir,
+            workers=args.workers,
+            repo_workers=args.repo_workers,
+            max_pages=args.max_pages,
+            backend=args.backend,
+            incremental=args.incremental,
+            fmt=args.format,
+            store_path=args.store,
+        )
+        export = True
+
+    collector_metrics.stop()
+    if not args.queue:
+        print(f"[OK] {total} PRs no dataset particionado em {args.dataset_dir}")
+
+    if export and not args.no_csv:
+        partitions.export_csv(args.dataset_dir, args.output, repo_names)
+        print(f"[OK] Arquivo salvo em {args.output}")
+    http_cache.report()
+    collector_metrics.report()
+
+
+if __name__ == "__main__":
+    main()
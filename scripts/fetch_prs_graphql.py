@@ -0,0 +1,240 @@
+import collector_metrics
+import github_client
+from checkpoint import max_watermark, watermark_before
+from github_client import GRAPHQL_URL
+from pr_record import PullRequestRecord, RepoRows, as_dicts
+
+# ============================================================
+# Backend de coleta de PRs via API GraphQL do GitHub.
+#
+# Uma única consulta traz uma página inteira de PRs com tamanho,
+# descrição, revisões, comentários e autores, substituindo as
+# 1 + 4 chamadas REST por PR do backend padrão (fetch_prs.py).
+# As linhas geradas têm exatamente as mesmas colunas.
+#
+# Comentários e revisões vêm de 100 em 100 dentro de cada PR; em PRs
+# com mais que isso as páginas seguintes são buscadas com consultas
+# próprias (CONNECTION_QUERY), para que participantes e comentários
+# inline contem todos os itens, como no backend REST.
+# ============================================================
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $states: [PullRequestState!],
+      $orderBy: IssueOrder!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $first, after: $after, states: $states, orderBy: $orderBy) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        number
+        title
+        author { login }
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        state
+        merged
+        additions
+        deletions
+        changedFiles
+        body
+        comments(first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { %(comments)s } }
+        reviews(first: 100) { totalCount pageInfo { hasNextPage endCursor } nodes { %(reviews)s } }
+      }
+    }
+  }
+  rateLimit { cost remaining resetAt }
+}
+"""
+
+# Campos lidos de cada item das conexões aninhadas do PR
+CONNECTION_FIELDS = {
+    "comments": "author { login }",
+    "reviews": "author { login } comments { totalCount }",
+}
+PULL_REQUESTS_QUERY = PULL_REQUESTS_QUERY % CONNECTION_FIELDS
+
+# Páginas seguintes de uma conexão (comments ou reviews) de um único PR
+CONNECTION_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      %(connection)s(first: 100, after: $after) { pageInfo { hasNextPage endCursor } nodes { %(fields)s } }
+    }
+  }
+}
+"""
+
+# Equivalência entre o parâmetro "state" da API REST e os estados GraphQL
+STATES = {
+    "all": None,
+    "open": ["OPEN"],
+    "closed": ["CLOSED", "MERGED"],
+}
+
+
+def complete_connections(repo_full_name, node):
+    """
+    Busca as páginas restantes de comentários e revisões de ``node`` (PRs com mais de 100).
+
+    Os itens são acrescentados a ``node[conexão]["nodes"]``. Devolve False se
+    alguma página falhou; nesse caso as contagens do PR ficam parciais.
+    """
+    owner, name = repo_full_name.split("/", 1)
+    complete = True
+    for connection, fields in CONNECTION_FIELDS.items():
+        page_info = node[connection].get("pageInfo") or {}
+        query = CONNECTION_QUERY % {"connection": connection, "fields": fields}
+        while page_info.get("hasNextPage"):
+            variables = {"owner": owner, "name": name, "number": node["number"], "after": page_info["endCursor"]}
+            r = github_client.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+            payload = r.json() if r.status_code == 200 else {}
+            pull_request = ((payload.get("data") or {}).get("repository") or {}).get("pullRequest")
+            if r.status_code != 200 or payload.get("errors") or not pull_request:
+                print(f"[ERRO] {repo_full_name}#{node['number']} - {connection}: "
+                      f"{payload.get('errors') or r.text[:200]}")
+                complete = False
+                break
+            page = pull_request[connection]
+            node[connection]["nodes"].extend(page["nodes"])
+            page_info = page["pageInfo"]
+    return complete
+
+
+def node_to_row(repo_full_name, node):
+    """Converte um nó GraphQL de PR para o mesmo registro gerado pelo backend REST"""
+    author = (node.get("author") or {}).get("login")
+
+    # Todo comentário inline pertence a uma revisão, então os autores das
+    # revisões já cobrem os autores de comentários inline
+    participants = set()
+    if author:
+        participants.add(author)
+    for review in node["reviews"]["nodes"]:
+        if review.get("author") and review["author"].get("login"):
+            participants.add(review["author"]["login"])
+    for comment in node["comments"]["nodes"]:
+        if comment.get("author") and comment["author"].get("login"):
+            participants.add(comment["author"]["login"])
+
+    review_comments = sum(review["comments"]["totalCount"] for review in node["reviews"]["nodes"])
+
+    return PullRequestRecord(**{
+        "repo_full_name": repo_full_name,
+        "id": node["databaseId"],
+        "number": node["number"],
+        "title": node["title"],
+        "user": author,
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "closed_at": node["closedAt"],
+        "merged_at": node["mergedAt"],
+        "comments": node["comments"]["totalCount"],
+        "review_comments": review_comments,
+        "changed_files": node.get("changedFiles", 0),
+        "additions": node.get("additions", 0),
+        "deletions": node.get("deletions", 0),
+        # A API REST só conhece "open" e "closed"; PRs "MERGED" são "closed"
+        "state": "open" if node["state"] == "OPEN" else "closed",
+        "merged": node.get("merged", False),
+        "body_length": len(node["body"]) if node.get("body") else 0,
+
+        # Novas métricas
+        "reviews_count": node["reviews"]["totalCount"],
+        "issue_comments_count": node["comments"]["totalCount"],
+        "inline_review_comments_count": review_comments,
+        "participants_count": len(participants)
+    })
+
+
+def fetch_prs_graphql(repo_full_name, state="all", max_pages=2, page_size=50):
+    """
+    Busca PRs de um repositório usando uma consulta GraphQL por página.
+
+    ``max_pages`` segue a semântica do backend REST (páginas de 100 PRs), então
+    o limite de PRs coletados é o mesmo nos dois backends. ``page_size`` controla
+    quantos PRs vêm em cada consulta; 50 mantém a consulta abaixo do limite de
+    nós da API mesmo com 100 revisões e 100 comentários por PR.
+    """
+    prs, _ = collect_repo_graphql(repo_full_name, state, max_pages, page_size)
+    return list(as_dicts(prs))
+
+
+def collect_repo_graphql(repo_full_name, state="all", max_pages=2, page_size=50, since=None):
+    """
+    Igual a ``fetch_prs_graphql``, mas devolve também o maior ``updatedAt`` coletado (watermark).
+
+    Com ``since`` os PRs são ordenados por atualização e a coleta para no
+    primeiro PR que não mudou desde esse instante (modo incremental); nesse
+    modo ``max_pages`` não se aplica, para que nenhum PR modificado fique para trás.
+    """
+    rows = RepoRows(iter_repo_graphql(repo_full_name, state, max_pages, page_size, since))
+    prs = list(rows)
+    return prs, rows.watermark
+
+
+def iter_repo_graphql(repo_full_name, state="all", max_pages=2, page_size=50, since=None):
+    """
+    Gera os PRs à medida que cada consulta responde e devolve o watermark (ver ``collect_repo_graphql``).
+
+    PRs com comentários ou revisões incompletos (falha em ``complete_connections``)
+    são gerados com as contagens parciais, mas limitam o watermark, como as falhas
+    do backend REST (ver ``checkpoint.watermark_before``).
+    """
+    owner, name = repo_full_name.split("/", 1)
+    max_prs = max_pages * 100
+    order_field = "UPDATED_AT" if since else "CREATED_AT"
+    collected = 0
+    watermark = None
+    pending = None
+    cursor = None
+    collector_metrics.log(f"\n[INFO] Coletando PRs de {repo_full_name} via GraphQL...")
+
+    while since or collected < max_prs:
+        variables = {
+            "owner": owner,
+            "name": name,
+            "first": page_size if since else min(page_size, max_prs - collected),
+            "after": cursor,
+            "states": STATES[state],
+            "orderBy": {"field": order_field, "direction": "DESC"},
+        }
+        r = github_client.post(GRAPHQL_URL, json={"query": PULL_REQUESTS_QUERY, "variables": variables})
+
+        if r.status_code != 200:
+            print(f"[ERRO] {repo_full_name} - {r.text[:200]}")
+            break
+
+        payload = r.json()
+        if payload.get("errors"):
+            print(f"[ERRO] {repo_full_name} - {payload['errors']}")
+            break
+
+        repository = (payload.get("data") or {}).get("repository")
+        if not repository:
+            print(f"[ERRO] Repositório {repo_full_name} não encontrado")
+            break
+
+        pull_requests = repository["pullRequests"]
+        nodes = [node for node in pull_requests["nodes"] if node]
+        changed = [node for node in nodes if not since or (node.get("updatedAt") or "") > since]
+        collector_metrics.get_metrics().pr_collected(len(changed))
+        for node in changed:
+            if complete_connections(repo_full_name, node):
+                watermark = max_watermark(watermark, node.get("updatedAt"))
+            else:
+                pending = min(filter(None, (pending, node.get("updatedAt"))), default=None)
+            collected += 1
+            yield node_to_row(repo_full_name, node)
+
+        rate = payload["data"].get("rateLimit") or {}
+        collector_metrics.log(f"[INFO] {collected} PRs coletados em {repo_full_name} "
+              f"(custo {rate.get('cost')}, restante {rate.get('remaining')})")
+
+        if len(changed) < len(nodes) or not pull_requests["pageInfo"]["hasNextPage"]:
+            break
+        cursor = pull_requests["pageInfo"]["endCursor"]
+
+    collector_metrics.log(f"[OK] Total de PRs coletados em {repo_full_name}: {collected}")
+    return watermark_before(watermark, pending)
@@ -1,19 +1,42 @@
-import requests
-import os
-import pandas as pd
+import math
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+import rate_limit
+import http_cache
+import collector_metrics
+import github_client
+from github_client import API_URL
 
 # ============================================================
 # Script para coletar os repositórios mais populares do GitHub
+#
+# A Search API devolve no máximo 1000 resultados por consulta. Para
+# coletar mais que isso, a busca em janelas divide a faixa de estrelas
+# em fatias adjacentes stars:a..b com até 1000 repositórios cada:
+#   1. cada janela é consultada (página 1, que já traz o total_count);
+#      janelas com mais de 1000 resultados são divididas ao meio (em
+#      escala log, já que as estrelas têm cauda longa) e consultadas de
+#      novo, em paralelo;
+#   2. janelas inteiramente abaixo dos n primeiros (as de cima já somam
+#      n repositórios) são descartadas sem buscar mais páginas;
+#   3. as páginas restantes de cada janela são buscadas em paralelo e os
+#      resultados deduplicados por id (um repositório pode mudar de
+#      janela se ganhar estrelas durante a coleta).
+# O limite de requisições de busca (recurso "search") é respeitado pelo
+# agendador de rate_limit.py, compartilhado pelas threads.
 # ============================================================
 
+SEARCH_CAP = 1000
+PER_PAGE = 100
+MIN_STARS = 1001
+SEARCH_WORKERS = 4
+
 # Carrega variáveis de ambiente
 load_dotenv()
-TOKEN = os.getenv("GITHUB_TOKEN")
-HEADERS = {"Authorization": f"token {TOKEN}"}
 
 
-def fetch_top_repos(n=200):
+def fetch_top_repos(n=200, windowed=None, min_stars=MIN_STARS, workers=SEARCH_WORKERS):
     """
     Coleta os repositórios mais populares do GitHub com base no número de estrelas.
 
@@ -21,16 +44,25 @@ def fetch_top_repos(n=200):
     ----------
     n : int
         Quantidade total de repositórios a serem coletados (padrão: 200).
+    windowed : bool ou None
+        Usa a busca em janelas de estrelas (``fetch_top_repos_windowed``);
+        por padrão, só quando ``n`` passa do limite de 1000 da Search API.
+    min_stars, workers : int
+        Mínimo de estrelas e consultas simultâneas da busca em janelas.
 
     Retorno
     -------
     list
         Lista de dicionários contendo os dados dos repositórios.
     """
+    if windowed or (windowed is None and n > SEARCH_CAP):
+        return fetch_top_repos_windowed(n, min_stars, workers)
+
     print("=" * 60)
     print(" INICIANDO FETCH DE REPOSITÓRIOS POPULARES ")
     print("=" * 60)
-    print(f"Token carregado: {'SIM' if TOKEN else 'NÃO'}")
+    tokens = rate_limit.load_tokens()
+    print(f"Tokens carregados: {len(tokens) if tokens else 'NENHUM'}")
 
     repos = []
     per_page = 100  # limite máximo da API do GitHub por página
@@ -38,12 +70,12 @@ def fetch_top_repos(n=200):
     # Loop pelas páginas necessárias para atingir o total "n"
     for page in range(1, (n // per_page) + 2):
         url = (
-            f"https://api.github.com/search/repositories"
+            f"{API_URL}/search/repositories"
             f"?q=stars:>1000&sort=stars&order=desc&per_page={per_page}&page={page}"
         )
 
         print(f"\n[REQUEST] Coletando página {page}...")
-        r = requests.get(url, headers=HEADERS)
+        r = github_client.get(url)
         data = r.json()
 
         # Adiciona os repositórios encontrados à lista principal
@@ -56,11 +88,137 @@ def fetch_top_repos(n=200):
     return repos[:n]
 
 
-if __name__ == "__main__":
+def search_window(low, high, page=1):
+    """Uma página da busca por repositórios com ``low <= estrelas <= high`` (``high=None``: sem teto)"""
+    query = f"stars:{low}..{'*' if high is None else high}"
+    r = github_client.get(f"{API_URL}/search/repositories",
+                          params={"q": query, "sort": "stars", "order": "desc",
+                                  "per_page": PER_PAGE, "page": page})
+    if r.status_code != 200:
+        raise RuntimeError(f"Busca {query} (página {page}) falhou: {r.status_code} {r.text[:200]}")
+    data = r.json()
+    if data.get("incomplete_results"):
+        print(f"[AVISO] Resultados incompletos (timeout da busca) em {query}, página {page}")
+    return data
+
+
+class Window:
+    """Fatia stars:low..high da busca, com o total e a primeira página de resultados"""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+        self.total = None
+        self.items = []
+
+    def probe(self):
+        data = search_window(self.low, self.high)
+        self.total = data.get("total_count", 0)
+        self.items = data.get("items", [])
+        return self
+
+    def ceiling(self):
+        """Maior número de estrelas possível na janela (na aberta, o do primeiro resultado)"""
+        if self.high is not None:
+            return self.high
+        return max([repo["stargazers_count"] for repo in self.items] + [self.low])
+
+    def can_split(self):
+        return self.total > SEARCH_CAP and self.low < self.ceiling()
+
+    def split(self):
+        """Duas janelas adjacentes (a de cima primeiro), dividindo a faixa em escala log"""
+        high = self.ceiling()
+        middle = int(math.sqrt(self.low * high)) if self.low > 0 else high // 2
+        middle = min(max(middle, self.low), high - 1)
+        return [Window(middle + 1, self.high), Window(self.low, middle)]
+
+    def label(self):
+        return f"stars:{self.low}..{'*' if self.high is None else self.high}"
+
+
+def plan_windows(n, min_stars=MIN_STARS, pool=None):
+    """
+    Janelas de até SEARCH_CAP resultados cobrindo os ``n`` repositórios com mais
+    estrelas (acima de ``min_stars``), da mais alta para a mais baixa.
+    """
+    windows = [Window(min_stars, None)]
+    pending = windows
+    while pending:
+        list((pool.map if pool else map)(Window.probe, pending))
+        refined = []
+        for window in windows:
+            if window.total is not None and window.can_split():
+                refined.extend(window.split())
+            else:
+                refined.append(window)
+        # Descarta as janelas abaixo das que já somam n repositórios (as ainda não
+        # consultadas contam como vazias, então nada necessário é descartado)
+        kept, covered = [], 0
+        for window in refined:
+            if covered >= n:
+                break
+            kept.append(window)
+            covered += window.total or 0
+        windows = kept
+        pending = [window for window in windows if window.total is None]
+    return windows
+
+
+def fetch_top_repos_windowed(n, min_stars=MIN_STARS, workers=SEARCH_WORKERS):
+    """Coleta os ``n`` repositórios com mais estrelas dividindo a busca em janelas de estrelas"""
+    print("=" * 60)
+    print(" INICIANDO FETCH DE REPOSITÓRIOS POPULARES (JANELAS DE ESTRELAS) ")
+    print("=" * 60)
+    tokens = rate_limit.load_tokens()
+    print(f"Tokens carregados: {len(tokens) if tokens else 'NENHUM'}")
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        windows = plan_windows(n, min_stars, pool)
+        print(f"[INFO] {len(windows)} janelas: " + ", ".join(f"{w.label()} ({w.total})" for w in windows))
+        for window in windows:
+            if window.total > SEARCH_CAP:
+                print(f"[AVISO] {window.label()} tem {window.total} repositórios com o mesmo número de "
+                      f"estrelas; só os {SEARCH_CAP} primeiros são acessíveis")
+
+        # Páginas 2 em diante de cada janela (a primeira veio no planejamento)
+        pages = [
+            (window, page)
+            for window in windows
+            for page in range(2, math.ceil(min(window.total, SEARCH_CAP) / PER_PAGE) + 1)
+        ]
+        results = pool.map(lambda task: search_window(task[0].low, task[0].high, task[1]).get("items", []), pages)
+        for (window, _), items in zip(pages, results):
+            window.items.extend(items)
+
+    repos = {}
+    for window in windows:
+        for repo in window.items:
+            repos[repo["id"]] = repo
+    ranked = sorted(repos.values(), key=lambda repo: (-repo["stargazers_count"], repo["id"]))
+    print(f"[INFO] {sum(len(w.items) for w in windows)} resultados, {len(repos)} repositórios distintos")
+    print(f"\n[FINALIZADO] Total de {len(ranked[:n])} repositórios coletados.\n")
+    return ranked[:n]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coleta os repositórios mais populares do GitHub")
+    parser.add_argument("--n", type=int, default=200, help="quantidade de repositórios (padrão: 200)")
+    parser.add_argument("--windowed", action="store_true", default=None,
+                        help="busca em janelas de estrelas (automática acima de 1000 repositórios)")
+    parser.add_argument("--min-stars", type=int, default=MIN_STARS,
+                        help="mínimo de estrelas na busca em janelas (padrão: %(default)s)")
+    parser.add_argument("--workers", type=int, default=SEARCH_WORKERS,
+                        help="consultas de busca simultâneas (padrão: %(default)s)")
+    parser.add_argument("--output", default="data/processed/top_repos.csv")
+    args = parser.parse_args(argv)
+
     # Executa a coleta dos repositórios
-    repos = fetch_top_repos(200)
+    github_client.configure(args.workers)
+    repos = fetch_top_repos(args.n, args.windowed, args.min_stars, args.workers)
 
     # Criação de DataFrame pandas para organizar os dados
+    import pandas as pd
     df = pd.DataFrame(
         [
             {
@@ -76,10 +234,16 @@ if __name__ == "__main__":
     )
 
     # Salva o resultado em CSV
-    output_path = "data/processed/top_repos.csv"
+    output_path = args.output
     df.to_csv(output_path, index=False)
 
     print("[OK] Arquivo salvo em", output_path)
+    http_cache.report()
+    collector_metrics.report()
     print("=" * 60)
     print(" Pipeline de coleta concluído com sucesso ✅ ")
     print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # só gera arquivos; backend sem janela, seguro em processos filhos
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from scipy import stats
 import os
+import io
+import json
+import hashlib
+import inspect
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Configurações de estilo
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+import cli_options
+import dataset
+import features
+import plotting
+import sketch
+import stats_engine
 
 # Definir diretórios base
 SCRIPT_DIR = Path(__file__).parent
@@ -17,35 +27,54 @@ PROJECT_DIR = SCRIPT_DIR.parent
 DATA_DIR = PROJECT_DIR / 'data' / 'processed'
 RESULTS_DIR = PROJECT_DIR / 'results' / 'graphs'
 
-# Criar diretório para os gráficos
-RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+# Resolução dos PNGs e arquivo com o hash de entrada de cada gráfico já gerado
+DPI = 300
+CACHE_FILE = RESULTS_DIR / '.render_cache.json'
+
+def setup_style(plot_mode='auto'):
+    """Configurações de estilo e modo de agregação (no processo principal e em cada worker)"""
+    plotting.set_mode(plot_mode)
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+
+def data_path():
+    """Dataset final lido pelo relatório: Parquet tipado se existir (e o pyarrow estiver instalado), senão o CSV"""
+    parquet_path = DATA_DIR / 'final_dataset.parquet'
+    return parquet_path if (dataset.pa is not None and parquet_path.exists()) else DATA_DIR / 'final_dataset.csv'
+
+def status_statistics():
+    """
+    Mediana, média e Mann-Whitney de merged vs closed para cada métrica da Dimensão A.
+
+    Vêm dos sketches de stats_engine, montados lendo o dataset em pedaços
+    (stats_engine.CHUNK_ROWS linhas), e não do DataFrame carregado para os gráficos.
+    """
+    sketches, _ = stats_engine.status_sketches(path=str(data_path()))
+    return {metric: stats_engine.compare(merged, closed) for metric, (merged, closed) in sketches.items()}
 
 def load_data():
-    """Carrega e prepara os dados do CSV"""
+    """Carrega e prepara os dados do dataset final (Parquet tipado ou CSV)"""
     print("Carregando dados...")
     csv_path = DATA_DIR / 'final_dataset.csv'
+    parquet_path = DATA_DIR / 'final_dataset.parquet'
     
-    if not csv_path.exists():
+    if not csv_path.exists() and not parquet_path.exists():
         print(f"Erro: Arquivo não encontrado em {csv_path}")
         print(f"Diretório atual: {Path.cwd()}")
         print(f"Procurando em: {csv_path.absolute()}")
         raise FileNotFoundError(f"CSV não encontrado: {csv_path}")
     
-    df = pd.read_csv(csv_path)
+    path = data_path()
+    # Métricas derivadas (review_time_h, total_lines, total_interactions, status) já vêm
+    # calculadas pelo process_data.py, ou do cache de features.py para datasets antigos
+    df = features.load_features(columns=[
+        'status', 'review_time_h', 'changed_files', 'total_lines', 'body_length',
+        'comments', 'review_comments', 'participants_count', 'total_interactions',
+    ], path=str(path))
     
     # Criar coluna merged (boolean)
-    df['merged'] = df['merged_at'].notna()
-    
-    # Calcular tempo de revisão em horas
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df['closed_at'] = pd.to_datetime(df['closed_at'])
-    df['review_time_h'] = (df['closed_at'] - df['created_at']).dt.total_seconds() / 3600
-    
-    # Calcular total de linhas
-    df['total_lines'] = df['additions'] + df['deletions']
-    
-    # Calcular total de interações
-    df['total_interactions'] = df['comments'] + df['participants_count']
+    df['merged'] = df['status'] == 1
     
     print(f"Total de PRs carregados: {len(df)}")
     print(f"PRs Merged: {df['merged'].sum()}")
@@ -61,15 +90,17 @@ def calculate_correlation(x, y, method='spearman'):
         corr, p_value = stats.pearsonr(x, y)
     return corr, p_value
 
-def print_statistics(merged_data, closed_data, metric_name):
-    """Imprime estatísticas descritivas"""
+def print_statistics(stats, metric, metric_name):
+    """Imprime as estatísticas descritivas de ``metric`` (ver ``status_statistics``) e devolve a comparação"""
+    result = stats[metric]
     print(f"\n--- {metric_name} ---")
-    print(f"Merged - Mediana: {merged_data.median():.2f}, Média: {merged_data.mean():.2f}")
-    print(f"Closed - Mediana: {closed_data.median():.2f}, Média: {closed_data.mean():.2f}")
+    print(f"Merged - Mediana: {result['merged']['median']:.2f}, Média: {result['merged']['mean']:.2f}")
+    print(f"Closed - Mediana: {result['closed']['median']:.2f}, Média: {result['closed']['mean']:.2f}")
+    return result
 
 # ==================== DIMENSÃO A: FEEDBACK FINAL DAS REVISÕES ====================
 
-def rq01_tamanho_vs_status(df):
+def rq01_tamanho_vs_status(df, stats):
     """RQ01: Relação entre tamanho dos PRs e status final"""
     print("\n" + "="*80)
     print("RQ01: Tamanho dos PRs vs Status Final")
@@ -79,12 +110,12 @@ def rq01_tamanho_vs_status(df):
     closed = df[~df['merged']]
     
     # Estatísticas
-    print_statistics(merged['changed_files'], closed['changed_files'], 'Arquivos Modificados')
-    print_statistics(merged['total_lines'], closed['total_lines'], 'Total de Linhas')
+    files = print_statistics(stats, 'changed_files', 'Arquivos Modificados')
+    lines = print_statistics(stats, 'total_lines', 'Total de Linhas')
     
     # Teste estatístico (Mann-Whitney U - para dados não paramétricos)
-    u_stat_files, p_value_files = stats.mannwhitneyu(merged['changed_files'], closed['changed_files'])
-    u_stat_lines, p_value_lines = stats.mannwhitneyu(merged['total_lines'], closed['total_lines'])
+    u_stat_files, p_value_files = files['mann_whitney'][:2]
+    u_stat_lines, p_value_lines = lines['mann_whitney'][:2]
     
     print(f"\nTeste Mann-Whitney U:")
     print(f"Arquivos - p-value: {p_value_files:.4f}")
@@ -95,28 +126,24 @@ def rq01_tamanho_vs_status(df):
     
     # Arquivos modificados
     data_files = [merged['changed_files'], closed['changed_files']]
-    bp1 = axes[0].boxplot(data_files, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp1['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(axes[0], data_files, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     axes[0].set_ylabel('Número de Arquivos')
     axes[0].set_title('Arquivos Modificados por Status')
     axes[0].grid(True, alpha=0.3)
     
     # Total de linhas
     data_lines = [merged['total_lines'], closed['total_lines']]
-    bp2 = axes[1].boxplot(data_lines, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp2['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(axes[1], data_lines, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     axes[1].set_ylabel('Total de Linhas (Adições + Remoções)')
     axes[1].set_title('Total de Linhas por Status')
     axes[1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(RESULTS_DIR / 'rq01_tamanho_vs_status.png', dpi=300, bbox_inches='tight')
+    plt.savefig(RESULTS_DIR / 'rq01_tamanho_vs_status.png', dpi=DPI, bbox_inches='tight')
     print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq01_tamanho_vs_status.png'}")
     plt.close()
 
-def rq02_tempo_vs_status(df):
+def rq02_tempo_vs_status(df, stats):
     """RQ02: Relação entre tempo de análise e status final"""
     print("\n" + "="*80)
     print("RQ02: Tempo de Análise vs Status Final")
@@ -125,28 +152,26 @@ def rq02_tempo_vs_status(df):
     merged = df[df['merged']]
     closed = df[~df['merged']]
     
-    print_statistics(merged['review_time_h'], closed['review_time_h'], 'Tempo de Revisão (horas)')
+    review = print_statistics(stats, 'review_time_h', 'Tempo de Revisão (horas)')
     
     # Teste estatístico
-    u_stat, p_value = stats.mannwhitneyu(merged['review_time_h'], closed['review_time_h'])
+    u_stat, p_value = review['mann_whitney'][:2]
     print(f"\nTeste Mann-Whitney U - p-value: {p_value:.4f}")
     
     # Gráfico
     fig, ax = plt.subplots(figsize=(10, 6))
     data = [merged['review_time_h'], closed['review_time_h']]
-    bp = ax.boxplot(data, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(ax, data, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     ax.set_ylabel('Tempo de Revisão (horas)')
     ax.set_title('Tempo de Análise por Status do PR')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq02_tempo_vs_status.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq02_tempo_vs_status.png")
+    plt.savefig(RESULTS_DIR / 'rq02_tempo_vs_status.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq02_tempo_vs_status.png'}")
     plt.close()
 
-def rq03_descricao_vs_status(df):
+def rq03_descricao_vs_status(df, stats):
     """RQ03: Relação entre descrição e status final"""
     print("\n" + "="*80)
     print("RQ03: Descrição dos PRs vs Status Final")
@@ -155,28 +180,26 @@ def rq03_descricao_vs_status(df):
     merged = df[df['merged']]
     closed = df[~df['merged']]
     
-    print_statistics(merged['body_length'], closed['body_length'], 'Tamanho da Descrição (caracteres)')
+    desc = print_statistics(stats, 'body_length', 'Tamanho da Descrição (caracteres)')
     
     # Teste estatístico
-    u_stat, p_value = stats.mannwhitneyu(merged['body_length'], closed['body_length'])
+    u_stat, p_value = desc['mann_whitney'][:2]
     print(f"\nTeste Mann-Whitney U - p-value: {p_value:.4f}")
     
     # Gráfico
     fig, ax = plt.subplots(figsize=(10, 6))
     data = [merged['body_length'], closed['body_length']]
-    bp = ax.boxplot(data, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(ax, data, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     ax.set_ylabel('Número de Caracteres na Descrição')
     ax.set_title('Tamanho da Descrição por Status do PR')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq03_descricao_vs_status.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq03_descricao_vs_status.png")
+    plt.savefig(RESULTS_DIR / 'rq03_descricao_vs_status.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq03_descricao_vs_status.png'}")
     plt.close()
 
-def rq04_interacoes_vs_status(df):
+def rq04_interacoes_vs_status(df, stats):
     """RQ04: Relação entre interações e status final"""
     print("\n" + "="*80)
     print("RQ04: Interações nos PRs vs Status Final")
@@ -185,12 +208,12 @@ def rq04_interacoes_vs_status(df):
     merged = df[df['merged']]
     closed = df[~df['merged']]
     
-    print_statistics(merged['participants_count'], closed['participants_count'], 'Número de Participantes')
-    print_statistics(merged['comments'], closed['comments'], 'Número de Comentários')
+    part = print_statistics(stats, 'participants_count', 'Número de Participantes')
+    comm = print_statistics(stats, 'comments', 'Número de Comentários')
     
     # Testes estatísticos
-    u_stat_part, p_value_part = stats.mannwhitneyu(merged['participants_count'], closed['participants_count'])
-    u_stat_comm, p_value_comm = stats.mannwhitneyu(merged['comments'], closed['comments'])
+    u_stat_part, p_value_part = part['mann_whitney'][:2]
+    u_stat_comm, p_value_comm = comm['mann_whitney'][:2]
     
     print(f"\nTeste Mann-Whitney U:")
     print(f"Participantes - p-value: {p_value_part:.4f}")
@@ -201,25 +224,21 @@ def rq04_interacoes_vs_status(df):
     
     # Participantes
     data_part = [merged['participants_count'], closed['participants_count']]
-    bp1 = axes[0].boxplot(data_part, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp1['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(axes[0], data_part, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     axes[0].set_ylabel('Número de Participantes')
     axes[0].set_title('Participantes por Status')
     axes[0].grid(True, alpha=0.3)
     
     # Comentários
     data_comm = [merged['comments'], closed['comments']]
-    bp2 = axes[1].boxplot(data_comm, labels=['Merged', 'Closed'], patch_artist=True)
-    for patch, color in zip(bp2['boxes'], ['lightgreen', 'lightcoral']):
-        patch.set_facecolor(color)
+    plotting.boxplot(axes[1], data_comm, ['Merged', 'Closed'], ['lightgreen', 'lightcoral'])
     axes[1].set_ylabel('Número de Comentários')
     axes[1].set_title('Comentários por Status')
     axes[1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq04_interacoes_vs_status.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq04_interacoes_vs_status.png")
+    plt.savefig(RESULTS_DIR / 'rq04_interacoes_vs_status.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq04_interacoes_vs_status.png'}")
     plt.close()
 
 # ==================== DIMENSÃO B: NÚMERO DE REVISÕES ====================
@@ -242,22 +261,22 @@ def rq05_tamanho_vs_revisoes(df):
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     # Arquivos vs Revisões
-    axes[0].scatter(df['changed_files'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(axes[0], df['changed_files'], df['review_comments'])
     axes[0].set_xlabel('Número de Arquivos Modificados')
     axes[0].set_ylabel('Número de Review Comments')
     axes[0].set_title(f'Arquivos vs Revisões (ρ = {corr_files:.3f})')
     axes[0].grid(True, alpha=0.3)
     
     # Linhas vs Revisões
-    axes[1].scatter(df['total_lines'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(axes[1], df['total_lines'], df['review_comments'])
     axes[1].set_xlabel('Total de Linhas (Adições + Remoções)')
     axes[1].set_ylabel('Número de Review Comments')
     axes[1].set_title(f'Linhas vs Revisões (ρ = {corr_lines:.3f})')
     axes[1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq05_tamanho_vs_revisoes.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq05_tamanho_vs_revisoes.png")
+    plt.savefig(RESULTS_DIR / 'rq05_tamanho_vs_revisoes.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq05_tamanho_vs_revisoes.png'}")
     plt.close()
 
 def rq06_tempo_vs_revisoes(df):
@@ -272,15 +291,15 @@ def rq06_tempo_vs_revisoes(df):
     
     # Gráfico
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(df['review_time_h'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(ax, df['review_time_h'], df['review_comments'])
     ax.set_xlabel('Tempo de Revisão (horas)')
     ax.set_ylabel('Número de Review Comments')
     ax.set_title(f'Tempo de Análise vs Revisões (ρ = {corr:.3f})')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq06_tempo_vs_revisoes.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq06_tempo_vs_revisoes.png")
+    plt.savefig(RESULTS_DIR / 'rq06_tempo_vs_revisoes.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq06_tempo_vs_revisoes.png'}")
     plt.close()
 
 def rq07_descricao_vs_revisoes(df):
@@ -295,15 +314,15 @@ def rq07_descricao_vs_revisoes(df):
     
     # Gráfico
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(df['body_length'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(ax, df['body_length'], df['review_comments'])
     ax.set_xlabel('Tamanho da Descrição (caracteres)')
     ax.set_ylabel('Número de Review Comments')
     ax.set_title(f'Descrição vs Revisões (ρ = {corr:.3f})')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq07_descricao_vs_revisoes.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq07_descricao_vs_revisoes.png")
+    plt.savefig(RESULTS_DIR / 'rq07_descricao_vs_revisoes.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq07_descricao_vs_revisoes.png'}")
     plt.close()
 
 def rq08_interacoes_vs_revisoes(df):
@@ -324,26 +343,148 @@ def rq08_interacoes_vs_revisoes(df):
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     # Participantes vs Revisões
-    axes[0].scatter(df['participants_count'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(axes[0], df['participants_count'], df['review_comments'])
     axes[0].set_xlabel('Número de Participantes')
     axes[0].set_ylabel('Número de Review Comments')
     axes[0].set_title(f'Participantes vs Revisões (ρ = {corr_part:.3f})')
     axes[0].grid(True, alpha=0.3)
     
     # Comentários vs Revisões
-    axes[1].scatter(df['comments'], df['review_comments'], alpha=0.5, s=30)
+    plotting.scatter(axes[1], df['comments'], df['review_comments'])
     axes[1].set_xlabel('Número de Comentários')
     axes[1].set_ylabel('Número de Review Comments')
     axes[1].set_title(f'Comentários vs Revisões (ρ = {corr_comm:.3f})')
     axes[1].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('../results/graphs/rq08_interacoes_vs_revisoes.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Gráfico salvo: results/graphs/rq08_interacoes_vs_revisoes.png")
+    plt.savefig(RESULTS_DIR / 'rq08_interacoes_vs_revisoes.png', dpi=DPI, bbox_inches='tight')
+    print(f"\n✓ Gráfico salvo: {RESULTS_DIR / 'rq08_interacoes_vs_revisoes.png'}")
     plt.close()
 
-def main():
+# ==================== RENDERIZAÇÃO PARALELA COM CACHE ====================
+
+# (função, arquivo gerado, colunas usadas) de cada gráfico
+FIGURES = [
+    (rq01_tamanho_vs_status, 'rq01_tamanho_vs_status.png', ['merged', 'changed_files', 'total_lines']),
+    (rq02_tempo_vs_status, 'rq02_tempo_vs_status.png', ['merged', 'review_time_h']),
+    (rq03_descricao_vs_status, 'rq03_descricao_vs_status.png', ['merged', 'body_length']),
+    (rq04_interacoes_vs_status, 'rq04_interacoes_vs_status.png', ['merged', 'participants_count', 'comments']),
+    (rq05_tamanho_vs_revisoes, 'rq05_tamanho_vs_revisoes.png', ['changed_files', 'total_lines', 'review_comments']),
+    (rq06_tempo_vs_revisoes, 'rq06_tempo_vs_revisoes.png', ['review_time_h', 'review_comments']),
+    (rq07_descricao_vs_revisoes, 'rq07_descricao_vs_revisoes.png', ['body_length', 'review_comments']),
+    (rq08_interacoes_vs_revisoes, 'rq08_interacoes_vs_revisoes.png', ['participants_count', 'comments', 'review_comments']),
+]
+
+# Cabeçalho impresso antes do primeiro gráfico de cada dimensão
+DIMENSION_HEADERS = {
+    'rq01_tamanho_vs_status.png': "DIMENSÃO A: FEEDBACK FINAL DAS REVISÕES (STATUS DO PR)",
+    'rq05_tamanho_vs_revisoes.png': "DIMENSÃO B: NÚMERO DE REVISÕES",
+}
+
+def figure_key(func, columns, data):
+    """
+    Hash do que define um gráfico: os dados das colunas usadas, o código da
+    função que o desenha (e de plotting.py e sketch.py, usados por ela; na
+    Dimensão A também o de stats_engine.py, que calcula as estatísticas
+    impressas) e os parâmetros de saída. Se nada mudou, o PNG existente e o
+    texto impresso na última execução são reaproveitados.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data[columns], index=False).to_numpy().tobytes())
+    digest.update(inspect.getsource(func).encode())
+    digest.update(inspect.getsource(plotting).encode())
+    digest.update(inspect.getsource(sketch).encode())
+    if 'merged' in columns:
+        digest.update(inspect.getsource(stats_engine).encode())
+    digest.update(json.dumps({
+        'dpi': DPI, 'columns': columns, 'matplotlib': matplotlib.__version__, 'plot_mode': plotting.mode,
+        'aggregate_threshold': plotting.AGGREGATE_THRESHOLD,
+    }).encode())
+    return digest.hexdigest()
+
+def load_render_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_cache(cache):
+    tmp = CACHE_FILE.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+def render_figure(func, data, stats=None):
+    """Gera um gráfico e devolve o texto que ele imprimiu (para exibir em ordem)"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        if stats is None:
+            func(data)
+        else:
+            func(data, stats)
+    return out.getvalue()
+
+def render_all(df, jobs=None, force=False, stats=None):
+    """
+    Gera os gráficos das RQs, em paralelo em até ``jobs`` processos.
+
+    Os gráficos da Dimensão A (colunas com ``merged``) recebem as estatísticas
+    de ``stats`` (ver ``status_statistics``), calculadas só se algum deles for gerado.
+
+    Gráficos cujo hash de entrada (ver ``figure_key``) é igual ao da última
+    execução e cujo PNG ainda existe são pulados, a menos que ``force`` seja True;
+    o texto que eles imprimiram (estatísticas das RQs) fica no cache e é
+    impresso de novo. A saída sai na ordem de FIGURES, com o cabeçalho de
+    cada dimensão antes do seu primeiro gráfico.
+    """
+    cache = {} if force else load_render_cache()
+    outputs = {}
+    pending = []
+    for func, filename, columns in FIGURES:
+        key = figure_key(func, columns, df)
+        entry = cache.get(filename)
+        if isinstance(entry, dict) and entry.get('key') == key and (RESULTS_DIR / filename).exists():
+            outputs[filename] = (f"[CACHE] {filename} inalterado, mantendo o gráfico existente\n"
+                                 + entry.get('output', ''))
+            continue
+        # Cada worker recebe só as colunas do seu gráfico
+        pending.append((func, filename, key, df[columns]))
+
+    if pending:
+        figure_stats = []
+        for func, _, _, data in pending:
+            if 'merged' in data.columns:
+                stats = stats if stats is not None else status_statistics()
+                figure_stats.append({metric: stats[metric] for metric in data.columns if metric in stats})
+            else:
+                figure_stats.append(None)
+
+        jobs = min(jobs or os.cpu_count() or 1, len(pending))
+        if jobs == 1:
+            rendered = [render_figure(func, data, fs) for (func, _, _, data), fs in zip(pending, figure_stats)]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=setup_style, initargs=(plotting.mode,)) as pool:
+                rendered = list(pool.map(render_figure, [func for func, _, _, _ in pending],
+                                         [data for _, _, _, data in pending], figure_stats))
+
+        for (_, filename, key, _), output in zip(pending, rendered):
+            outputs[filename] = output
+            cache[filename] = {'key': key, 'output': output}
+        save_render_cache(cache)
+
+    for _, filename, _ in FIGURES:
+        if filename in DIMENSION_HEADERS:
+            print("\n\n" + "#"*80)
+            print(f"# {DIMENSION_HEADERS[filename]}")
+            print("#"*80)
+        print(outputs[filename], end='')
+
+def run(jobs=None, force=False, plot_mode='auto'):
     """Função principal"""
+    setup_style(plot_mode)
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
     print("\n" + "="*80)
     print("ANÁLISE DE CODE REVIEW - LABORATÓRIO 03")
     print("="*80)
@@ -351,25 +492,8 @@ def main():
     # Carregar dados
     df = load_data()
     
-    # Dimensão A: Feedback Final das Revisões
-    print("\n\n" + "#"*80)
-    print("# DIMENSÃO A: FEEDBACK FINAL DAS REVISÕES (STATUS DO PR)")
-    print("#"*80)
-    
-    rq01_tamanho_vs_status(df)
-    rq02_tempo_vs_status(df)
-    rq03_descricao_vs_status(df)
-    rq04_interacoes_vs_status(df)
-    
-    # Dimensão B: Número de Revisões
-    print("\n\n" + "#"*80)
-    print("# DIMENSÃO B: NÚMERO DE REVISÕES")
-    print("#"*80)
-    
-    rq05_tamanho_vs_revisoes(df)
-    rq06_tempo_vs_revisoes(df)
-    rq07_descricao_vs_revisoes(df)
-    rq08_interacoes_vs_revisoes(df)
+    # Dimensão A (RQ01-RQ04) e Dimensão B (RQ05-RQ08), cada uma com seu cabeçalho
+    render_all(df, jobs=jobs, force=force)
     
     print("\n" + "="*80)
     print("ANÁLISE CONCLUÍDA!")
@@ -379,5 +503,11 @@ def main():
     print("- Dimensão A: Teste Mann-Whitney U (comparação entre grupos)")
     print("- Dimensão B: Correlação de Spearman (relação entre variáveis)")
 
+def main(argv=None):
+    parser = cli_options.build_parser("generate_graphs")
+    args = parser.parse_args(argv)
+    run(jobs=args.jobs, force=args.force, plot_mode=args.plot_mode)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import collector_metrics
+from rate_limit import RateLimitScheduler
+
+# ============================================================
+# Cliente HTTP único da API do GitHub, usado por todos os coletores.
+#
+# - Session com pool de conexões keep-alive (sem novo handshake
+#   TCP+TLS a cada chamada), dimensionado pela concorrência da coleta;
+# - respostas com gzip (Accept-Encoding) e cabeçalhos padrão da API;
+# - novas tentativas com backoff e jitter para erros 5xx e conexões
+#   derrubadas, e timeout em todas as requisições;
+# - rate limit e rodízio de tokens (rate_limit.py) e cache com ETag
+#   (http_cache.py);
+# - latência, status, bytes e retries de cada requisição registrados
+#   em collector_metrics.py.
+#
+# Configuração (.env):
+#   GITHUB_API_URL=...   base da API (padrão: https://api.github.com)
+#   GITHUB_TIMEOUT=...   timeout de leitura em segundos (padrão: 30)
+# ============================================================
+
+load_dotenv()
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{API_URL}/graphql")
+
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", 30))
+MAX_RETRIES = 3
+
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "Accept-Encoding": "gzip",
+    "User-Agent": "Lab03-CodeReview",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+
+def make_session(pool_size=10, retries=MAX_RETRIES):
+    """Session com pool keep-alive de ``pool_size`` conexões e retry para falhas transitórias"""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        # 403/429 de rate limit ficam com o agendador, que troca de token
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class GitHubClient:
+    """Session compartilhada + agendador de rate limit + timeout padrão"""
+
+    def __init__(self, pool_size=10, tokens=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.session = make_session(pool_size)
+        self.timeout = timeout
+        self.scheduler = RateLimitScheduler(tokens, send=self._send)
+
+    def _send(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        metrics = collector_metrics.get_metrics()
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.observe_error(url)
+            raise
+        metrics.observe_request(url, response.status_code, time.perf_counter() - start,
+                                response_size(response), retries_of(response))
+        return response
+
+    def get(self, url, **kwargs):
+        return self.scheduler.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.scheduler.request("POST", url, **kwargs)
+
+
+def response_size(response):
+    """Bytes recebidos no corpo (comprimido, pelo Content-Length, quando disponível)"""
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    # Sem Content-Length (ex.: chunked); só mede o corpo se ele já foi lido
+    return len(response.content) if getattr(response, "_content_consumed", False) else 0
+
+
+def retries_of(response):
+    """Quantas vezes o urllib3 repetiu a requisição antes desta resposta"""
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure(concurrency=1, tokens=None):
+    """
+    (Re)cria o cliente do processo com um pool de conexões do tamanho da concorrência.
+
+    Deve ser chamado antes da coleta, com o número máximo de requisições
+    simultâneas (ex.: ``workers * repo_workers``).
+    """
+    global _client
+    with _client_lock:
+        _client = GitHubClient(pool_size=max(concurrency, 1), tokens=tokens)
+        return _client
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+
+def benchmark(requests_count=300, port=0):
+    """
+    Compara a latência média por requisição sem Session (requests.get, uma
+    conexão nova por chamada) e com a Session pooled do cliente, contra o mock
+    local. O agendador de rate limit fica de fora para medir só o transporte.
+    """
+    import mock_github
+
+    server = mock_github.serve(port=port, prs_per_repo=50)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/repos/org1/repo1/pulls/1"
+
+    def measure(label, fetch):
+        fetch(url)  # aquecimento
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            fetch(url).raise_for_status()
+        elapsed = (time.perf_counter() - start) / requests_count * 1000
+        print(f"{label:<28} {elapsed:7.3f} ms/requisição")
+        return elapsed
+
+    print(f"[BENCH] {requests_count} GETs sequenciais contra {url}")
+    plain = measure("requests.get (sem pool)", lambda u: requests.get(u, headers=DEFAULT_HEADERS))
+    session = make_session(pool_size=1)
+    pooled = measure("Session pooled (keep-alive)", lambda u: session.get(u, timeout=READ_TIMEOUT))
+    print(f"[BENCH] Ganho: {plain / pooled:.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do cliente HTTP contra o mock local da API")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    benchmark(args.requests)
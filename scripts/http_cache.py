@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# ============================================================
+# Cache em disco das respostas GET da API do GitHub.
+#
+# Cada resposta 200 com ETag/Last-Modified é guardada por URL e
+# token. Nas execuções seguintes a requisição sai com
+# If-None-Match/If-Modified-Since; se o recurso não mudou o GitHub
+# responde 304 (sem custo no rate limit) e o corpo vem do disco.
+# O diretório é limitado por tamanho, removendo as entradas usadas
+# há mais tempo.
+#
+# Cada entrada tem dois arquivos: <chave>.json (URL, validadores e
+# cabeçalhos) e <chave>.body (o corpo, já descompactado). Respostas
+# pedidas com stream=True (pagination.read_items/iter_logins) não são
+# lidas aqui: o corpo é copiado para o .body à medida que quem chamou
+# consome o stream, e a entrada só é gravada quando ele chega ao fim.
+#
+# Configuração (.env):
+#   GITHUB_CACHE=0            desativa o cache
+#   GITHUB_CACHE_DIR=...      diretório (padrão: data/cache/http)
+#   GITHUB_CACHE_MAX_MB=...   tamanho máximo (padrão: 1024)
+# ============================================================
+
+DEFAULT_DIR = "data/cache/http"
+DEFAULT_MAX_MB = 1024
+# Cabeçalhos preservados junto com o corpo
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+class _TeeStream:
+    """
+    Envolve ``response.raw``: os bytes lidos (já descompactados) também vão para ``path``.
+
+    Ao chegar ao fim do corpo chama ``on_complete()``; se a resposta for fechada
+    antes disso, o arquivo parcial é descartado.
+    """
+
+    def __init__(self, raw, path, on_complete):
+        raw.decode_content = True
+        self._raw = raw
+        self._path = path
+        self._file = open(path, "wb")
+        self._on_complete = on_complete
+
+    def read(self, amt=None, **kwargs):
+        data = self._raw.read(amt)
+        if self._file is not None:
+            if data:
+                self._file.write(data)
+            # read(0) (usado pelo ijson para detectar bytes/str) não indica fim do corpo
+            if (not data and amt != 0) or amt is None:
+                self._finish(complete=True)
+        return data
+
+    def readinto(self, buffer):
+        # O ijson (backend em C) lê com readinto quando disponível
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        while True:
+            data = self.read(amt)
+            if not data:
+                return
+            yield data
+
+    def _finish(self, complete):
+        self._file.close()
+        self._file = None
+        if complete:
+            self._on_complete()
+        else:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._file is not None:
+            self._finish(complete=False)
+        self._raw.close()
+
+    def __getattr__(self, name):
+        # release_conn, closed, headers, ... vêm da resposta original
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        if name == "decode_content":
+            return  # o stream é sempre lido descompactado
+        super().__setattr__(name, value)
+
+
+def token_scope(token):
+    """Identifica o token sem gravá-lo em disco"""
+    if not token:
+        return "anonimo"
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class HttpCache:
+    """Cache de respostas com validação condicional (ETag/Last-Modified)"""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, url, token):
+        key = hashlib.sha256(f"{token_scope(token)}|{url}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    @staticmethod
+    def _body_path(path):
+        return path[:-len(".json")] + ".body"
+
+    def lookup(self, url, token):
+        """Entrada guardada para a URL/token ou None"""
+        path = self._path(url, token)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Entradas antigas guardam o corpo no próprio .json
+        return entry if "body" in entry or os.path.exists(self._body_path(path)) else None
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Cabeçalhos de requisição condicional para uma entrada do cache"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url, token, entry):
+        """Registra um 304 e reconstrói a resposta original a partir do disco"""
+        path = self._path(url, token)
+        with self._lock:
+            self.hits += 1
+        try:
+            # Marca a entrada como usada recentemente para a política de remoção
+            os.utime(path)
+        except OSError:
+            pass
+        if "body" in entry:
+            body = entry["body"].encode("utf-8")
+        else:
+            try:
+                with open(self._body_path(path), "rb") as f:
+                    body = f.read()
+            except OSError:
+                return None  # removida depois do lookup; quem chamou repete sem o cache
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = body
+        return response
+
+    def store(self, url, token, response):
+        """Guarda uma resposta 200 validável; outras respostas contam apenas como miss"""
+        with self._lock:
+            self.misses += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        }
+        path = self._path(url, token)
+        body_tmp = f"{self._body_path(path)}.{threading.get_ident()}.{id(response)}.tmp"
+
+        if response.raw is not None and not response._content_consumed:
+            # stream=True: o corpo é copiado enquanto quem chamou o lê
+            response.raw = _TeeStream(response.raw, body_tmp, lambda: self._commit(path, entry, body_tmp))
+            return
+        with open(body_tmp, "wb") as f:
+            f.write(response.content)
+        self._commit(path, entry, body_tmp)
+
+    def _commit(self, path, entry, body_tmp):
+        """Grava a entrada: o corpo já está em ``body_tmp``; o .json vai por último"""
+        data = json.dumps(entry).encode("utf-8")
+        body_path = self._body_path(path)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with self._lock:
+            old_size = sum(os.path.getsize(p) for p in (path, body_path) if os.path.exists(p))
+            os.replace(body_tmp, body_path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._size += len(data) + os.path.getsize(body_path) - old_size
+            self.stores += 1
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove as entradas usadas há mais tempo até ficar em 90% do limite"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if self._size <= target:
+                break
+            for path in (entry.path, self._body_path(entry.path)):
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= size
+            self.evictions += 1
+
+    def report(self):
+        """Imprime os contadores de uso do cache"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        print(f"[CACHE] hits (304): {self.hits} | misses: {self.misses} | taxa de acerto: {rate:.1f}% | "
+              f"gravadas: {self.stores} | removidas: {self.evictions} | "
+              f"tamanho: {self._size / 1024 / 1024:.1f} MB em {self.directory}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Cache único do processo, configurado pelo .env; None quando desativado"""
+    global _cache
+    if os.getenv("GITHUB_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(os.getenv("GITHUB_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            _cache = HttpCache(os.getenv("GITHUB_CACHE_DIR", DEFAULT_DIR), int(max_mb * 1024 * 1024))
+        return _cache
+
+
+def report():
+    """Imprime os contadores do cache do processo, se ele foi usado"""
+    if _cache is not None:
+        _cache.report()
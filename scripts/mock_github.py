@@ -0,0 +1,403 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+
+# ============================================================
+# Servidor local que imita os endpoints da API do GitHub usados
+# pelos coletores. Os dados são determinísticos (derivados do nome
+# do repositório e do número do PR), então duas coletas contra o
+# mesmo servidor devem produzir exatamente as mesmas linhas.
+#
+# Uso:
+#   python scripts/mock_github.py --port 8765
+#   GITHUB_API_URL=http://127.0.0.1:8765 python scripts/fetch_prs.py --workers 8
+#   GITHUB_API_URL=http://127.0.0.1:8765 python scripts/fetch_prs.py --backend graphql
+# ============================================================
+
+USERS = [f"user{i}" for i in range(20)]
+
+
+def _rng(*parts):
+    return random.Random("|".join(str(p) for p in parts))
+
+
+# Resultados acessíveis por busca, como na Search API do GitHub
+SEARCH_CAP = 1000
+# Itens por página das conexões aninhadas do GraphQL (comments/reviews de um PR)
+GRAPHQL_CONNECTION_PAGE = 100
+
+
+def repo_stars(i):
+    """Estrelas do i-ésimo repositório mais popular do mock (decrescente, com empates na cauda)"""
+    return 1000 + int(499_000 / (1 + i / 20))
+
+
+def parse_stars(q):
+    """Faixa (mín., máx.) do qualificador stars: da busca (a..b, a..*, >a, >=a)"""
+    match = re.search(r"stars:(\S+)", q or "")
+    if not match:
+        return 0, math.inf
+    expr = match.group(1)
+    if ".." in expr:
+        low, high = expr.split("..", 1)
+        return int(low), math.inf if high == "*" else int(high)
+    if expr.startswith(">="):
+        return int(expr[2:]), math.inf
+    if expr.startswith(">"):
+        return int(expr[1:]) + 1, math.inf
+    return int(expr), int(expr)
+
+
+def make_pr(repo, number):
+    """Gera os detalhes de um PR de forma determinística"""
+    rng = _rng(repo, number)
+    activity = make_activity(repo, number)
+    merged = rng.random() < 0.6
+    open_ = not merged and rng.random() < 0.1
+    created = 1_700_000_000 + number * 3600
+    closed = None if open_ else created + rng.randint(60, 200 * 3600)
+    fmt = lambda ts: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts else None
+    body = "x" * rng.randint(0, 2000) if rng.random() < 0.9 else None
+    return {
+        "id": _rng(repo, number, "id").randint(10**9, 10**10),
+        "number": number,
+        "title": f"PR {number} de {repo}",
+        "user": {"login": rng.choice(USERS)},
+        "created_at": fmt(created),
+        "updated_at": fmt(closed or created),
+        "closed_at": fmt(closed),
+        "merged_at": fmt(closed) if merged else None,
+        "comments": len(activity["issue_comments"]),
+        "review_comments": len(activity["review_comments"]),
+        "changed_files": rng.randint(1, 50),
+        "additions": rng.randint(0, 3000),
+        "deletions": rng.randint(0, 1500),
+        "state": "open" if open_ else "closed",
+        "merged": merged,
+        "body": body,
+        **MockGitHubHandler.edits.get((repo, number), {}),
+    }
+
+
+def make_activity(repo, number):
+    """
+    Gera revisões, comentários gerais e comentários inline de um PR.
+
+    Como na API real, todo comentário inline pertence a uma revisão, então
+    seus autores são sempre autores de alguma revisão.
+    """
+    rng = _rng(repo, number, "activity")
+    scale = MockGitHubHandler.activity_scale
+    reviews = [{"id": i, "user": {"login": rng.choice(USERS)}, "state": "COMMENTED"}
+               for i in range(rng.randint(0, 6) * scale)]
+    issue_comments = [{"id": i, "user": {"login": rng.choice(USERS)}, "body": "ok"}
+                      for i in range(rng.randint(0, 10) * scale)]
+    review_comments = []
+    for review in reviews:
+        for _ in range(rng.randint(0, 3)):
+            review_comments.append({
+                "id": len(review_comments),
+                "pull_request_review_id": review["id"],
+                "user": dict(review["user"]),
+                "body": "nit",
+            })
+    return {"reviews": reviews, "issue_comments": issue_comments, "review_comments": review_comments}
+
+
+def make_graphql_node(repo, number, paged=True):
+    """Converte um PR do mock para o formato de nó da API GraphQL (com ``paged``, só a 1ª página das conexões)"""
+    pr = make_pr(repo, number)
+    activity = make_activity(repo, number)
+    login = lambda item: {"login": item["user"]["login"]} if item.get("user") else None
+    per_review = {}
+    for comment in activity["review_comments"]:
+        per_review[comment["pull_request_review_id"]] = per_review.get(comment["pull_request_review_id"], 0) + 1
+    state = "MERGED" if pr["merged"] else pr["state"].upper()
+    node = {
+        "databaseId": pr["id"],
+        "number": pr["number"],
+        "title": pr["title"],
+        "author": login(pr),
+        "createdAt": pr["created_at"],
+        "updatedAt": pr["updated_at"],
+        "closedAt": pr["closed_at"],
+        "mergedAt": pr["merged_at"],
+        "state": state,
+        "merged": pr["merged"],
+        "additions": pr["additions"],
+        "deletions": pr["deletions"],
+        "changedFiles": pr["changed_files"],
+        "body": pr["body"] or "",
+        "comments": {
+            "totalCount": len(activity["issue_comments"]),
+            "nodes": [{"author": login(c)} for c in activity["issue_comments"]],
+        },
+        "reviews": {
+            "totalCount": len(activity["reviews"]),
+            "nodes": [
+                {"author": login(r), "comments": {"totalCount": per_review.get(r["id"], 0)}}
+                for r in activity["reviews"]
+            ],
+        },
+    }
+    if paged:
+        node["comments"] = graphql_page(node["comments"])
+        node["reviews"] = graphql_page(node["reviews"])
+    return node
+
+
+def graphql_page(connection, after=None, size=GRAPHQL_CONNECTION_PAGE):
+    """Uma página de uma conexão aninhada (comments/reviews), com o cursor na forma de deslocamento"""
+    offset = int(after or 0)
+    nodes = connection["nodes"][offset:offset + size]
+    end = offset + len(nodes)
+    return {**connection, "pageInfo": {"hasNextPage": end < len(connection["nodes"]), "endCursor": str(end)},
+            "nodes": nodes}
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive)
+    protocol_version = "HTTP/1.1"
+    prs_per_repo = 150
+    # Repositórios existentes para a busca (ordenados por estrelas)
+    search_repos = 1000
+    latency = 0.0
+    # Multiplica a quantidade de revisões/comentários (PRs "movimentados")
+    activity_scale = 1
+    # Usados pelos testes entre uma coleta e outra: campos alterados por PR,
+    # {(repo, número): {campo: valor}}, e PRs cujo detalhe responde 404
+    edits = {}
+    unavailable = set()
+    # Limite de requisições por token e recurso a cada janela (0 = sem limite)
+    rate_limit = 0
+    rate_window = 60
+    _usage = {}
+    _usage_lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Cabeçalhos e corpo saem em escritas separadas; sem TCP_NODELAY o
+        # algoritmo de Nagle segura o corpo ~40 ms em conexões keep-alive
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _consume_rate_limit(self, resource):
+        """Contabiliza a requisição e devolve os cabeçalhos X-RateLimit-* correspondentes"""
+        limit = self.rate_limit or 5000
+        key = (self.headers.get("Authorization"), resource)
+        now = time.time()
+        with self._usage_lock:
+            window_start, used = self._usage.get(key, (now, 0))
+            if now - window_start >= self.rate_window:
+                window_start, used = now, 0
+            used += 1
+            self._usage[key] = (window_start, used)
+        self._rate_headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(limit - used, 0)),
+            "X-RateLimit-Reset": str(math.ceil(window_start + self.rate_window)),
+            "X-RateLimit-Resource": resource,
+        }
+        return not self.rate_limit or used <= limit
+
+    def _send_page(self, items, page, per_page):
+        """Envia uma página de uma lista com o cabeçalho Link, como a API real"""
+        last_page = max((len(items) + per_page - 1) // per_page, 1)
+        url = urlparse(self.path)
+        base = f"http://{self.headers.get('Host')}{url.path}"
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        links = []
+        if page < last_page:
+            links.append(f'<{base}?{urlencode({**query, "page": page + 1})}>; rel="next"')
+            links.append(f'<{base}?{urlencode({**query, "page": last_page})}>; rel="last"')
+        self._link = ", ".join(links)
+        start = (page - 1) * per_page
+        return self._send(items[start:start + per_page])
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        # Requisição condicional com ETag igual: 304 sem corpo, como na API real
+        not_modified = status == 200 and self.command == "GET" and self.headers.get("If-None-Match") == etag
+        self.send_response(304 if not_modified else status)
+        self.send_header("Content-Type", "application/json")
+        if status == 200:
+            self.send_header("ETag", etag)
+        for name, value in getattr(self, "_rate_headers", {}).items():
+            self.send_header(name, value)
+        if getattr(self, "_link", None):
+            self.send_header("Link", self._link)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rate_limited(self, resource):
+        if self._consume_rate_limit(resource):
+            return False
+        self._send({"message": "API rate limit exceeded"}, 403)
+        return True
+
+    def do_GET(self):
+        self._link = None
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["30"])[0])
+        parts = url.path.strip("/").split("/")
+        if self._rate_limited("search" if parts[0] == "search" else "core"):
+            return
+
+        if parts[:2] == ["search", "repositories"]:
+            low, high = parse_stars(query.get("q", [""])[0])
+            # repo_stars é decrescente: os repositórios da faixa formam um intervalo de índices
+            first = _first_index(lambda i: repo_stars(i) <= high, self.search_repos)
+            end = _first_index(lambda i: repo_stars(i) < low, self.search_repos)
+            total = max(end - first, 0)
+            start = (page - 1) * per_page
+            if start >= SEARCH_CAP:
+                return self._send({"message": "Only the first 1000 search results are available"}, 422)
+            items = [
+                {
+                    "id": i,
+                    "name": f"repo{i}",
+                    "full_name": f"org{i}/repo{i}",
+                    "html_url": f"https://github.com/org{i}/repo{i}",
+                    "stargazers_count": repo_stars(i),
+                    "forks_count": 1000 + i,
+                }
+                for i in range(first + start, first + min(start + per_page, total, SEARCH_CAP))
+            ]
+            return self._send({"total_count": total, "incomplete_results": False, "items": items})
+
+        if len(parts) < 4 or parts[0] != "repos":
+            return self._send({"message": "Not Found"}, 404)
+
+        repo = f"{parts[1]}/{parts[2]}"
+        rest = parts[3:]
+
+        if rest == ["pulls"]:
+            start = (page - 1) * per_page
+            prs = [make_pr(repo, n) for n in range(self.prs_per_repo, 0, -1)]
+            if query.get("sort") == ["updated"]:
+                prs.sort(key=lambda pr: pr["updated_at"], reverse=True)
+            return self._send_page(prs, page, per_page)
+
+        if len(rest) >= 2 and rest[1].isdigit():
+            number = int(rest[1])
+            if number < 1 or number > self.prs_per_repo:
+                return self._send({"message": "Not Found"}, 404)
+            if rest[0] == "pulls" and len(rest) == 2:
+                if (repo, number) in self.unavailable:
+                    return self._send({"message": "Not Found"}, 404)
+                return self._send(make_pr(repo, number))
+            activity = make_activity(repo, number)
+            if rest[0] == "pulls" and rest[2:] == ["reviews"]:
+                return self._send_page(activity["reviews"], page, per_page)
+            if rest[0] == "issues" and rest[2:] == ["comments"]:
+                return self._send_page(activity["issue_comments"], page, per_page)
+            if rest[0] == "pulls" and rest[2:] == ["comments"]:
+                return self._send_page(activity["review_comments"], page, per_page)
+
+        return self._send({"message": "Not Found"}, 404)
+
+    def do_POST(self):
+        self._link = None
+        if self.latency:
+            time.sleep(self.latency)
+        if urlparse(self.path).path.rstrip("/") != "/graphql":
+            return self._send({"message": "Not Found"}, 404)
+        if self._rate_limited("graphql"):
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        variables = body.get("variables", {})
+        repo = f"{variables['owner']}/{variables['name']}"
+
+        if "number" in variables:
+            # Páginas seguintes de comments ou reviews de um PR (fetch_prs_graphql.CONNECTION_QUERY)
+            connection = "reviews" if "reviews(" in body.get("query", "") else "comments"
+            node = make_graphql_node(repo, variables["number"], paged=False)
+            page = graphql_page(node[connection], variables.get("after"))
+            return self._send({"data": {"repository": {"pullRequest": {connection: page}}}})
+        first = variables.get("first", 50)
+        offset = int(variables.get("after") or 0)
+
+        # PRs em ordem decrescente de criação (ou de atualização), igual à listagem REST
+        numbers = list(range(self.prs_per_repo, 0, -1))
+        if (variables.get("orderBy") or {}).get("field") == "UPDATED_AT":
+            numbers.sort(key=lambda n: make_pr(repo, n)["updated_at"], reverse=True)
+        numbers = numbers[offset:offset + first]
+        end = offset + len(numbers)
+        return self._send({
+            "data": {
+                "repository": {
+                    "pullRequests": {
+                        "pageInfo": {"hasNextPage": end < self.prs_per_repo, "endCursor": str(end)},
+                        "nodes": [make_graphql_node(repo, n) for n in numbers],
+                    }
+                },
+                "rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2030-01-01T00:00:00Z"},
+            }
+        })
+
+
+def _first_index(predicate, size):
+    """Menor i em [0, size) com predicate(i) verdadeiro (predicate monótono), ou size"""
+    low, high = 0, size
+    while low < high:
+        mid = (low + high) // 2
+        if predicate(mid):
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def serve(port=8765, prs_per_repo=150, latency=0.0, rate_limit=0, rate_window=60, activity_scale=1,
+          search_repos=1000):
+    MockGitHubHandler.prs_per_repo = prs_per_repo
+    MockGitHubHandler.search_repos = search_repos
+    MockGitHubHandler.activity_scale = activity_scale
+    MockGitHubHandler.latency = latency
+    MockGitHubHandler.rate_limit = rate_limit
+    MockGitHubHandler.rate_window = rate_window
+    MockGitHubHandler.edits = {}
+    MockGitHubHandler.unavailable = set()
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockGitHubHandler)
+    print(f"[OK] Mock da API do GitHub em http://127.0.0.1:{server.server_port}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do GitHub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--prs-per-repo", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="atraso artificial por requisição, em segundos")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="requisições permitidas por token a cada janela (0 = sem limite)")
+    parser.add_argument("--rate-window", type=int, default=60,
+                        help="duração da janela de rate limit, em segundos")
+    parser.add_argument("--activity-scale", type=int, default=1,
+                        help="multiplica revisões e comentários por PR (testa a paginação)")
+    parser.add_argument("--search-repos", type=int, default=1000,
+                        help="repositórios encontrados pela busca (a API só devolve os 1000 primeiros por consulta)")
+    args = parser.parse_args()
+    serve(args.port, args.prs_per_repo, args.latency, args.rate_limit, args.rate_window,
+          args.activity_scale, args.search_repos).serve_forever()
@@ -0,0 +1,146 @@
+import io
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+import github_client
+
+try:
+    import ijson
+except ImportError:  # ijson é opcional; sem ele o corpo é decodificado com json
+    ijson = None
+
+# ============================================================
+# Paginação das listas da API REST do GitHub.
+#
+# O GitHub devolve 30 itens por página por padrão e indica a
+# próxima página no cabeçalho Link (rel="next"). Aqui as listas
+# são pedidas com per_page=100 (o máximo) e percorridas sob demanda.
+#
+# Quando o coletor só precisa de alguns campos (ex.: o login dos autores
+# das revisões), ``iter_logins`` e ``read_fields`` leem o corpo em
+# streaming com o ijson, sem montar a árvore de objetos da resposta;
+# sem o ijson, caem para json e extraem os mesmos campos.
+# ============================================================
+
+PER_PAGE = 100
+
+
+def with_params(url, **params):
+    """Acrescenta/substitui parâmetros de query em uma URL"""
+    parts = urlparse(url)
+    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def paginate(url, per_page=PER_PAGE):
+    """
+    Gera os itens de uma lista paginada, seguindo o Link rel="next".
+
+    As páginas são buscadas só quando o consumidor chega nelas, então parar a
+    iteração antes do fim economiza as requisições restantes. Uma resposta
+    diferente de 200 encerra a iteração.
+    """
+    url = with_params(url, per_page=per_page)
+    while url:
+        r = github_client.get(url)
+        if r.status_code != 200:
+            return
+        yield from r.json()
+        url = r.links.get("next", {}).get("url")
+
+
+def count_items(url, per_page=PER_PAGE):
+    """
+    Conta os itens de uma lista paginada com no máximo duas requisições.
+
+    Se houver mais de uma página, o Link rel="last" informa o número da última;
+    basta buscá-la para saber quantos itens ela tem:
+    total = (última - 1) * per_page + itens da última.
+    """
+    r = github_client.get(with_params(url, per_page=per_page))
+    if r.status_code != 200:
+        return 0
+    last = r.links.get("last", {}).get("url")
+    if not last:
+        return len(r.json())
+
+    last_page = int(parse_qs(urlparse(last).query)["page"][0])
+    r_last = github_client.get(last)
+    if r_last.status_code != 200:
+        return 0
+    return (last_page - 1) * per_page + len(r_last.json())
+
+
+# Eventos do ijson que abrem/fecham estruturas (os demais trazem valores)
+_STRUCTURE_EVENTS = {"start_map", "end_map", "start_array", "end_array", "map_key"}
+
+
+def _body_stream(response):
+    """Arquivo com o corpo: o stream da conexão ou, se o corpo já foi lido (cache/304), os bytes"""
+    if response.raw is None or getattr(response, "_content_consumed", False):
+        return io.BytesIO(response.content)
+    response.raw.decode_content = True  # descompacta o gzip durante a leitura
+    return response.raw
+
+
+def _get_path(data, path):
+    """Valor de um caminho pontuado (ex.: "user.login") em dicionários aninhados, ou None"""
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def read_items(response, fields):
+    """
+    Gera, para cada item da lista JSON da resposta, um dicionário só com os
+    caminhos ``fields`` (ex.: "number", "user.login") presentes no item.
+    """
+    try:
+        if ijson is None:
+            for item in response.json():
+                yield {field: _get_path(item, field) for field in fields if _get_path(item, field) is not None}
+            return
+        wanted = {f"item.{field}": field for field in fields}
+        values = {}
+        for prefix, event, value in ijson.parse(_body_stream(response), use_float=True):
+            if prefix in wanted and event not in _STRUCTURE_EVENTS:
+                values[wanted[prefix]] = value
+            elif prefix == "item" and event == "end_map":
+                yield values
+                values = {}
+    finally:
+        response.close()
+
+
+def read_fields(response, fields):
+    """Dicionário só com os caminhos ``fields`` (ex.: "id", "user.login") de um objeto JSON"""
+    try:
+        if ijson is None:
+            data = response.json()
+            return {field: _get_path(data, field) for field in fields if _get_path(data, field) is not None}
+        wanted = set(fields)
+        values = {}
+        for prefix, event, value in ijson.parse(_body_stream(response), use_float=True):
+            if prefix in wanted and event not in _STRUCTURE_EVENTS:
+                values[prefix] = value
+        return values
+    finally:
+        response.close()
+
+
+def iter_logins(url, per_page=PER_PAGE):
+    """
+    Gera, para cada item de uma lista paginada, o ``user.login`` do autor
+    (None se o usuário foi removido). Só o login é extraído de cada item.
+    """
+    url = with_params(url, per_page=per_page)
+    while url:
+        r = github_client.get(url, stream=True)
+        if r.status_code != 200:
+            r.close()
+            return
+        url = r.links.get("next", {}).get("url")
+        for item in read_items(r, ["user.login"]):
+            yield item.get("user.login")
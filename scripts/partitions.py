@@ -0,0 +1,315 @@
+import os
+import shutil
+import threading
+from importlib.util import find_spec
+
+# ============================================================
+# Dataset de PRs particionado por repositório.
+#
+# Layout:
+#   data/raw/prs/
+#       repo=facebook__react/part-00000.parquet
+#       repo=facebook__react/part-00001.parquet
+#       repo=torvalds__linux/part-00000.parquet
+#       state.json                 (checkpoints, ver checkpoint.py)
+#
+# Cada repositório é gravado durante a coleta, em arquivos de no
+# máximo BATCH_SIZE linhas, então a memória da coleta não cresce com
+# o total de PRs nem com o tamanho do maior repositório. O formato é Parquet (ou Arrow IPC) quando o pyarrow
+# está instalado e CSV caso contrário; a leitura aceita os três.
+# pandas e pyarrow só são importados nas funções que os usam, então
+# importar este módulo (coletores, --help) é barato; a coleta grava
+# Parquet direto do pyarrow, sem passar pelo pandas.
+#
+# Regravar uma partição nunca a apaga antes de a nova estar no lugar:
+# a versão antiga é renomeada para repo=<...>.old-<pid>-<thread>.tmp,
+# a nova entra no lugar e só então a antiga é removida. Se o processo
+# morrer entre as duas renomeações, ``recover`` (chamado antes de
+# gravar e de listar as partições) devolve a versão antiga ao lugar.
+# ============================================================
+
+# pyarrow é opcional
+HAS_ARROW = find_spec("pyarrow") is not None
+
+BATCH_SIZE = 5000
+# Tentativas de trocar a partição quando outro worker grava o mesmo repositório ao mesmo tempo
+SWAP_ATTEMPTS = 5
+ASIDE_MARKER = ".old-"
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# Colunas geradas pelos coletores (fetch_prs.collect_pr / fetch_prs_graphql.node_to_row)
+COLUMNS = [
+    ("repo_full_name", "string"),
+    ("id", "int64"),
+    ("number", "int64"),
+    ("title", "string"),
+    ("user", "string"),
+    ("created_at", "string"),
+    ("updated_at", "string"),
+    ("closed_at", "string"),
+    ("merged_at", "string"),
+    ("comments", "int64"),
+    ("review_comments", "int64"),
+    ("changed_files", "int64"),
+    ("additions", "int64"),
+    ("deletions", "int64"),
+    ("state", "string"),
+    ("merged", "bool"),
+    ("body_length", "int64"),
+    ("reviews_count", "int64"),
+    ("issue_comments_count", "int64"),
+    ("inline_review_comments_count", "int64"),
+    ("participants_count", "int64"),
+]
+
+
+def default_format():
+    return "parquet" if HAS_ARROW else "csv"
+
+
+def resolve_format(fmt):
+    """Valida o formato pedido; "auto" escolhe Parquet se possível"""
+    if fmt in (None, "auto"):
+        return default_format()
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    if fmt != "csv" and not HAS_ARROW:
+        print(f"[AVISO] pyarrow não instalado; gravando em CSV em vez de {fmt}")
+        return "csv"
+    return fmt
+
+
+def _arrow():
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    return pa, feather, pq
+
+
+def _arrow_schema():
+    pa, _, _ = _arrow()
+    types = {"string": pa.string(), "int64": pa.int64(), "bool": pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def partition_dir(root, repo_full_name):
+    return os.path.join(root, "repo=" + repo_full_name.replace("/", "__"))
+
+
+def _write_part(path, rows, fmt):
+    if fmt == "csv":
+        import pandas as pd
+        pd.DataFrame(rows, columns=[name for name, _ in COLUMNS]).to_csv(path, index=False)
+        return
+    pa, feather, pq = _arrow()
+    table = pa.Table.from_pylist(rows, schema=_arrow_schema())
+    if fmt == "parquet":
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+
+def recover(root, repo_full_name=None):
+    """
+    Devolve ao lugar partições deixadas de lado por uma troca interrompida.
+
+    Uma cópia ``.old-*.tmp`` sem a partição correspondente é a única versão
+    do repositório e volta a ser a partição; se a partição existe, a cópia é
+    resto de uma troca já concluída e é removida.
+    """
+    if not os.path.isdir(root):
+        return
+    prefix = os.path.basename(partition_dir(root, repo_full_name)) if repo_full_name else "repo="
+    for entry in os.scandir(root):
+        if not (entry.name.startswith(prefix) and ASIDE_MARKER in entry.name and entry.name.endswith(".tmp")):
+            continue
+        final_dir = os.path.join(root, entry.name.split(ASIDE_MARKER, 1)[0])
+        if os.path.exists(final_dir):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            continue
+        try:
+            os.replace(entry.path, final_dir)
+            print(f"[AVISO] Partição {os.path.basename(final_dir)} restaurada de uma troca interrompida")
+        except OSError:
+            pass  # outro processo restaurou ou regravou a partição nesse meio tempo
+
+
+def _swap(tmp_dir, final_dir):
+    """Coloca ``tmp_dir`` no lugar de ``final_dir`` sem que a partição deixe de existir em disco"""
+    aside = f"{final_dir}{ASIDE_MARKER}{os.getpid()}-{threading.get_ident()}.tmp"
+    error = None
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        moved = False
+        try:
+            if os.path.exists(final_dir):
+                os.replace(final_dir, aside)
+                moved = True
+            os.replace(tmp_dir, final_dir)
+        except OSError as exc:
+            # Outro worker gravou a mesma partição entre as duas renomeações
+            error = exc
+            if moved:
+                if os.path.exists(final_dir):
+                    # A versão deixada de lado já foi substituída pela do outro worker
+                    shutil.rmtree(aside, ignore_errors=True)
+                else:
+                    os.replace(aside, final_dir)
+            print(f"[AVISO] Troca da partição {os.path.basename(final_dir)} falhou "
+                  f"(tentativa {attempt}/{SWAP_ATTEMPTS}): {exc}")
+            continue
+        if moved:
+            shutil.rmtree(aside, ignore_errors=True)
+        return
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    raise RuntimeError(f"Não foi possível gravar a partição {final_dir} "
+                       f"após {SWAP_ATTEMPTS} tentativas") from error
+
+
+def write_partition(root, repo_full_name, rows, fmt="auto", batch_size=BATCH_SIZE, on_batch=None):
+    """
+    Grava (ou substitui) a partição de um repositório em lotes de ``batch_size`` linhas.
+
+    ``rows`` pode ser qualquer iterável de dicionários; só um lote fica em
+    memória por vez. A partição é montada em um diretório temporário e
+    trocada no final (ver ``_swap``), então uma coleta interrompida nunca deixa
+    partição pela metade nem apaga a versão anterior. ``on_batch``, se
+    informado, recebe cada lote antes de ele ser gravado (ex.: upsert no banco).
+    """
+    fmt = resolve_format(fmt)
+    final_dir = partition_dir(root, repo_full_name)
+    tmp_dir = f"{final_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+    recover(root, repo_full_name)
+    # Restos de uma gravação interrompida deste mesmo processo/thread
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    count = 0
+    part = 0
+    batch = []
+
+    def flush():
+        nonlocal part
+        if on_batch:
+            on_batch(batch)
+        _write_part(os.path.join(tmp_dir, f"part-{part:05d}{EXTENSIONS[fmt]}"), batch, fmt)
+        part += 1
+
+    for row in rows:
+        batch.append(row)
+        count += 1
+        if len(batch) >= batch_size:
+            flush()
+            batch = []
+    if batch:
+        flush()
+
+    _swap(tmp_dir, final_dir)
+    return count
+
+
+def _to_pandas(table):
+    import pandas as pd
+    pa, _, _ = _arrow()
+    # Inteiros/booleanos anuláveis continuam inteiros (e não float) no pandas
+    mapping = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}
+    return table.to_pandas(types_mapper=mapping.get)
+
+
+def _read_part(path, columns=None):
+    if path.endswith((".parquet", ".arrow")):
+        _, feather, pq = _arrow()
+    if path.endswith(".parquet"):
+        return _to_pandas(pq.read_table(path, columns=columns))
+    if path.endswith(".arrow"):
+        return _to_pandas(feather.read_table(path, columns=columns))
+    import pandas as pd
+    return pd.read_csv(path, usecols=columns)
+
+
+def part_files(root, repo_full_name=None):
+    """Arquivos de dados do dataset (ou de um repositório), em ordem estável"""
+    recover(root, repo_full_name)
+    if repo_full_name:
+        dirs = [partition_dir(root, repo_full_name)]
+    else:
+        dirs = sorted(
+            entry.path for entry in os.scandir(root)
+            if entry.is_dir() and entry.name.startswith("repo=") and not entry.name.endswith(".tmp")
+        )
+    files = []
+    for directory in dirs:
+        if os.path.isdir(directory):
+            files.extend(sorted(
+                os.path.join(directory, name) for name in os.listdir(directory)
+                if os.path.splitext(name)[1] in EXTENSIONS.values()
+            ))
+    return files
+
+
+def iter_frames(root, repo_names=None, columns=None):
+    """
+    Lê o dataset um arquivo por vez (memória constante).
+
+    ``repo_names`` define quais repositórios ler e em que ordem; sem ele são
+    lidas todas as partições em ordem alfabética.
+    """
+    if repo_names is None:
+        paths = part_files(root)
+    else:
+        paths = [path for repo in repo_names for path in part_files(root, repo)]
+    for path in paths:
+        yield _read_part(path, columns)
+
+
+def iter_rows(root, repo_full_name):
+    """Linhas de um repositório como dicionários (None no lugar de NaN), um arquivo por vez"""
+    for df in iter_frames(root, [repo_full_name]):
+        yield from df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def read_partition(root, repo_full_name):
+    """Linhas de um repositório como lista de dicionários (None no lugar de NaN)"""
+    return list(iter_rows(root, repo_full_name))
+
+
+def is_partitioned(path):
+    return os.path.isdir(path)
+
+
+def repo_names_in(root):
+    """Repositórios com partição no dataset, em ordem alfabética"""
+    recover(root)
+    return sorted(
+        entry.name[len("repo="):].replace("__", "/", 1)
+        for entry in os.scandir(root)
+        if entry.is_dir() and entry.name.startswith("repo=") and not entry.name.endswith(".tmp")
+    )
+
+
+def export_csv(root, output_path, repo_names=None):
+    """
+    Concatena as partições em um único CSV, um repositório por vez.
+
+    Linhas repetidas de ``(repo_full_name, number)`` (ex.: um repositório
+    regravado por dois workers da coleta distribuída) aparecem uma única vez.
+    """
+    import pandas as pd
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    total = 0
+    header = True
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        for repo in (repo_names if repo_names is not None else repo_names_in(root)):
+            frames = list(iter_frames(root, [repo]))
+            if not frames:
+                continue
+            df = pd.concat(frames, ignore_index=True)
+            df = df.drop_duplicates(subset=["repo_full_name", "number"], keep="last")
+            if df.empty:
+                continue
+            df.to_csv(f, index=False, header=header)
+            header = False
+            total += len(df)
+        if header:
+            # Dataset vazio: mantém ao menos o cabeçalho
+            f.write(",".join(name for name, _ in COLUMNS) + "\n")
+    return total
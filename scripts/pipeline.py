@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ============================================================
+# Orquestrador do pipeline: coleta → processamento → análise → gráficos/dashboard.
+#
+# Cada etapa declara as entradas (dados e scripts) e as saídas. Uma
+# etapa só é executada se alguma saída não existe ou se o hash do
+# conteúdo das entradas mudou desde a última execução bem-sucedida
+# (guardado em data/pipeline/state.json); as etapas de coleta só rodam
+# se a saída não existir ou com --force. Como as saídas de uma etapa
+# são entradas das seguintes, uma etapa que regenera arquivos idênticos
+# não invalida as posteriores. Etapas independentes (correlação,
+# gráficos e dashboard) rodam em paralelo. A saída de cada etapa vai para
+# data/pipeline/logs/<etapa>.log.
+#
+#   python scripts/pipeline.py                 # pipeline completo
+#   python scripts/pipeline.py graphs          # só o necessário para os gráficos
+#   python scripts/pipeline.py --force prs     # coleta de novo e refaz o que mudar
+# ============================================================
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.path.join("data", "pipeline")
+STATE_FILE = os.path.join(STATE_DIR, "state.json")
+LOG_DIR = os.path.join(STATE_DIR, "logs")
+
+RAW_CSV = "data/raw/prs_sample.csv"
+FINAL_CSV = "data/processed/final_dataset.csv"
+GRAPHS = [
+    f"results/graphs/{name}.png"
+    for name in (
+        "rq01_tamanho_vs_status", "rq02_tempo_vs_status", "rq03_descricao_vs_status",
+        "rq04_interacoes_vs_status", "rq05_tamanho_vs_revisoes", "rq06_tempo_vs_revisoes",
+        "rq07_descricao_vs_revisoes", "rq08_interacoes_vs_revisoes",
+    )
+]
+
+# Módulos compartilhados que fazem parte das entradas de cada etapa
+COLLECT_MODULES = [
+    "scripts/github_client.py", "scripts/rate_limit.py", "scripts/http_cache.py", "scripts/pagination.py",
+]
+DATASET_MODULES = ["scripts/dataset.py", "scripts/features.py", "scripts/pr_store.py", "scripts/cli_options.py"]
+
+
+class Stage:
+    """Etapa do pipeline: comando, dependências, entradas e saídas (caminhos relativos ao projeto)"""
+
+    def __init__(self, name, command, inputs, outputs, deps=(), external=False):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = list(deps)
+        # Etapas de coleta: o dado real vem da API, não das entradas locais; são
+        # refeitas só se a saída não existir (ou com --force)
+        self.external = external
+
+
+STAGES = [
+    Stage(
+        "repos",
+        ["scripts/fetch_repos.py"],
+        inputs=["scripts/fetch_repos.py", *COLLECT_MODULES],
+        outputs=["data/processed/top_repos.csv"],
+        external=True,
+    ),
+    Stage(
+        "prs",
+        ["scripts/fetch_prs.py"],
+        inputs=[
+            "data/processed/top_repos.csv", "scripts/fetch_prs.py", "scripts/fetch_prs_graphql.py",
+            "scripts/checkpoint.py", "scripts/partitions.py", "scripts/pr_store.py", *COLLECT_MODULES,
+        ],
+        outputs=[RAW_CSV],
+        deps=["repos"],
+        external=True,
+    ),
+    Stage(
+        "process",
+        ["scripts/process_data.py", RAW_CSV],
+        inputs=[RAW_CSV, "scripts/process_data.py", "scripts/partitions.py", "scripts/polars_backend.py",
+                *DATASET_MODULES],
+        outputs=[FINAL_CSV],
+        deps=["prs"],
+    ),
+    Stage(
+        "correlate",
+        ["scripts/correlacao.py"],
+        inputs=[FINAL_CSV, "scripts/correlacao.py", "scripts/polars_backend.py", *DATASET_MODULES],
+        outputs=["resultados/correlacoes.csv"],
+        deps=["process"],
+    ),
+    Stage(
+        "graphs",
+        ["scripts/generate_graphs.py"],
+        inputs=[
+            FINAL_CSV, "scripts/generate_graphs.py", "scripts/plotting.py", "scripts/sketch.py",
+            "scripts/stats_engine.py", *DATASET_MODULES,
+        ],
+        outputs=GRAPHS,
+        deps=["process"],
+    ),
+    Stage(
+        "dashboard",
+        ["scripts/export_dashboard.py"],
+        inputs=[FINAL_CSV, "scripts/export_dashboard.py", "scripts/correlacao.py", *DATASET_MODULES],
+        outputs=["data/processed/dashboard.json"],
+        deps=["process"],
+    ),
+]
+
+
+def _path(relative):
+    return os.path.join(PROJECT_DIR, relative)
+
+
+def inputs_hash(stage):
+    """Hash do conteúdo de todas as entradas e do comando da etapa (entrada ausente conta como vazia)"""
+    digest = hashlib.sha256(json.dumps(stage.command).encode())
+    for relative in sorted(stage.inputs):
+        digest.update(relative.encode() + b"\0")
+        try:
+            with open(_path(relative), "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            digest.update(b"<ausente>")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_state():
+    try:
+        with open(_path(STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(_path(STATE_DIR), exist_ok=True)
+    tmp = _path(STATE_FILE) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, _path(STATE_FILE))
+
+
+def is_stale(stage, state):
+    """Motivo para refazer a etapa, ou None se ela está atualizada"""
+    missing = [out for out in stage.outputs if not os.path.exists(_path(out))]
+    if missing:
+        return f"saída ausente: {missing[0]}"
+    if stage.external:
+        return None
+    if state.get(stage.name) != inputs_hash(stage):
+        return "entradas modificadas"
+    return None
+
+
+def select(targets, stages=STAGES):
+    """Etapas necessárias para ``targets`` (com as dependências), na ordem do pipeline"""
+    by_name = {stage.name: stage for stage in stages}
+    needed = set()
+    pending = list(targets or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in by_name:
+            raise ValueError(f"Etapa desconhecida: {name} (disponíveis: {', '.join(by_name)})")
+        if name not in needed:
+            needed.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in needed]
+
+
+def run_stage(stage):
+    """Executa o comando da etapa com a saída em data/pipeline/logs; devolve (código, segundos)"""
+    os.makedirs(_path(LOG_DIR), exist_ok=True)
+    log_path = _path(os.path.join(LOG_DIR, f"{stage.name}.log"))
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        code = subprocess.call(
+            [sys.executable, *stage.command], cwd=PROJECT_DIR, stdout=log, stderr=subprocess.STDOUT,
+        )
+    return code, time.perf_counter() - start
+
+
+def _tail(path, lines=20):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def run(targets=None, force=(), jobs=2, dry_run=False):
+    """
+    Executa as etapas desatualizadas de ``targets`` (padrão: todas), em paralelo
+    quando as dependências permitem. Etapas em ``force`` são refeitas mesmo
+    atualizadas. Devolve True se nada falhou.
+    """
+    wall_start = time.perf_counter()
+    stages = select(targets)
+    state = load_state()
+    report = {}
+    running = {}
+
+    def launch_ready(pool):
+        # As etapas estão em ordem topológica: uma única passada já resolve
+        # as etapas atualizadas e as que dependem delas
+        for stage in stages:
+            name = stage.name
+            if name in report or name in running.values():
+                continue
+            deps = [report.get(dep, ("",))[0] for dep in stage.deps]
+            if any(status in ("falhou", "não executada") for status in deps):
+                report[name] = ("não executada", 0.0, "dependência falhou")
+                continue
+            if not all(status in ("executada", "atualizada", "pendente") for status in deps):
+                continue
+            if name in force:
+                reason = "forçada"
+            elif "pendente" in deps:
+                reason = "depende de etapa pendente"
+            else:
+                reason = is_stale(stage, state)
+            if reason is None:
+                report[name] = ("atualizada", 0.0, "")
+            elif dry_run:
+                print(f"[PIPELINE] {name}: seria executada ({reason})")
+                report[name] = ("pendente", 0.0, reason)
+            else:
+                print(f"[PIPELINE] {name}: executando ({reason})")
+                running[pool.submit(run_stage, stage)] = name
+
+    by_name = {stage.name: stage for stage in stages}
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        launch_ready(pool)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                code, elapsed = future.result()
+                log_path = os.path.join(LOG_DIR, f"{name}.log")
+                if code == 0:
+                    # Hash das entradas depois da execução (as etapas anteriores já terminaram)
+                    state[name] = inputs_hash(by_name[name])
+                    save_state(state)
+                    report[name] = ("executada", elapsed, "")
+                    print(f"[PIPELINE] {name}: ok em {elapsed:.1f}s (log: {log_path})")
+                else:
+                    report[name] = ("falhou", elapsed, f"código {code}")
+                    print(f"[ERRO] {name} falhou (código {code}); fim de {log_path}:")
+                    print(_tail(_path(log_path)))
+            launch_ready(pool)
+
+    print("\n" + "=" * 60)
+    print(f"{'Etapa':<12}{'Situação':<16}{'Tempo (s)':>10}")
+    print("-" * 60)
+    total = 0.0
+    for stage in stages:
+        status, elapsed, detail = report.get(stage.name, ("não executada", 0.0, ""))
+        total += elapsed
+        print(f"{stage.name:<12}{status:<16}{elapsed:>10.1f}  {detail}")
+    print("-" * 60)
+    print(f"{'Soma das etapas':<28}{total:>10.1f}")
+    print(f"{'Tempo total (paralelo)':<28}{time.perf_counter() - wall_start:>10.1f}")
+    return not any(status in ("falhou", "não executada") for status, _, _ in report.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa o pipeline refazendo só as etapas desatualizadas")
+    parser.add_argument("targets", nargs="*",
+                        help=f"Etapas finais desejadas (padrão: todas): {', '.join(s.name for s in STAGES)}")
+    parser.add_argument("--force", nargs="+", default=[], metavar="ETAPA",
+                        help="Refaz as etapas indicadas mesmo se atualizadas")
+    parser.add_argument("--jobs", type=int, default=2,
+                        help="Etapas independentes executadas ao mesmo tempo (padrão: 2)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Só mostra o que seria executado")
+    args = parser.parse_args(argv)
+    sys.exit(0 if run(args.targets, set(args.force), args.jobs, args.dry_run) else 1)
+
+
+if __name__ == "__main__":
+    main()
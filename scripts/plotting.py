@@ -0,0 +1,103 @@
+import numpy as np
+
+import cli_options
+from sketch import QuantileSketch
+
+# ============================================================
+# Gráficos com custo limitado para datasets grandes.
+#
+# Até AGGREGATE_THRESHOLD pontos os gráficos são desenhados como
+# sempre (boxplot/scatter do matplotlib, com todos os pontos). Acima
+# disso, no modo "auto", o custo passa a depender do número de bins e
+# não do número de PRs:
+#   - boxplots: quartis e whiskers vêm de um QuantileSketch (sketch.py)
+#     e a caixa é desenhada com Axes.bxp; os outliers desenhados são
+#     limitados a MAX_FLIERS (sempre incluindo os extremos);
+#   - scatters: viram mapas de densidade hexbin com GRIDSIZE hexágonos
+#     por eixo e cor em escala log.
+# ============================================================
+
+# Limite e modos ficam em cli_options.py (o --help da CLI não importa este módulo)
+AGGREGATE_THRESHOLD = cli_options.AGGREGATE_THRESHOLD
+MAX_FLIERS = 2_000
+GRIDSIZE = 60
+
+MODES = cli_options.PLOT_MODES
+
+# Modo atual: "auto" (agrega só acima do limite), "raw" ou "aggregated"
+mode = "auto"
+
+
+def set_mode(new_mode):
+    global mode
+    if new_mode not in MODES:
+        raise ValueError(f"Modo de gráfico desconhecido: {new_mode}")
+    mode = new_mode
+
+
+def aggregated(n):
+    """True se ``n`` pontos devem ser desenhados de forma agregada no modo atual"""
+    return mode == "aggregated" or (mode == "auto" and n > AGGREGATE_THRESHOLD)
+
+
+def box_stats(values, label):
+    """
+    Estatísticas de um box (formato de ``Axes.bxp``) a partir de um sketch de quantis.
+
+    Segue a regra do boxplot do matplotlib: whiskers no dado mais extremo dentro
+    de 1.5 * IQR dos quartis; o que passa disso é outlier.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    sketch = QuantileSketch().add(values)
+    if sketch.count == 0:
+        return {"label": label, "med": np.nan, "q1": np.nan, "q3": np.nan,
+                "whislo": np.nan, "whishi": np.nan, "fliers": np.array([])}
+
+    q1, med, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_limit, high_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    # Último dado <= high_limit e primeiro dado >= low_limit, pela posição no sketch
+    n = sketch.count
+    above = n - sketch.rank(high_limit)
+    whishi = sketch.max if above == 0 else min(sketch.quantile((n - above - 1) / max(n - 1, 1)), high_limit)
+    below = sketch.rank(np.nextafter(low_limit, -np.inf))
+    whislo = sketch.min if below == 0 else max(sketch.quantile(below / max(n - 1, 1)), low_limit)
+    whishi, whislo = max(whishi, q3), min(whislo, q1)
+
+    fliers = values[(values > whishi) | (values < whislo)]
+    if len(fliers) > MAX_FLIERS:
+        # Amostra determinística, mantendo os extremos
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(fliers), MAX_FLIERS - 2, replace=False)
+        fliers = np.concatenate([[fliers.min(), fliers.max()], fliers[sample]])
+    return {"label": label, "med": med, "q1": q1, "q3": q3,
+            "whislo": whislo, "whishi": whishi, "fliers": fliers}
+
+
+def _labels_keyword():
+    """Nome do parâmetro de rótulos do Axes.boxplot: tick_labels a partir do matplotlib 3.9, antes labels"""
+    import matplotlib
+    major, minor = (int(part) for part in matplotlib.__version__.split(".")[:2])
+    return "tick_labels" if (major, minor) >= (3, 9) else "labels"
+
+
+def boxplot(ax, data, labels, colors):
+    """Boxplot colorido de ``data`` (uma série por caixa); agrega se as séries forem grandes"""
+    if aggregated(max(len(values) for values in data)):
+        bp = ax.bxp([box_stats(values, label) for values, label in zip(data, labels)], patch_artist=True)
+    else:
+        bp = ax.boxplot(data, patch_artist=True, **{_labels_keyword(): labels})
+    for patch, color in zip(bp['boxes'], colors):
+        patch.set_facecolor(color)
+    return bp
+
+
+def scatter(ax, x, y):
+    """Dispersão de ``x`` vs ``y``; acima do limite vira um hexbin de densidade"""
+    if aggregated(len(x)):
+        hb = ax.hexbin(x, y, gridsize=GRIDSIZE, bins='log', mincnt=1, cmap='Blues')
+        ax.figure.colorbar(hb, ax=ax, label='PRs (escala log)')
+        return hb
+    return ax.scatter(x, y, alpha=0.5, s=30)
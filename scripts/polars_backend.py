@@ -0,0 +1,187 @@
+import partitions
+
+try:
+    import polars as pl
+except ImportError:  # polars é opcional
+    pl = None
+
+# ============================================================
+# Backend Polars (opcional) para o processamento e a correlação.
+#
+# No caminho pandas, process_data.py lê o CSV bruto inteiro, cria as
+# colunas derivadas para todas as linhas, filtra e copia as colunas
+# finais, com várias cópias do tamanho do dataset no meio do caminho.
+# Aqui as mesmas etapas são um único plano LazyFrame:
+#
+#   scan (CSV ou partições) -> datas -> métricas derivadas -> filtro -> colunas finais
+#
+# O otimizador do Polars lê só as colunas usadas, aplica o filtro logo
+# depois das colunas de que ele depende e executa em todos os núcleos.
+# Na correlação, a leitura do dataset final, a remoção de ausentes e o
+# ranqueamento das colunas também saem de um só plano; rho e p-valor
+# continuam sendo calculados por correlacao.py a partir dos postos.
+#
+# As fórmulas repetem as de features.add_features e o filtro de
+# process_data._process_frame. A saída tem que ser idêntica à do pandas,
+# o que é conferido com --check-parity em process_data.py e correlacao.py.
+# O banco SQLite (pr_store.py) e datasets finais antigos, sem as métricas,
+# continuam no caminho pandas.
+# ============================================================
+
+DATE_COLUMNS = ["created_at", "closed_at", "merged_at"]
+
+
+def available():
+    return pl is not None
+
+
+def require():
+    if pl is None:
+        raise RuntimeError("Backend polars indisponível: instale com `pip install polars`")
+
+
+def _parse_dates(columns):
+    """Texto ISO 8601 -> datetime UTC em microssegundos (a mesma resolução do pandas)"""
+    return [pl.col(col).str.to_datetime(time_unit="us", time_zone="UTC") for col in columns]
+
+
+def _hours(microseconds):
+    """
+    Microssegundos -> horas, com as mesmas duas divisões de features.add_features
+    (``total_seconds() / 3600``). Expressões Polars dividem por constante
+    multiplicando pelo inverso, o que muda o último bit de alguns valores;
+    em NumPy a divisão é exata e a saída fica idêntica à do pandas.
+    """
+    return pl.Series(microseconds.name, microseconds.to_numpy() / 1e6 / 3600, nan_to_null=True)
+
+
+def scan_raw(path):
+    """LazyFrame dos PRs brutos: CSV consolidado ou diretório do dataset particionado"""
+    if not partitions.is_partitioned(path):
+        return pl.scan_csv(path)
+    frames = []
+    for part in partitions.part_files(path):
+        if part.endswith(".parquet"):
+            frames.append(pl.scan_parquet(part))
+        elif part.endswith(".arrow"):
+            frames.append(pl.scan_ipc(part))
+        else:
+            frames.append(pl.scan_csv(part))
+    if not frames:
+        raise FileNotFoundError(f"Nenhuma partição em {path}")
+    return pl.concat(frames, how="diagonal_relaxed")
+
+
+def process_plan(raw, columns):
+    """Plano de process_data._process_frame: datas, métricas derivadas, filtro e colunas finais"""
+    end_date = pl.coalesce("merged_at", "closed_at")
+    return (
+        raw.with_columns(_parse_dates(DATE_COLUMNS))
+        # features.add_features
+        .with_columns(
+            review_time_h=(end_date - pl.col("created_at")).dt.total_microseconds()
+            .map_batches(_hours, return_dtype=pl.Float64, is_elementwise=True),
+            tamanho=pl.col("additions") + pl.col("deletions") + pl.col("changed_files"),
+            interacoes=pl.col("comments") + pl.col("review_comments"),
+            total_lines=pl.col("additions") + pl.col("deletions"),
+            total_interactions=pl.col("comments") + pl.col("participants_count"),
+            status=pl.col("merged_at").is_not_null().cast(pl.Int8),
+        )
+        .filter(
+            (pl.col("review_time_h") >= 1)
+            & pl.col("state").is_in(["closed", "merged"])
+            & (pl.col("reviews_count") > 0)
+        )
+        .select(columns)
+    )
+
+
+def _to_pandas(frame, nullable_ints):
+    """
+    DataFrame pandas com os tipos que o caminho pandas produziria.
+
+    Do CSV bruto, inteiros com ausentes viram float (como no pd.read_csv); das
+    partições, inteiros anuláveis (como em partitions._to_pandas).
+    """
+    import pandas as pd
+    df = frame.to_pandas()
+    if nullable_ints:
+        for col, dtype in frame.schema.items():
+            if dtype.is_integer() and frame[col].null_count() and dtype != pl.Int8:
+                df[col] = pd.array(frame[col].to_list(), dtype="Int64")
+            elif dtype == pl.Boolean and frame[col].null_count():
+                df[col] = pd.array(frame[col].to_list(), dtype="boolean")
+    return df
+
+
+def process_raw(path, columns):
+    """
+    Executa o plano de processamento sobre ``path``.
+
+    Devolve ``(df_final, total)``: o dataset final em pandas e o número de PRs
+    brutos, contados no mesmo scan (os dois planos são executados juntos).
+    """
+    require()
+    raw = scan_raw(path)
+    final, total = pl.collect_all([process_plan(raw, columns), raw.select(pl.len())])
+    return _to_pandas(final, nullable_ints=partitions.is_partitioned(path)), total.item()
+
+
+def _filter_expr(col, op, value):
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    column = pl.col(col)
+    return {
+        "==": lambda: column == value,
+        "!=": lambda: column != value,
+        ">": lambda: column > value,
+        ">=": lambda: column >= value,
+        "<": lambda: column < value,
+        "<=": lambda: column <= value,
+        "in": lambda: column.is_in(list(value)),
+    }[op]()
+
+
+def scan_final(path, filters=None):
+    """LazyFrame do dataset final (Parquet ou CSV), com nomes atuais e os filtros de dataset.load_final"""
+    import dataset
+    frame = pl.scan_parquet(path) if path.endswith(".parquet") else pl.scan_csv(path)
+    names = frame.collect_schema().names()
+    frame = frame.rename({old: new for old, new in dataset.LEGACY_NAMES.items() if old in names})
+    filtered = {col for col, _, _ in filters or []}
+    if not path.endswith(".parquet") and filtered & set(dataset.DATE_COLUMNS):
+        frame = frame.with_columns(_parse_dates(sorted(filtered & set(dataset.DATE_COLUMNS))))
+    for col, op, value in filters or []:
+        frame = frame.filter(_filter_expr(col, op, value))
+    return frame
+
+
+def supports_final(path):
+    """True se o dataset final em ``path`` pode ser lido por este backend"""
+    import dataset
+    import features
+    return (pl is not None and path.endswith((".parquet", ".csv"))
+            and set(features.FEATURE_COLUMNS) <= set(dataset.columns_in(path)))
+
+
+def load_ranked(path, columns, ranked, dropna, filters=None):
+    """
+    Colunas ``columns`` do dataset final sem linhas ausentes em ``dropna``, e os postos de ``ranked``.
+
+    Devolve ``(df, ranks)``: ``df`` em pandas e ``ranks`` como matriz NumPy
+    (PRs x ``ranked``), com postos médios nos empates, como scipy.stats.rankdata.
+    """
+    import dataset
+    require()
+    # Como em dataset.apply_schema: contagens ausentes valem 0, floats NaN são ausentes
+    counts = [col for col in columns if dataset.SCHEMA.get(col, "").startswith("int")]
+    frame = (
+        scan_final(path, filters)
+        .select(columns)
+        .with_columns(pl.col(counts).fill_null(0), pl.col(pl.Float32, pl.Float64).fill_nan(None))
+        .drop_nulls(dropna)
+        .with_columns(pl.col(col).rank("average").alias(f"__rank_{col}") for col in ranked)
+        .collect()
+    )
+    ranks = frame.select(f"__rank_{col}" for col in ranked).to_numpy().astype(float)
+    return frame.select(columns).to_pandas(), ranks
@@ -0,0 +1,61 @@
+import partitions
+
+# ============================================================
+# Registro compacto de um PR coletado.
+#
+# Os coletores guardam todos os PRs do repositório em andamento até
+# gravar a partição. Como dicionários, cada linha carrega uma tabela
+# de hash própria com as 20 chaves; com __slots__ os valores ficam em
+# posições fixas do objeto (sem __dict__), o que reduz a memória por
+# PR a uma fração. ``as_dicts`` converte para dicionários só na hora
+# de gravar, lote a lote (partitions.write_partition).
+#
+# ``RepoRows`` envolve os geradores de coleta (fetch_prs.iter_repo,
+# fetch_prs_graphql.iter_repo_graphql): as linhas vão direto para a
+# partição, lote a lote, e o watermark do repositório fica disponível
+# quando a iteração termina.
+# ============================================================
+
+FIELDS = tuple(name for name, _ in partitions.COLUMNS)
+
+
+class PullRequestRecord:
+    """Uma linha do dataset de PRs (colunas de partitions.COLUMNS); aceita ``record["campo"]``"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for name in FIELDS:
+            setattr(self, name, values.get(name))
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __eq__(self, other):
+        return isinstance(other, PullRequestRecord) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f"PullRequestRecord({self.repo_full_name}#{self.number})"
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+
+class RepoRows:
+    """Linhas de um repositório geradas sob demanda; ``watermark`` é o valor devolvido pelo gerador"""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self.watermark = None
+
+    def __iter__(self):
+        self.watermark = yield from self._rows
+
+
+def as_dicts(rows):
+    """Gera dicionários a partir de registros (dicionários passam sem mudança)"""
+    for row in rows:
+        yield row.as_dict() if isinstance(row, PullRequestRecord) else row
@@ -0,0 +1,236 @@
+import argparse
+import os
+import sqlite3
+
+import partitions
+from pr_record import as_dicts
+
+# ============================================================
+# Banco SQLite com os PRs coletados (data/raw/prs.sqlite).
+#
+# Uma linha por PR, com chave (repo_full_name, number) e as colunas de
+# partitions.COLUMNS, incluindo updated_at. O coletor faz upsert de
+# cada repositório concluído: um PR já gravado só é substituído por
+# uma versão com updated_at igual ou mais recente, então coletas
+# repetidas, incrementais ou de vários workers convergem para o mesmo
+# estado. Índices:
+#   - chave primária (repo_full_name, number): consultas por repositório;
+#   - state e created_at: filtros por estado e por intervalo de datas.
+# process_data.py e os scripts de análise leem daqui só as linhas
+# pedidas (ex.: um repositório ou um período), sem varrer o dataset
+# inteiro; as datas são texto ISO 8601 em UTC, então comparar strings
+# é comparar instantes.
+#
+# Como a fila (work_queue.py), o SQLite usa o journal padrão (e não
+# WAL) para funcionar também em sistemas de arquivos de rede.
+# ============================================================
+
+DEFAULT_PATH = "data/raw/prs.sqlite"
+EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+# Linhas por DataFrame na leitura em pedaços
+CHUNK_ROWS = 100_000
+
+SQL_TYPES = {"string": "TEXT", "int64": "INTEGER", "bool": "INTEGER"}
+COLUMN_NAMES = [name for name, _ in partitions.COLUMNS]
+# Chave primária: o upsert atualiza todas as outras colunas
+KEY_COLUMNS = ("repo_full_name", "number")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS prs (\n"
+    + ",\n".join(
+        f"    {name} {SQL_TYPES[kind]}{' NOT NULL' if name in KEY_COLUMNS else ''}"
+        for name, kind in partitions.COLUMNS
+    )
+    + f",\n    PRIMARY KEY ({', '.join(KEY_COLUMNS)})\n)",
+    "CREATE INDEX IF NOT EXISTS prs_state ON prs (state)",
+    "CREATE INDEX IF NOT EXISTS prs_created_at ON prs (created_at)",
+]
+
+UPSERT = (
+    f"INSERT INTO prs ({', '.join(COLUMN_NAMES)}) VALUES ({', '.join('?' for _ in COLUMN_NAMES)})\n"
+    f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET\n"
+    + ",\n".join(f"    {name} = excluded.{name}" for name in COLUMN_NAMES if name not in KEY_COLUMNS)
+    + "\nWHERE excluded.updated_at IS NULL OR prs.updated_at IS NULL OR excluded.updated_at >= prs.updated_at"
+)
+
+SQL_OPS = {"==": "=", "!=": "!=", ">": ">", ">=": ">=", "<": "<", "<=": "<="}
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def is_store(path):
+    return str(path).endswith(EXTENSIONS)
+
+
+def _sql_value(value):
+    """Valor de filtro no formato gravado no banco (datas viram texto ISO 8601 em UTC)"""
+    if hasattr(value, "tz_convert"):
+        value = value.tz_convert("UTC") if value.tzinfo else value
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+def where_clause(filters):
+    """
+    Traduz filtros no formato de dataset.load_final para SQL.
+
+    Devolve ``(where, params, restantes)``: só filtros sobre colunas do banco
+    entram no WHERE; os demais (ex.: métricas derivadas) ficam para depois da leitura.
+    """
+    clauses, params, rest = [], [], []
+    for col, op, value in filters or []:
+        if col not in COLUMN_NAMES or (op not in SQL_OPS and op != "in"):
+            rest.append((col, op, value))
+        elif op == "in":
+            values = [_sql_value(v) for v in value]
+            clauses.append(f"{col} IN ({', '.join('?' for _ in values)})" if values else "0")
+            params.extend(values)
+        else:
+            clauses.append(f"{col} {SQL_OPS[op]} ?")
+            params.append(_sql_value(value))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params, rest
+
+
+def query_filters(repos=None, since=None, until=None, states=None):
+    """Filtros de repositório, estado e intervalo de criação ([since, until)) no formato de dataset.load_final"""
+    import pandas as pd
+    filters = []
+    if repos:
+        filters.append(("repo_full_name", "in", list(repos)))
+    if states:
+        filters.append(("state", "in", list(states)))
+    if since:
+        filters.append(("created_at", ">=", pd.Timestamp(since, tz="UTC")))
+    if until:
+        filters.append(("created_at", "<", pd.Timestamp(until, tz="UTC")))
+    return filters
+
+
+def add_query_arguments(parser):
+    """Opções --repo/--since/--until (ver ``query_filters``) de process_data.py e dos scripts de análise"""
+    parser.add_argument("--repo", action="append", help="só PRs deste repositório (pode repetir)")
+    parser.add_argument("--since", help="só PRs criados a partir desta data (ex.: 2024-01-01)")
+    parser.add_argument("--until", help="só PRs criados antes desta data")
+
+
+class PRStore:
+    """PRs coletados em SQLite, com upsert por (repo_full_name, number)"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # isolation_level=None: transações controladas explicitamente com BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, rows):
+        """Grava PRs (registros ou dicionários); versões mais antigas que a gravada são ignoradas"""
+        values = [tuple(row.get(name) for name in COLUMN_NAMES) for row in as_dicts(rows)]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(UPSERT, values)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(values)
+
+    def repo_names(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT repo_full_name FROM prs ORDER BY 1")]
+
+    def count(self, filters=None):
+        where, params, _ = where_clause(filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM prs{where}", params).fetchone()[0]
+
+    def iter_frames(self, filters=None, columns=None, chunk_rows=CHUNK_ROWS):
+        """
+        DataFrames de até ``chunk_rows`` linhas com os PRs que passam nos filtros.
+
+        Os tipos são os de partitions.py (inteiros anuláveis, ``merged`` booleano)
+        e a ordem é a do dataset particionado: repositório, depois PR mais novo primeiro.
+        Filtros sobre colunas que não estão no banco são ignorados aqui (ver ``where_clause``).
+        """
+        import pandas as pd
+        columns = list(columns or COLUMN_NAMES)
+        where, params, _ = where_clause(filters)
+        sql = f"SELECT {', '.join(columns)} FROM prs{where} ORDER BY repo_full_name, number DESC"
+        dtypes = empty_frame(columns).dtypes.to_dict()
+        for df in pd.read_sql_query(sql, self.conn, params=params, chunksize=chunk_rows):
+            yield df.astype(dtypes)
+
+    def load(self, filters=None, columns=None):
+        import pandas as pd
+        frames = list(self.iter_frames(filters, columns))
+        return pd.concat(frames, ignore_index=True) if frames else empty_frame(columns)
+
+
+def empty_frame(columns=None):
+    """DataFrame vazio com as colunas e os tipos de ``iter_frames``"""
+    import pandas as pd
+    dtypes = {"int64": "Int64", "bool": "boolean"}
+    return pd.DataFrame({name: pd.Series(dtype=dtypes.get(kind, object))
+                         for name, kind in partitions.COLUMNS if columns is None or name in columns})
+
+
+def load_final(columns=None, filters=None, path=DEFAULT_PATH):
+    """
+    Dataset final (process_data.py) calculado a partir do banco, no schema de dataset.py.
+
+    Filtros sobre colunas do banco (repositório, estado, created_at, ...) viram
+    consultas indexadas; filtros sobre métricas derivadas são aplicados depois.
+    """
+    import pandas as pd
+    import dataset
+    from process_data import _process_frame
+
+    store = PRStore(path)
+    try:
+        frames = [_process_frame(df) for df in store.iter_frames(filters)] or [_process_frame(empty_frame())]
+    finally:
+        store.close()
+    df = dataset.apply_schema(pd.concat(frames, ignore_index=True))
+    for col, op, value in where_clause(filters)[2]:
+        df = df[dataset.OPS[op](df[col], value)]
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df.reset_index(drop=True)
+
+
+def import_dataset(source, path=DEFAULT_PATH):
+    """Carrega no banco um dataset bruto existente (CSV consolidado ou diretório particionado)"""
+    import dataset
+    store = PRStore(path)
+    total = 0
+    try:
+        if partitions.is_partitioned(source):
+            frames = partitions.iter_frames(source)
+        else:
+            import pandas as pd
+            frames = pd.read_csv(source, chunksize=CHUNK_ROWS)
+        for df in frames:
+            df = df.rename(columns=dataset.LEGACY_NAMES)
+            rows = df.astype(object).where(df.notna(), None).to_dict("records")
+            total += store.upsert(rows)
+        return total, store.count()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banco SQLite dos PRs coletados")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--import", dest="source",
+                        help="importa um dataset bruto existente (data/raw/prs_sample.csv ou data/raw/prs)")
+    args = parser.parse_args()
+    if args.source:
+        imported, stored = import_dataset(args.source, args.db)
+        print(f"[OK] {imported} PRs importados de {args.source}; {stored} PRs em {args.db}")
+    else:
+        store = PRStore(args.db)
+        print(f"[INFO] {store.count()} PRs de {len(store.repo_names())} repositórios em {args.db}")
+        store.close()
@@ -1,18 +1,60 @@
 import pandas as pd
 import os
+import sys
+import contextlib
+import filecmp
+import io
+import tempfile
+import time
 
-def process_prs(file_path="data/raw/prs_sample.csv"):
-    print("[INFO] Iniciando processamento do dataset bruto...")
+import cli_options
+import dataset
+import features
+import partitions
+import pr_store
+
+# "polars": plano lazy único de polars_backend.py (opcional), com a mesma saída
+BACKENDS = cli_options.BACKENDS
+
+COLUNAS_FINAL = [
+    "repo_full_name",
+    "id",
+    "number",
+    "state",
+    "merged",
+    "created_at",
+    "closed_at",
+    "merged_at",
+    "review_time_h",
+    "changed_files",
+    "additions",
+    "deletions",
+    "body_length",
+    "comments",
+    "review_comments",
+    "participants_count",
+    "reviews_count",
+    "issue_comments_count",
+    "inline_review_comments_count",
+    # Métricas derivadas, calculadas uma única vez aqui (ver features.py)
+    "tamanho",
+    "interacoes",
+    "total_lines",
+    "total_interactions",
+    "status",
+]
 
-    # Lê o CSV com os PRs brutos
-    df = pd.read_csv(file_path, parse_dates=["created_at", "closed_at", "merged_at"])
-    print(f"[INFO] PRs carregados: {len(df)}")
+
+def _process_frame(df):
+    """Calcula as métricas derivadas, filtra os PRs válidos e seleciona as colunas finais"""
+    for col in ["created_at", "closed_at", "merged_at"]:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], utc=True)
 
     # =============================
-    # 1. Calcular tempo de análise
+    # 1. Calcular tempo de análise e demais métricas derivadas
     # =============================
-    df["end_date"] = df["merged_at"].fillna(df["closed_at"])
-    df["review_time_h"] = (df["end_date"] - df["created_at"]).dt.total_seconds() / 3600
+    df = features.add_features(df)
 
     # =============================
     # 2. Filtrar PRs válidos
@@ -23,48 +65,143 @@ def process_prs(file_path="data/raw/prs_sample.csv"):
         (df["reviews_count"] > 0)                   # pelo menos uma revisão
     ]
 
-    print(f"[INFO] PRs após filtragem: {len(df)}")
-
     # =============================
     # 3. Selecionar métricas relevantes
     # =============================
-    colunas_final = [
-        "repo_full_name",
-        "id",
-        "number",
-        "state",
-        "merged",
-        "created_at",
-        "closed_at",
-        "merged_at",
-        "review_time_h",
-        "changed_files",
-        "additions",
-        "deletions",
-        "body_length",
-        "participants_count",
-        "reviews_count",
-        "issue_comments_count",
-        "inline_review_comments_count"
-    ]
-
     # Garante que só as colunas necessárias fiquem no CSV final
-    df_final = df[colunas_final].copy()
+    return df[COLUNAS_FINAL].copy()
+
+
+def _raw_frames(file_path, filters=None):
+    """DataFrames brutos do dataset particionado ou do banco SQLite (consulta indexada com ``filters``)"""
+    if pr_store.is_store(file_path):
+        store = pr_store.PRStore(file_path)
+        try:
+            print(f"[INFO] Consultando {store.count(filters)} PRs em {file_path}")
+            yield from store.iter_frames(filters)
+        finally:
+            store.close()
+    else:
+        yield from partitions.iter_frames(file_path)
+
+
+def process_prs(file_path="data/raw/prs_sample.csv", filters=None, backend="pandas",
+                output_path=dataset.CSV_PATH, parquet_path=dataset.PARQUET_PATH):
+    """
+    Gera data/processed/final_dataset.csv (e final_dataset.parquet, com o
+    schema tipado de dataset.py) a partir dos PRs brutos.
+
+    ``file_path`` pode ser o CSV consolidado, o diretório do dataset
+    particionado gerado por fetch_prs.py (data/raw/prs) ou o banco SQLite
+    dos PRs (data/raw/prs.sqlite); nos dois últimos casos os PRs são
+    processados em pedaços, com memória constante. ``filters`` (só com o
+    banco, ver pr_store.query_filters) restringe a consulta, ex.: a um
+    repositório ou a um intervalo de datas de criação.
+
+    Com ``backend="polars"`` o CSV ou as partições são processados por um
+    único plano lazy (polars_backend.py); os arquivos gerados são os mesmos.
+    O banco SQLite é sempre processado pelo pandas. Devolve o backend que de
+    fato processou os PRs.
+    """
+    if filters and not pr_store.is_store(file_path):
+        raise ValueError("Filtros de repositório/data só são aceitos com o banco SQLite (pr_store.py)")
+    if backend == "polars" and pr_store.is_store(file_path):
+        print("[AVISO] O backend polars não lê o banco SQLite; usando pandas")
+        backend = "pandas"
+    print("[INFO] Iniciando processamento do dataset bruto...")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    if backend == "polars":
+        import polars_backend
+        df_final, total = polars_backend.process_raw(file_path, COLUNAS_FINAL)
+        print(f"[INFO] PRs carregados: {total}")
+
+    elif partitions.is_partitioned(file_path) or pr_store.is_store(file_path):
+        total = 0
+        kept = 0
+        parquet = dataset.ParquetDatasetWriter(COLUNAS_FINAL, parquet_path)
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            for df in _raw_frames(file_path, filters):
+                total += len(df)
+                df_final = _process_frame(df)
+                if df_final.empty:
+                    continue
+                df_final.to_csv(f, index=False, header=kept == 0)
+                parquet.write(df_final)
+                kept += len(df_final)
+            if kept == 0:
+                f.write(",".join(COLUNAS_FINAL) + "\n")
+        parquet.close()
+        print(f"[INFO] PRs carregados: {total}")
+        print(f"[INFO] PRs após filtragem: {kept}")
+        print(f"[OK] Dataset final salvo em {output_path}")
+        if parquet.enabled:
+            print(f"[OK] Dataset tipado salvo em {parquet_path}")
+        return backend
+
+    else:
+        # Lê o CSV com os PRs brutos
+        df = pd.read_csv(file_path, parse_dates=["created_at", "closed_at", "merged_at"])
+        print(f"[INFO] PRs carregados: {len(df)}")
+        df_final = _process_frame(df)
+
+    print(f"[INFO] PRs após filtragem: {len(df_final)}")
 
     # =============================
     # 4. Exportar dataset completo
     # =============================
-    os.makedirs("data/processed", exist_ok=True)
-    output_path = "data/processed/final_dataset.csv"
     df_final.to_csv(output_path, index=False)
     print(f"[OK] Dataset final salvo em {output_path}")
+    if dataset.write_parquet(df_final, parquet_path):
+        print(f"[OK] Dataset tipado salvo em {parquet_path}")
 
     # =============================
     # 5. Mostrar resumo rápido
     # =============================
-    print("\nResumo do dataset final:")
-    print(df_final.describe(include='all'))
+    if not partitions.is_partitioned(file_path):
+        print("\nResumo do dataset final:")
+        print(df_final.describe(include='all'))
+    return backend
+
+
+def check_parity(file_path):
+    """
+    Processa ``file_path`` com os dois backends em um diretório temporário e
+    compara os arquivos gerados (CSV byte a byte e o Parquet tipado); True se iguais.
+    False, sem comparar, se algum backend não processou ``file_path`` (ex.: banco SQLite).
+    """
+    outputs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            csv_path = os.path.join(tmp, f"{backend}.csv")
+            parquet_path = os.path.join(tmp, f"{backend}.parquet")
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                used = process_prs(file_path, backend=backend, output_path=csv_path, parquet_path=parquet_path)
+            if used != backend:
+                print(f"[ERRO] O backend {backend} não processa {file_path} (usou {used}); paridade não comparada")
+                return False
+            print(f"[INFO] {backend:<7} {time.perf_counter() - started:8.2f}s")
+            outputs[backend] = (csv_path, parquet_path)
+
+        (pandas_csv, pandas_parquet), (polars_csv, polars_parquet) = outputs["pandas"], outputs["polars"]
+        same = filecmp.cmp(pandas_csv, polars_csv, shallow=False)
+        print(f"[{'OK' if same else 'ERRO'}] final_dataset.csv {'idêntico' if same else 'diferente'}")
+        if os.path.exists(pandas_parquet):
+            same_parquet = dataset.load_final(path=pandas_parquet).equals(dataset.load_final(path=polars_parquet))
+            print(f"[{'OK' if same_parquet else 'ERRO'}] final_dataset.parquet "
+                  f"{'idêntico' if same_parquet else 'diferente'}")
+            same = same and same_parquet
+    return same
+
+
+def main(argv=None):
+    parser = cli_options.build_parser("process_data")
+    args = parser.parse_args(argv)
+    if args.check_parity:
+        sys.exit(0 if check_parity(args.input) else 1)
+    process_prs(args.input, pr_store.query_filters(args.repo, args.since, args.until), args.backend)
 
 
 if __name__ == "__main__":
-    process_prs()
+    main()
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+
+import collector_metrics
+import http_cache
+
+# ============================================================
+# Agendador de requisições compartilhado pelos coletores.
+#
+# Cada token do GitHub tem um "balde" por recurso da API (core,
+# search, graphql) alimentado pelos cabeçalhos X-RateLimit-* das
+# respostas: o orçamento restante é distribuído até o próximo
+# reset, com rajadas curtas permitidas. Respostas 403/429 de limite
+# (primário ou secundário) bloqueiam o token até Retry-After/reset
+# e a requisição é refeita com outro token do pool. Requisições GET
+# passam pelo cache em disco (http_cache) com ETag/If-None-Match.
+# ============================================================
+
+load_dotenv()
+
+# Tamanho máximo da rajada por token/recurso antes de passar a espaçar as chamadas
+BURST = 50
+# Espera padrão para limites secundários sem Retry-After (dobra a cada ocorrência)
+SECONDARY_BACKOFF = 60
+MAX_RETRIES = 5
+
+
+def load_tokens():
+    """Lê os tokens de GITHUB_TOKENS (separados por vírgula) ou, na falta, de GITHUB_TOKEN"""
+    raw = os.getenv("GITHUB_TOKENS") or os.getenv("GITHUB_TOKEN") or ""
+    return [token.strip() for token in raw.split(",") if token.strip()]
+
+
+def resource_for(url):
+    """Recurso de rate limit do GitHub ao qual a URL pertence"""
+    if "/search/" in url:
+        return "search"
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class _Bucket:
+    """Estado de rate limit de um token em um recurso da API"""
+
+    def __init__(self, token):
+        self.token = token
+        self.limit = None
+        self.remaining = None
+        self.reset = 0.0
+        self.level = float(BURST)
+        self.last_refill = time.time()
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+    def refill(self, now):
+        if self.remaining is not None and now >= self.reset + 1:
+            # Janela renovada: volta ao limite cheio até a próxima resposta
+            self.remaining = self.limit
+        if self.remaining is None:
+            self.level = float(BURST)
+        else:
+            rate = self.remaining / max(self.reset - now, 1.0)
+            self.level = min(float(BURST), self.level + rate * (now - self.last_refill))
+        self.last_refill = now
+
+    def wait_time(self, now):
+        """Segundos até este balde poder liberar uma requisição"""
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is not None and self.remaining <= 0:
+            return max(self.reset - now, 0.0) + 1.0
+        if self.level >= 1:
+            return 0.0
+        rate = (self.remaining or 1) / max(self.reset - now, 1.0)
+        return (1 - self.level) / rate
+
+
+class RateLimitScheduler:
+    """Distribui requisições entre um pool de tokens respeitando os limites da API"""
+
+    def __init__(self, tokens=None, max_retries=MAX_RETRIES, send=None):
+        self.tokens = list(tokens) if tokens is not None else load_tokens()
+        # Função que efetivamente envia a requisição (ex.: Session.request do github_client)
+        self.send = send or requests.request
+        # Sem token a API ainda responde (com limite menor); usa um "token" vazio
+        if not self.tokens:
+            self.tokens = [None]
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, token, resource):
+        key = (token, resource)
+        if key not in self._buckets:
+            self._buckets[key] = _Bucket(token)
+        return self._buckets[key]
+
+    def acquire(self, resource="core"):
+        """Bloqueia até algum token ter orçamento no recurso e devolve esse token"""
+        with self._cond:
+            while True:
+                now = time.time()
+                buckets = [self._bucket(token, resource) for token in self.tokens]
+                for bucket in buckets:
+                    bucket.refill(now)
+                ready = [b for b in buckets if b.wait_time(now) == 0]
+                if ready:
+                    # Prefere o token com mais orçamento restante
+                    bucket = max(ready, key=lambda b: b.remaining if b.remaining is not None else float("inf"))
+                    bucket.level -= 1
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return bucket.token
+                self._cond.wait(min(b.wait_time(now) for b in buckets))
+
+    def update(self, token, resource, response):
+        """Atualiza o balde do token com os cabeçalhos da resposta; retorna True se foi limitada"""
+        headers = response.headers
+        now = time.time()
+        limited = is_rate_limited(response)
+        with self._cond:
+            bucket = self._bucket(token, resource)
+            if "X-RateLimit-Remaining" in headers:
+                bucket.remaining = int(headers["X-RateLimit-Remaining"])
+                bucket.limit = int(headers.get("X-RateLimit-Limit", bucket.limit or bucket.remaining))
+                bucket.reset = float(headers.get("X-RateLimit-Reset", now + 3600))
+                collector_metrics.get_metrics().update_budget(
+                    token, resource,
+                    bucket.remaining, bucket.limit, bucket.reset)
+            if limited:
+                if headers.get("Retry-After"):
+                    bucket.blocked_until = now + float(headers["Retry-After"])
+                elif bucket.remaining == 0:
+                    bucket.blocked_until = bucket.reset + 1
+                else:
+                    # Limite secundário sem Retry-After: backoff exponencial
+                    bucket.blocked_until = now + SECONDARY_BACKOFF * 2 ** bucket.strikes
+                bucket.strikes += 1
+                print(f"[AVISO] Rate limit atingido ({resource}); token pausado por "
+                      f"{bucket.blocked_until - now:.0f}s")
+            else:
+                bucket.strikes = 0
+            self._cond.notify_all()
+        return limited
+
+    def request(self, method, url, headers=None, params=None, **kwargs):
+        """Executa a requisição com um token do pool, repetindo quando houver rate limit"""
+        resource = resource_for(url)
+        if params:
+            url = requests.Request(method, url, params=params).prepare().url
+        cache = http_cache.get_cache() if method == "GET" else None
+        response = None
+        for _ in range(self.max_retries + 1):
+            if response is not None:
+                # Resposta descartada (rate limit ou 304 sem corpo no cache): com stream=True a
+                # conexão só volta ao pool depois de fechada
+                response.close()
+            token = self.acquire(resource)
+            request_headers = dict(headers or {})
+            if token:
+                request_headers["Authorization"] = f"Bearer {token}"
+            entry = cache.lookup(url, token) if cache else None
+            if entry:
+                request_headers.update(cache.conditional_headers(entry))
+            response = self.send(method, url, headers=request_headers, **kwargs)
+            if self.update(token, resource, response):
+                collector_metrics.get_metrics().rate_limited()
+                continue
+            if cache:
+                if response.status_code == 304 and entry:
+                    cached = cache.revalidated(url, token, entry)
+                    if cached is not None:
+                        return cached
+                    continue  # corpo removido do cache nesse meio tempo: repete sem If-None-Match
+                cache.store(url, token, response)
+            return response
+        return response
+
+
+def is_rate_limited(response):
+    """Indica se a resposta é um bloqueio de rate limit (primário ou secundário)"""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    if response.headers.get("Retry-After") or response.headers.get("X-RateLimit-Remaining") == "0":
+        return True
+    return "rate limit" in response.text.lower()
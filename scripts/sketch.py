@@ -0,0 +1,185 @@
+import math
+from collections import Counter
+
+import numpy as np
+
+# ============================================================
+# Sketch de quantis mesclável, para medianas, quartis e boxplots sem
+# manter (nem ordenar) todos os valores em memória.
+#
+# Enquanto há no máximo ``max_exact`` valores distintos (o caso comum
+# das contagens de PRs: arquivos, comentários, participantes...), o
+# sketch guarda a contagem exata de cada valor e os quantis são
+# idênticos aos de ``numpy.quantile`` (interpolação linear). Acima
+# disso ele passa a guardar contagens em buckets logarítmicos, como o
+# DDSketch: o valor x cai no bucket ceil(log_gamma(|x|)), com
+# gamma = (1 + alpha) / (1 - alpha), e todo quantil devolvido tem erro
+# relativo de no máximo ``alpha`` em relação a um valor do intervalo
+# correspondente. Zeros são contados à parte; negativos usam buckets
+# espelhados. Contagem, soma, mínimo e máximo são sempre exatos.
+#
+# Dois sketches com o mesmo alpha podem ser mesclados (merge), então
+# cada pedaço do dataset pode ser resumido separadamente.
+# ============================================================
+
+ALPHA = 0.01
+MAX_EXACT = 10_000
+
+
+class QuantileSketch:
+    """Resumo mesclável de uma série numérica (ver comentário do módulo)"""
+
+    def __init__(self, alpha=ALPHA, max_exact=MAX_EXACT):
+        self.alpha = alpha
+        self.max_exact = max_exact
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.exact = Counter()   # valor -> contagem (modo exato)
+        self.positive = None     # bucket -> contagem (modo aproximado)
+        self.negative = None
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def is_exact(self):
+        return self.positive is None
+
+    def add(self, values):
+        """Acrescenta um array (ou série) de valores; NaN é ignorado"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        if self.is_exact:
+            uniques, counts = np.unique(values, return_counts=True)
+            if len(self.exact.keys() | set(uniques.tolist())) <= self.max_exact:
+                self.exact.update(dict(zip(uniques.tolist(), counts.tolist())))
+                return self
+            self._to_buckets()
+        self._add_buckets(values)
+        return self
+
+    def _bucket_keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _add_buckets(self, values, weights=None):
+        weights = np.ones(values.size, dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        zero = values == 0
+        self.zeros += int(weights[zero].sum())
+        for store, mask in ((self.positive, values > 0), (self.negative, values < 0)):
+            if not mask.any():
+                continue
+            keys = self._bucket_keys(np.abs(values[mask]))
+            uniques, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, weights=weights[mask]).astype(np.int64)
+            store.update(dict(zip(uniques.tolist(), counts.tolist())))
+
+    def _to_buckets(self):
+        """Passa do modo exato para o de buckets (irreversível)"""
+        self.positive = Counter()
+        self.negative = Counter()
+        if self.exact:
+            values = np.fromiter(self.exact.keys(), dtype=float, count=len(self.exact))
+            weights = np.fromiter(self.exact.values(), dtype=np.int64, count=len(self.exact))
+            self._add_buckets(values, weights)
+        self.exact = Counter()
+
+    def merge(self, other):
+        """Incorpora outro sketch (com o mesmo alpha) a este"""
+        if other.alpha != self.alpha:
+            raise ValueError("Só é possível mesclar sketches com o mesmo alpha")
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.is_exact and other.is_exact and len(self.exact.keys() | other.exact.keys()) <= self.max_exact:
+            self.exact.update(other.exact)
+            return self
+        if self.is_exact:
+            self._to_buckets()
+        if other.is_exact:
+            if other.exact:
+                values = np.fromiter(other.exact.keys(), dtype=float, count=len(other.exact))
+                weights = np.fromiter(other.exact.values(), dtype=np.int64, count=len(other.exact))
+                self._add_buckets(values, weights)
+        else:
+            self.positive.update(other.positive)
+            self.negative.update(other.negative)
+            self.zeros += other.zeros
+        return self
+
+    def _representative(self, key):
+        # Ponto do bucket (gamma^(k-1), gamma^k] com erro relativo <= alpha
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def value_counts(self):
+        """(valores, contagens) em ordem crescente; no modo de buckets, o valor representante de cada bucket"""
+        if self.is_exact:
+            items = sorted(self.exact.items())
+        else:
+            items = [(-self._representative(k), c) for k, c in sorted(self.negative.items(), reverse=True)]
+            if self.zeros:
+                items.append((0.0, self.zeros))
+            items += [(self._representative(k), c) for k, c in sorted(self.positive.items())]
+        values = np.array([value for value, _ in items], dtype=float)
+        counts = np.array([count for _, count in items], dtype=np.int64)
+        return values, counts
+
+    def quantiles(self, qs):
+        """
+        Quantis ``qs`` (entre 0 e 1) com interpolação linear entre as estatísticas
+        de ordem vizinhas, como ``numpy.quantile``. Exatos no modo exato; com erro
+        relativo <= alpha no modo de buckets. Os extremos (0 e 1) são sempre exatos.
+        """
+        if self.count == 0:
+            return [math.nan for _ in qs]
+        values, counts = self.value_counts()
+        cumulative = np.cumsum(counts)
+
+        def order_stat(rank):
+            # Valor da rank-ésima observação (base 0)
+            if rank <= 0:
+                return self.min
+            if rank >= self.count - 1:
+                return self.max
+            value = values[np.searchsorted(cumulative, rank + 1)]
+            return min(max(value, self.min), self.max)
+
+        result = []
+        for q in qs:
+            position = (self.count - 1) * q
+            lower = math.floor(position)
+            fraction = position - lower
+            low = order_stat(lower)
+            result.append(low if fraction == 0 else low + (order_stat(lower + 1) - low) * fraction)
+        return result
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def rank(self, x):
+        """Quantidade de observações <= x (aproximada no modo de buckets)"""
+        values, counts = self.value_counts()
+        return int(counts[values <= x].sum())
+
+    def bucketed(self):
+        """Cópia deste sketch no modo de buckets (para comparar com outro sketch na mesma grade)"""
+        copy = QuantileSketch(self.alpha, self.max_exact).merge(self)
+        if copy.is_exact:
+            copy._to_buckets()
+        return copy
+
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+
+def from_values(values, alpha=ALPHA, max_exact=MAX_EXACT):
+    return QuantileSketch(alpha, max_exact).add(values)
@@ -0,0 +1,165 @@
+import argparse
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+import dataset
+import features
+from sketch import QuantileSketch
+
+# ============================================================
+# Estatísticas da Dimensão A (merged vs closed) em streaming.
+#
+# O dataset final é lido em pedaços de CHUNK_ROWS linhas; para cada
+# métrica e grupo só fica em memória um QuantileSketch (sketch.py),
+# então o relatório funciona com datasets maiores que a RAM.
+#
+# - Média e contagem: sempre exatas.
+# - Mediana: exata enquanto a métrica tem até MAX_EXACT valores
+#   distintos (caso das contagens); acima disso, erro relativo <= alpha
+#   (padrão 1%).
+# - Mann-Whitney U: calculado a partir das contagens por valor de cada
+#   grupo (agregados de posto), sem ordenar os dados:
+#       U1 = soma_v n1(v) * (n2(< v) + n2(v) / 2)
+#   com correção de empates soma_v (t_v^3 - t_v), t_v = n1(v) + n2(v), e
+#   aproximação normal com correção de continuidade, exatamente como
+#   scipy.stats.mannwhitneyu (bicaudal). Com os dois sketches no modo
+#   exato o resultado é idêntico ao do scipy. No modo de buckets, valores
+#   do mesmo bucket (diferença relativa < 2 * alpha) são tratados como
+#   empate; o erro em U1 é no máximo 1/2 * soma_b n1(b) * n2(b), informado
+#   em ``u_error_bound``.
+# ============================================================
+
+CHUNK_ROWS = 250_000
+
+# Métricas comparadas entre merged e closed (RQ01-RQ04)
+METRICS = ["changed_files", "total_lines", "review_time_h", "body_length", "participants_count", "comments"]
+
+MannWhitneyResult = namedtuple("MannWhitneyResult", ["statistic", "pvalue", "u_error_bound", "exact"])
+
+
+def iter_chunks(columns, path=None, chunk_rows=CHUNK_ROWS):
+    """
+    Lê ``columns`` do dataset final em DataFrames de até ``chunk_rows`` linhas.
+
+    Métricas derivadas ausentes do arquivo (datasets antigos) são calculadas
+    pedaço a pedaço com ``features.add_features``.
+    """
+    path = path or dataset.default_path()
+    available = set(dataset.columns_in(path))
+    derive = [col for col in columns if col in features.FEATURE_COLUMNS and col not in available]
+    read = [col for col in columns if col not in derive]
+    if derive:
+        read = list(dict.fromkeys(read + features.SOURCE_COLUMNS))
+
+    if path.endswith(".parquet"):
+        parquet = dataset.pq.ParquetFile(path)
+        batches = (batch.to_pandas() for batch in parquet.iter_batches(batch_size=chunk_rows, columns=read))
+    else:
+        wanted = set(read) | {old for old, new in dataset.LEGACY_NAMES.items() if new in read}
+        batches = pd.read_csv(path, usecols=lambda name: name in wanted, chunksize=chunk_rows)
+
+    for chunk in batches:
+        chunk = dataset.apply_schema(chunk)
+        if derive:
+            chunk = features.add_features(chunk)
+        yield chunk[columns]
+
+
+def mann_whitney(sketch_x, sketch_y):
+    """
+    Teste de Mann-Whitney U bicaudal entre duas amostras resumidas em sketches.
+
+    Devolve ``MannWhitneyResult(statistic=U1, pvalue, u_error_bound, exact)``.
+    """
+    n1, n2 = sketch_x.count, sketch_y.count
+    if n1 == 0 or n2 == 0:
+        return MannWhitneyResult(math.nan, math.nan, 0.0, True)
+
+    exact = sketch_x.is_exact and sketch_y.is_exact
+    if not exact:
+        # Os dois precisam usar a mesma grade de buckets para serem comparáveis
+        sketch_x, sketch_y = sketch_x.bucketed(), sketch_y.bucketed()
+
+    values_x, counts_x = sketch_x.value_counts()
+    values_y, counts_y = sketch_y.value_counts()
+    values = np.union1d(values_x, values_y)
+    c1 = np.zeros(len(values))
+    c2 = np.zeros(len(values))
+    c1[np.searchsorted(values, values_x)] = counts_x
+    c2[np.searchsorted(values, values_y)] = counts_y
+    ties = c1 + c2
+
+    if exact and min(n1, n2) <= 8 and ties.max() == 1:
+        # Amostras minúsculas sem empates: o scipy usa a distribuição exata
+        x = np.repeat(values, c1.astype(int))
+        y = np.repeat(values, c2.astype(int))
+        result = stats.mannwhitneyu(x, y)
+        return MannWhitneyResult(float(result.statistic), float(result.pvalue), 0.0, True)
+
+    below_y = np.cumsum(c2) - c2
+    u1 = float(np.sum(c1 * (below_y + c2 / 2)))
+    u = max(u1, n1 * n2 - u1)
+
+    n = n1 + n2
+    tie_term = float(np.sum(ties ** 3 - ties))
+    sigma = np.sqrt(np.float64(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))))
+    # sigma = 0 (todos os valores iguais): z = -inf e p = 1, como no scipy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (u - n1 * n2 / 2 - 0.5) / sigma
+    pvalue = float(np.clip(2 * special.ndtr(-z), 0.0, 1.0))
+    error = 0.0 if exact else float(0.5 * np.sum(c1 * c2))
+    return MannWhitneyResult(u1, pvalue, error, exact)
+
+
+def compare(sketch_merged, sketch_closed):
+    """Mediana, média e n de cada grupo e o teste de Mann-Whitney entre eles"""
+    return {
+        "merged": {"median": sketch_merged.quantile(0.5), "mean": sketch_merged.mean(), "n": sketch_merged.count},
+        "closed": {"median": sketch_closed.quantile(0.5), "mean": sketch_closed.mean(), "n": sketch_closed.count},
+        "mann_whitney": mann_whitney(sketch_merged, sketch_closed),
+    }
+
+
+def compare_series(merged, closed):
+    """``compare`` para duas séries já em memória"""
+    return compare(QuantileSketch().add(merged), QuantileSketch().add(closed))
+
+
+def status_sketches(metrics=METRICS, path=None, chunk_rows=CHUNK_ROWS):
+    """Sketches de cada métrica para merged e closed, em uma única passada pelo dataset"""
+    sketches = {metric: (QuantileSketch(), QuantileSketch()) for metric in metrics}
+    rows = 0
+    for chunk in iter_chunks(["status", *metrics], path, chunk_rows):
+        rows += len(chunk)
+        is_merged = (chunk["status"] == 1).to_numpy()
+        for metric in metrics:
+            values = chunk[metric].to_numpy(dtype=float)
+            sketches[metric][0].add(values[is_merged])
+            sketches[metric][1].add(values[~is_merged])
+    return sketches, rows
+
+
+def report(path=None, chunk_rows=CHUNK_ROWS):
+    sketches, rows = status_sketches(path=path, chunk_rows=chunk_rows)
+    print(f"[INFO] {rows} PRs lidos em pedaços de {chunk_rows} linhas")
+    for metric, (merged, closed) in sketches.items():
+        result = compare(merged, closed)
+        mw = result["mann_whitney"]
+        print(f"\n--- {metric} ---")
+        print(f"Merged - Mediana: {result['merged']['median']:.2f}, Média: {result['merged']['mean']:.2f}")
+        print(f"Closed - Mediana: {result['closed']['median']:.2f}, Média: {result['closed']['mean']:.2f}")
+        print(f"Mann-Whitney U = {mw.statistic:.1f}, p-value: {mw.pvalue:.4f}"
+              + ("" if mw.exact else f" (aproximado: |erro em U| <= {mw.u_error_bound:.0f})"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Medianas, médias e Mann-Whitney de merged vs closed lendo o dataset em pedaços")
+    parser.add_argument("--input", default=None, help="Dataset final (.parquet ou .csv)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    report(args.input, args.chunk_rows)
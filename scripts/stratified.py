@@ -0,0 +1,230 @@
+import argparse
+import os
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+import dataset
+import pr_store
+from correlacao import RQS
+from features import load_features
+
+# ============================================================
+# Análise estratificada das RQs: por repositório e por cluster de
+# repositórios, além do conjunto completo.
+#
+# Com todos os PRs em uma única amostra, poucos repositórios enormes
+# dominam os resultados. Aqui as oito correlações de Spearman de
+# correlacao.py são calculadas dentro de cada grupo, com:
+#   - intervalo de confiança bootstrap (percentil) de rho: B reamostragens
+#     com reposição dos PRs do grupo, ranqueadas e correlacionadas em
+#     blocos de matrizes NumPy (todas as RQs de uma vez);
+#   - p-valor de permutação bicaudal: embaralhar Y não muda os postos,
+#     então cada permutação é só uma reindexação dos postos de Y e todas
+#     saem de um produto de matrizes.
+# Os clusters agrupam repositórios parecidos (volume de PRs, taxa de
+# aceitação, tamanho e tempo de revisão medianos) com k-means. Cada
+# grupo é uma tarefa de um pool de processos; as sementes são derivadas
+# do nome do grupo, então o resultado não depende da ordem de execução.
+# ============================================================
+
+OUTPUT_PATH = "resultados/correlacoes_estratificadas.csv"
+
+BOOTSTRAP = 2000
+PERMUTATIONS = 2000
+MIN_PRS = 10
+CLUSTERS = 4
+SEED = 42
+CONFIDENCE = 0.95
+
+# Elementos (reamostragens x PRs) por bloco, para limitar a memória
+BLOCK_ELEMENTS = 2_000_000
+
+VARIABLES = list(dict.fromkeys(col for _, _, x, y in RQS for col in (x, y)))
+PAIRS = [(VARIABLES.index(x), VARIABLES.index(y)) for _, _, x, y in RQS]
+
+
+def _standardize(ranks):
+    """Postos centrados e normalizados no último eixo (rho = produto escalar)"""
+    centered = ranks - ranks.mean(axis=-1, keepdims=True)
+    norms = np.sqrt((centered ** 2).sum(axis=-1, keepdims=True))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return centered / norms
+
+
+def spearman_pairs(values):
+    """rho de cada RQ para uma matriz (PRs x VARIABLES)"""
+    z = _standardize(rankdata(values, axis=0).T)
+    return np.array([z[i] @ z[j] for i, j in PAIRS])
+
+
+def bootstrap_rhos(values, rng, resamples=BOOTSTRAP):
+    """Matriz (reamostragens x RQs) com o rho de cada reamostragem bootstrap"""
+    n = len(values)
+    block = max(1, BLOCK_ELEMENTS // (n * len(VARIABLES)))
+    out = np.empty((resamples, len(PAIRS)))
+    for start in range(0, resamples, block):
+        size = min(block, resamples - start)
+        idx = rng.integers(0, n, size=(size, n))
+        # (reamostragens, variáveis, PRs), ranqueado ao longo dos PRs
+        sample = np.transpose(values[idx], (0, 2, 1))
+        z = _standardize(rankdata(sample, axis=-1))
+        for k, (i, j) in enumerate(PAIRS):
+            out[start:start + size, k] = np.einsum("bn,bn->b", z[:, i], z[:, j])
+    return out
+
+
+def permutation_pvalues(values, observed, rng, permutations=PERMUTATIONS):
+    """p-valor bicaudal de permutação de cada RQ (|rho permutado| >= |rho observado|)"""
+    n = len(values)
+    z = _standardize(rankdata(values, axis=0).T)
+    exceed = np.zeros(len(PAIRS))
+    block = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, permutations, block):
+        size = min(block, permutations - start)
+        perms = np.argsort(rng.random((size, n)), axis=1)
+        for k, (i, j) in enumerate(PAIRS):
+            rhos = z[j][perms] @ z[i]
+            exceed[k] += np.sum(np.abs(rhos) >= np.abs(observed[k]) - 1e-12)
+    return (exceed + 1) / (permutations + 1)
+
+
+def analyze_group(task):
+    """Linhas do resultado (uma por RQ) para um grupo de PRs"""
+    level, group, values, resamples, permutations, seed = task
+    rng = np.random.default_rng([seed, zlib.crc32(f"{level}:{group}".encode())])
+    n = len(values)
+    observed = spearman_pairs(values)
+    boot = bootstrap_rhos(values, rng, resamples)
+    alpha = (1 - CONFIDENCE) / 2
+    with warnings.catch_warnings():
+        # RQ sem variação no grupo (ex.: todos os PRs merged): IC indefinido
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+    pvalues = permutation_pvalues(values, observed, rng, permutations)
+    return [
+        {
+            "nivel": level,
+            "grupo": group,
+            "rq": rq,
+            "descricao": label,
+            "n": n,
+            "rho": observed[k],
+            "ic_inferior": low[k],
+            "ic_superior": high[k],
+            "p_permutacao": pvalues[k] if np.isfinite(observed[k]) else np.nan,
+        }
+        for k, (rq, label, _, _) in enumerate(RQS)
+    ]
+
+
+def _kmeans(points, k, rng, iterations=100):
+    """k-means simples (k-means++ na inicialização) sobre linhas já padronizadas"""
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        dist = np.min(((points[:, None] - np.array(centers)) ** 2).sum(axis=2), axis=1)
+        centers.append(points[rng.choice(len(points), p=dist / dist.sum())] if dist.sum() > 0 else points[0])
+    centers = np.array(centers)
+    for _ in range(iterations):
+        labels = np.argmin(((points[:, None] - centers) ** 2).sum(axis=2), axis=1)
+        updated = np.array([points[labels == c].mean(axis=0) if np.any(labels == c) else centers[c] for c in range(k)])
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    return labels
+
+
+def repo_clusters(df, k=CLUSTERS, seed=SEED):
+    """Cluster (0..k-1) de cada repositório, por volume, aceitação, tamanho e tempo de revisão"""
+    grouped = df.groupby("repo_full_name", observed=True)
+    profile = pd.DataFrame({
+        "log_prs": np.log1p(grouped.size()),
+        "acceptance": grouped["status"].mean(),
+        "log_tamanho": np.log1p(grouped["tamanho"].median()),
+        "log_review_time": np.log1p(grouped["review_time_h"].median().clip(lower=0)),
+    }).fillna(0)
+    k = min(k, len(profile))
+    if k == 0:
+        return pd.Series(dtype=int)
+    std = profile.std(ddof=0).replace(0, 1)
+    points = ((profile - profile.mean()) / std).to_numpy()
+    labels = _kmeans(points, k, np.random.default_rng(seed))
+    # Numera os clusters pelo volume médio, do menor para o maior
+    order = pd.Series(profile["log_prs"].to_numpy()).groupby(labels).mean().sort_values().index
+    rename = {old: new for new, old in enumerate(order)}
+    return pd.Series([rename[label] for label in labels], index=profile.index)
+
+
+def build_tasks(df, resamples, permutations, min_prs, clusters, seed):
+    df = df.dropna(subset=VARIABLES)
+    tasks = [("todos", "todos", df[VARIABLES].to_numpy(float), resamples, permutations, seed)]
+
+    cluster_of = repo_clusters(df, clusters, seed)
+    df = df.assign(cluster=df["repo_full_name"].map(cluster_of))
+    for cluster, group in df.groupby("cluster"):
+        if len(group) >= min_prs:
+            tasks.append(("cluster", f"cluster-{int(cluster)}", group[VARIABLES].to_numpy(float),
+                          resamples, permutations, seed))
+    for repo, group in df.groupby("repo_full_name", observed=True):
+        if len(group) >= min_prs:
+            tasks.append(("repo", str(repo), group[VARIABLES].to_numpy(float), resamples, permutations, seed))
+    return tasks, cluster_of
+
+
+def run(resamples=BOOTSTRAP, permutations=PERMUTATIONS, min_prs=MIN_PRS, clusters=CLUSTERS,
+        seed=SEED, jobs=None, output_path=OUTPUT_PATH, path=None, filters=None):
+    path = path or dataset.default_path()
+    if "repo_full_name" not in dataset.columns_in(path):
+        raise ValueError(f"{path} não tem a coluna do repositório (repo_full_name/repo_name)")
+    df = load_features(columns=["repo_full_name", *VARIABLES], filters=filters, path=path)
+
+    tasks, cluster_of = build_tasks(df, resamples, permutations, min_prs, clusters, seed)
+    print(f"[INFO] {len(df)} PRs, {cluster_of.size} repositórios, {len(tasks)} grupos "
+          f"(bootstrap: {resamples}, permutações: {permutations})")
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = [analyze_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Grupos grandes primeiro, para equilibrar os workers
+            results = list(pool.map(analyze_group, sorted(tasks, key=lambda task: -len(task[2]))))
+    table = pd.DataFrame([row for rows in results for row in rows])
+
+    table["ordem"] = table["nivel"].map({"todos": 0, "cluster": 1, "repo": 2})
+    table = table.sort_values(["ordem", "grupo", "rq"]).drop(columns="ordem").reset_index(drop=True)
+    table["cluster"] = table["grupo"].map(cluster_of).astype("Int64")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    table.to_csv(output_path, index=False)
+
+    repos = table[table["nivel"] == "repo"]
+    print(f"\n{'RQ':<6}{'rho (todos)':>12}{'mediana repos':>15}{'repos p<0.05':>14}")
+    for rq, _, _, _ in RQS:
+        pooled = table[(table["nivel"] == "todos") & (table["rq"] == rq)]["rho"].iloc[0]
+        per_repo = repos[repos["rq"] == rq]
+        significant = (per_repo["p_permutacao"] < 0.05).sum()
+        print(f"{rq:<6}{pooled:>12.3f}{per_repo['rho'].median():>15.3f}{significant:>9}/{len(per_repo)}")
+    print(f"\n[OK] Resultados por grupo salvos em {output_path}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correlações das RQs por repositório e por cluster de repositórios")
+    parser.add_argument("--bootstrap", type=int, default=BOOTSTRAP, help="Reamostragens bootstrap por grupo")
+    parser.add_argument("--permutations", type=int, default=PERMUTATIONS, help="Permutações por grupo")
+    parser.add_argument("--min-prs", type=int, default=MIN_PRS, help="Mínimo de PRs para analisar um grupo")
+    parser.add_argument("--clusters", type=int, default=CLUSTERS, help="Número de clusters de repositórios")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--jobs", type=int, default=None, help="Processos (padrão: número de CPUs)")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--input", default=None,
+                        help="Dataset final (.parquet ou .csv) ou banco SQLite dos PRs (data/raw/prs.sqlite)")
+    pr_store.add_query_arguments(parser)
+    args = parser.parse_args()
+    run(args.bootstrap, args.permutations, args.min_prs, args.clusters, args.seed, args.jobs, args.output, args.input,
+        pr_store.query_filters(args.repo, args.since, args.until))
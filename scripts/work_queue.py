@@ -0,0 +1,150 @@
+import os
+import socket
+import sqlite3
+import time
+
+# ============================================================
+# Fila de trabalho da coleta distribuída, em um arquivo SQLite.
+#
+# Cada repositório de top_repos.csv vira uma linha da fila. Workers
+# (processos na mesma máquina ou em máquinas que compartilham o
+# sistema de arquivos) pegam um repositório por vez com um "lease"
+# com prazo de validade, renovam o lease enquanto coletam e marcam o
+# repositório como concluído ou com falha. Leases vencidos (worker
+# que morreu) e falhas abaixo do limite de tentativas voltam a ficar
+# disponíveis para outro worker.
+#
+# O SQLite usa o journal padrão (e não WAL) para funcionar também em
+# sistemas de arquivos de rede.
+# ============================================================
+
+LEASE_SECONDS = 30 * 60
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo          TEXT PRIMARY KEY,
+    position      INTEGER NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    rows          INTEGER,
+    error         TEXT,
+    updated       REAL
+)
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Fila de repositórios com leases, persistida em SQLite"""
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # isolation_level=None: transações controladas explicitamente com BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, sql, params=()):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+            return cursor
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def populate(self, repo_names):
+        """Adiciona os repositórios que ainda não estão na fila (idempotente)"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO repos (repo, position) VALUES (?, ?)",
+                [(repo, i) for i, repo in enumerate(repo_names)],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def reset(self):
+        """Esvazia a fila para recomeçar a coleta do zero"""
+        self._transaction("DELETE FROM repos")
+
+    def lease(self, owner):
+        """Reserva o próximo repositório disponível para ``owner``; None se não houver"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT repo FROM repos
+                WHERE (status = 'pending')
+                   OR (status = 'leased' AND lease_expires < ?)
+                   OR (status = 'failed' AND attempts < ?)
+                ORDER BY position LIMIT 1
+                """,
+                (now, self.max_attempts),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    """
+                    UPDATE repos SET status = 'leased', owner = ?, lease_expires = ?,
+                                     attempts = attempts + 1, updated = ?
+                    WHERE repo = ?
+                    """,
+                    (owner, now + self.lease_seconds, now, row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0] if row else None
+
+    def renew(self, repo, owner):
+        """Estende o lease; False se ele já foi perdido para outro worker"""
+        now = time.time()
+        cursor = self._transaction(
+            "UPDATE repos SET lease_expires = ?, updated = ? WHERE repo = ? AND owner = ? AND status = 'leased'",
+            (now + self.lease_seconds, now, repo, owner),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, repo, owner, rows):
+        self._transaction(
+            "UPDATE repos SET status = 'done', rows = ?, error = NULL, updated = ? WHERE repo = ? AND owner = ?",
+            (rows, time.time(), repo, owner),
+        )
+
+    def fail(self, repo, owner, error):
+        self._transaction(
+            "UPDATE repos SET status = 'failed', error = ?, updated = ? WHERE repo = ? AND owner = ?",
+            (str(error)[:500], time.time(), repo, owner),
+        )
+
+    def stats(self):
+        """Quantidade de repositórios por status; falhas esgotadas aparecem como 'abandoned'"""
+        counts = dict(self.conn.execute(
+            """
+            SELECT CASE WHEN status = 'failed' AND attempts >= ? THEN 'abandoned' ELSE status END, COUNT(*)
+            FROM repos GROUP BY 1
+            """,
+            (self.max_attempts,),
+        ).fetchall())
+        return {status: counts.get(status, 0) for status in ("pending", "leased", "done", "failed", "abandoned")}
+
+    def finished(self):
+        """True quando não há mais nada pendente, em andamento ou a repetir"""
+        stats = self.stats()
+        return stats["pending"] == stats["leased"] == stats["failed"] == 0
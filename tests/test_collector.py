@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts")
+sys.path.insert(0, SCRIPTS)
+
+import mock_github  # noqa: E402
+
+# ============================================================
+# Coletor de PRs (fetch_prs.py) contra o mock local da API do
+# GitHub (mock_github.py), iniciado em uma porta livre. A coleta
+# roda como na linha de comando, em um subprocesso apontado para o
+# mock; o servidor fica neste processo para que os testes possam
+# alterar os PRs entre uma coleta e outra.
+# ============================================================
+
+REPOS = ["org0/repo0", "org1/repo1", "org2/repo2"]
+PRS_PER_REPO = 130
+
+
+@pytest.fixture
+def mock_api():
+    # Janela de rate limit de 1 s: o agendador não espaça as chamadas depois da rajada inicial
+    server = mock_github.serve(port=0, prs_per_repo=PRS_PER_REPO, rate_window=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def collect(mock_api, tmp_path):
+    """Roda fetch_prs.py contra o mock e devolve o CSV consolidado gerado"""
+    repos_csv = tmp_path / "top_repos.csv"
+    repos_csv.write_text("full_name\n" + "\n".join(REPOS) + "\n")
+    env = dict(os.environ, GITHUB_API_URL=mock_api, GITHUB_TOKEN="test", GITHUB_CACHE="0")
+    env.pop("GITHUB_TOKENS", None)
+    env.pop("GITHUB_GRAPHQL_URL", None)
+
+    def run(name, *args, dataset_dir=None):
+        output = tmp_path / f"{name}.csv"
+        command = [sys.executable, os.path.join(SCRIPTS, "fetch_prs.py"), "--repos", str(repos_csv),
+                   "--dataset-dir", str(dataset_dir or tmp_path / name), "--output", str(output),
+                   "--format", "csv", "--no-store", "--quiet", *args]
+        subprocess.run(command, cwd=tmp_path, env=env, check=True, capture_output=True, timeout=300)
+        return output.read_text()
+
+    return run
+
+
+def test_serial_and_parallel_collections_match(collect):
+    serial = collect("serial")
+    assert serial.count("\n") == 1 + len(REPOS) * PRS_PER_REPO
+    assert collect("workers", "--workers", "4") == serial
+    assert collect("repo_workers", "--repo-workers", "3") == serial
+    assert collect("both", "--workers", "3", "--repo-workers", "2") == serial
+
+
+def edit_prs(numbers, day="2025-01-01"):
+    """Atualiza ``numbers`` em todos os repositórios do mock (novo título e updated_at)"""
+    for repo in REPOS:
+        for i, number in enumerate(numbers):
+            mock_github.MockGitHubHandler.edits[(repo, number)] = {
+                "title": f"PR {number} editado",
+                "updated_at": f"{day}T00:{i // 60:02d}:{i % 60:02d}Z",
+            }
+
+
+@pytest.mark.parametrize("backend", ["rest", "graphql"])
+def test_incremental_collects_every_changed_pr_beyond_max_pages(collect, tmp_path, backend):
+    dataset_dir = tmp_path / "incremental"
+    collect("initial", "--backend", backend, dataset_dir=dataset_dir)
+    # Mais PRs modificados do que cabem em --max-pages 1 (100 PRs)
+    edit_prs(range(1, 121))
+    updated = collect("updated", "--backend", backend, "--incremental", "--max-pages", "1",
+                      dataset_dir=dataset_dir)
+    assert updated.count("editado") == 120 * len(REPOS)
+    assert updated == collect("fresh", "--backend", backend)
+
+
+def test_incremental_watermark_does_not_skip_failed_prs(collect, tmp_path):
+    dataset_dir = tmp_path / "incremental"
+    collect("initial", dataset_dir=dataset_dir)
+    edit_prs([7, 8, 9])
+    # O PR atualizado por último falha na primeira coleta incremental
+    mock_github.MockGitHubHandler.unavailable = {(repo, 9) for repo in REPOS}
+    partial = collect("partial", "--incremental", dataset_dir=dataset_dir)
+    assert partial.count("editado") == 2 * len(REPOS)
+
+    mock_github.MockGitHubHandler.unavailable = set()
+    updated = collect("updated", "--incremental", dataset_dir=dataset_dir)
+    assert updated.count("editado") == 3 * len(REPOS)
+    assert updated == collect("fresh")
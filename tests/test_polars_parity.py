@@ -0,0 +1,117 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
+import correlacao  # noqa: E402
+import partitions  # noqa: E402
+import pr_store  # noqa: E402
+import process_data  # noqa: E402
+
+pytest.importorskip("polars")
+
+# ============================================================
+# Paridade entre os backends pandas e polars (polars_backend.py)
+# em um dataset bruto pequeno, gerado na hora com semente fixa.
+# ============================================================
+
+N_PRS = 400
+
+
+def raw_rows(n=N_PRS, seed=3):
+    """PRs brutos com as colunas de partitions.COLUMNS, incluindo abertos, closed e merged"""
+    rng = np.random.default_rng(seed)
+    created = pd.Timestamp("2023-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit="s")
+    # Alguns PRs fecham em menos de uma hora e são descartados pelo filtro
+    closed = created + pd.to_timedelta(rng.integers(60, 30 * 86400, n), unit="s")
+    state = rng.choice(["open", "closed"], n, p=[0.1, 0.9])
+    merged = (state == "closed") & (rng.random(n) < 0.6)
+    rows = []
+    for i in range(n):
+        closed_at = closed[i].strftime("%Y-%m-%dT%H:%M:%SZ") if state[i] == "closed" else None
+        comments = int(rng.integers(0, 20))
+        review_comments = int(rng.integers(0, 15))
+        rows.append({
+            "repo_full_name": f"org{i % 3}/repo{i % 3}",
+            "id": 1000 + i,
+            "number": i + 1,
+            "title": f"PR {i + 1}",
+            "user": f"user{i % 17}",
+            "created_at": created[i].strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "updated_at": closed_at or created[i].strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "closed_at": closed_at,
+            "merged_at": closed_at if merged[i] else None,
+            "comments": comments,
+            "review_comments": review_comments,
+            "changed_files": int(rng.integers(1, 50)),
+            "additions": int(rng.integers(0, 3000)),
+            "deletions": int(rng.integers(0, 1500)),
+            "state": str(state[i]),
+            "merged": bool(merged[i]),
+            "body_length": int(rng.integers(0, 4000)),
+            "reviews_count": int(rng.integers(0, 6)),
+            "issue_comments_count": comments,
+            "inline_review_comments_count": review_comments,
+            "participants_count": int(rng.integers(1, 10)),
+        })
+    return rows
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    path = tmp_path / "prs_sample.csv"
+    pd.DataFrame(raw_rows(), columns=[name for name, _ in partitions.COLUMNS]).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def final_csv(tmp_path, raw_csv):
+    path = tmp_path / "final_dataset.csv"
+    process_data.process_prs(raw_csv, output_path=str(path), parquet_path=str(tmp_path / "final_dataset.parquet"))
+    return str(path)
+
+
+def test_process_backends_write_identical_files(raw_csv, tmp_path):
+    outputs = {}
+    for backend in process_data.BACKENDS:
+        csv_path = tmp_path / f"{backend}.csv"
+        used = process_data.process_prs(raw_csv, backend=backend, output_path=str(csv_path),
+                                        parquet_path=str(tmp_path / f"{backend}.parquet"))
+        assert used == backend
+        outputs[backend] = csv_path.read_bytes()
+    assert outputs["pandas"] == outputs["polars"]
+    assert process_data.check_parity(raw_csv)
+
+
+def test_correlation_backends_match(final_csv):
+    tables = {}
+    for backend in correlacao.BACKENDS:
+        df, ranks, used = correlacao.load_ranked(final_csv, backend=backend)
+        assert used == backend
+        tables[backend] = correlacao.correlation_table(df, ranks=ranks)
+    pandas_table, polars_table = tables["pandas"], tables["polars"]
+    assert pandas_table["n"].iloc[0] > 100
+    assert pandas_table["rho"].notna().all()
+    np.testing.assert_array_equal(pandas_table["rho"].to_numpy(), polars_table["rho"].to_numpy())
+    np.testing.assert_array_equal(pandas_table["p_value"].to_numpy(), polars_table["p_value"].to_numpy())
+    assert correlacao.check_parity(final_csv)
+
+
+def test_process_parity_not_compared_for_store(tmp_path):
+    store_path = str(tmp_path / "prs.sqlite")
+    store = pr_store.PRStore(store_path)
+    store.upsert(raw_rows(50))
+    store.close()
+    assert process_data.check_parity(store_path) is False
+
+
+def test_correlation_parity_not_compared_for_store(tmp_path):
+    store_path = str(tmp_path / "prs.sqlite")
+    store = pr_store.PRStore(store_path)
+    store.upsert(raw_rows(50))
+    store.close()
+    assert correlacao.check_parity(store_path) is False